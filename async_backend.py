@@ -0,0 +1,246 @@
+# async_backend.py
+import asyncio
+import concurrent.futures
+import subprocess
+import sys
+import threading
+
+from line_reader import CHUNK_SIZE, LineDecoder
+
+# 界面尚未消化的输出超过该行数时暂停读取，让服务器阻塞在自己的 stdout 上
+READ_HIGH_WATER = 50000
+# 暂停读取时的检查间隔（秒）
+BACKPRESSURE_INTERVAL = 0.05
+# 尚未写入 stdin 的字节数上限，超出时 write() 抛出 BlockingIOError
+MAX_PENDING_WRITE = 1024 * 1024
+
+
+class EventLoopThread:
+    """
+    在单独的守护线程中运行的 asyncio 事件循环。
+
+    所有服务器的 stdout 读取、stdin 写入和计时器都在这一个线程中复用，
+    服务器数量增加时线程数不变。
+    """
+
+    def __init__(self, name="asyncio-backend"):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        _install_child_watcher(self.loop)
+        self.loop.run_forever()
+
+    def in_loop(self):
+        return threading.current_thread() is self.thread
+
+    def submit(self, coro):
+        """在事件循环中运行协程，返回 concurrent.futures.Future（任意线程可调用）"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, func, *args):
+        """在事件循环线程中调用 func；已在该线程中时直接调用"""
+        if self.in_loop():
+            func(*args)
+        else:
+            self.loop.call_soon_threadsafe(func, *args)
+
+    def call_later(self, delay, func, *args):
+        """任意线程可调用的计时器，返回带 cancel() 的 LoopTimer"""
+        return LoopTimer(self, delay, func, args)
+
+
+def _install_child_watcher(loop):
+    """
+    Linux 上改用 pidfd 监视子进程退出：Python 3.12 之前默认每个子进程一个 waitpid 线程。
+    Windows 的 Proactor 循环和 3.12 以后的版本不需要。
+    """
+    if sys.platform == "win32" or sys.version_info >= (3, 12):
+        return
+    try:
+        watcher = asyncio.PidfdChildWatcher()
+        watcher.attach_loop(loop)
+        asyncio.set_child_watcher(watcher)
+    except (AttributeError, OSError, NotImplementedError) as e:
+        print(f"pidfd 不可用，使用默认子进程监视器: {e}")
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_loop():
+    """进程内共用的事件循环线程，首次使用时创建"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = EventLoopThread()
+        return _shared
+
+
+class LoopTimer:
+    """事件循环中的一次性计时器，接口与 threading.Timer 的 cancel() 一致"""
+
+    def __init__(self, loop_thread, delay, func, args):
+        self._loop_thread = loop_thread
+        self._func = func
+        self._args = args
+        self._handle = None
+        self._cancelled = False
+        loop_thread.call(self._schedule, delay)
+
+    def _schedule(self, delay):
+        if not self._cancelled:
+            self._handle = self._loop_thread.loop.call_later(delay, self._fire)
+
+    def _fire(self):
+        if not self._cancelled:
+            self._func(*self._args)
+
+    def cancel(self):
+        self._cancelled = True
+        self._loop_thread.call(self._cancel_handle)
+
+    def _cancel_handle(self):
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+
+class AsyncProcess:
+    """
+    asyncio 子进程的同步外观，供 ServerController 在任意线程中使用。
+
+    输出由事件循环中的读取任务按块读取、解码为行后交给 on_lines(lines)，
+    进程结束后调用 on_exit(self)；两个回调都在事件循环线程中执行。
+    write() 不阻塞：数据进入写队列，由写任务 write + drain 依次写出。
+    """
+
+    def __init__(self, loop_thread, proc, on_lines, on_exit,
+                 encoding="utf-8", errors="replace", backlog=None):
+        """
+        :param backlog: backlog() -> int，界面尚未处理的输出行数，用于读取背压
+        """
+        self.loop_thread = loop_thread
+        self.proc = proc
+        self.pid = proc.pid
+        self.on_lines = on_lines
+        self.on_exit = on_exit
+        self.encoding = encoding
+        self.errors = errors
+        self.backlog = backlog
+        self._queue = asyncio.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._reader = loop_thread.loop.create_task(self._read_loop())
+        self._writer = loop_thread.loop.create_task(self._write_loop())
+
+    @classmethod
+    def spawn(cls, cmd, on_lines, on_exit, cwd=None, encoding="utf-8", errors="replace",
+              backlog=None, loop_thread=None, **popen_args):
+        """启动进程并返回 AsyncProcess（阻塞到进程创建完成）"""
+        loop_thread = loop_thread or shared_loop()
+        if loop_thread.in_loop():
+            raise RuntimeError("不能在事件循环线程中同步启动进程")
+
+        async def create():
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=cwd,
+                **popen_args
+            )
+            return cls(loop_thread, proc, on_lines, on_exit, encoding, errors, backlog)
+
+        return loop_thread.submit(create()).result()
+
+    @property
+    def returncode(self):
+        return self.proc.returncode
+
+    def poll(self):
+        return self.proc.returncode
+
+    # ---------------- 读取 ----------------
+    async def _read_loop(self):
+        decoder = LineDecoder(self.encoding, self.errors)
+        stdout = self.proc.stdout
+        try:
+            while True:
+                if self.backlog:
+                    while self.backlog() > READ_HIGH_WATER:
+                        await asyncio.sleep(BACKPRESSURE_INTERVAL)
+                data = await stdout.read(CHUNK_SIZE)
+                if not data:
+                    break
+                lines = decoder.feed(data)
+                if lines:
+                    self.on_lines(lines)
+            lines = decoder.flush()
+            if lines:
+                self.on_lines(lines)
+        except Exception as e:
+            print(f"读取服务器输出失败: {e}")
+        await self.proc.wait()
+        self._queue.put_nowait(None)
+        self.on_exit(self)
+
+    # ---------------- 写入 ----------------
+    def write(self, data):
+        """把字节放入写队列（任意线程可调用，不阻塞）"""
+        with self._pending_lock:
+            if self._pending + len(data) > MAX_PENDING_WRITE:
+                raise BlockingIOError("服务器未读取输入，写入缓冲已满")
+            self._pending += len(data)
+        self.loop_thread.call(self._queue.put_nowait, bytes(data))
+
+    def pending_write(self):
+        return self._pending
+
+    async def _write_loop(self):
+        stdin = self.proc.stdin
+        while True:
+            data = await self._queue.get()
+            if data is None:
+                break
+            try:
+                stdin.write(data)
+                # 管道写满时在这里等待服务器读取，不阻塞其他服务器
+                await stdin.drain()
+            except (BrokenPipeError, ConnectionResetError, OSError):
+                break
+            finally:
+                with self._pending_lock:
+                    self._pending -= len(data)
+        try:
+            stdin.close()
+        except Exception:
+            pass
+
+    # ---------------- 进程控制 ----------------
+    def terminate(self):
+        self.loop_thread.call(self._signal, "terminate")
+
+    def kill(self):
+        self.loop_thread.call(self._signal, "kill")
+
+    def _signal(self, action):
+        if self.proc.returncode is not None:
+            return
+        try:
+            getattr(self.proc, action)()
+        except ProcessLookupError:
+            pass
+
+    def wait(self, timeout=None):
+        """与 subprocess.Popen.wait 相同：超时抛出 subprocess.TimeoutExpired（不可在事件循环线程中调用）"""
+        future = self.loop_thread.submit(self.proc.wait())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise subprocess.TimeoutExpired(self.proc.pid, timeout)
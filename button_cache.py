@@ -0,0 +1,109 @@
+# button_cache.py
+import collections
+import functools
+from PIL import Image, ImageDraw, ImageTk
+
+# 进程内最多缓存的按钮图像数（每张约 宽×高×4 字节）
+DEFAULT_MAX_IMAGES = 128
+
+
+@functools.lru_cache(maxsize=64)
+def rounded_masks(width, height, radius, border_width):
+    """返回 (整体圆角蒙版, 内部圆角蒙版)；同尺寸的普通/按下图像共用"""
+    outer = Image.new('L', (width, height), 0)
+    ImageDraw.Draw(outer).rounded_rectangle([(0, 0), (width-1, height-1)], radius=radius, fill=255)
+    inner_width = width - 2 * border_width
+    inner_height = height - 2 * border_width
+    inner = None
+    if inner_width > 0 and inner_height > 0:
+        inner = Image.new('L', (inner_width, inner_height), 0)
+        ImageDraw.Draw(inner).rounded_rectangle(
+            [(0, 0), (inner_width-1, inner_height-1)],
+            radius=max(0, radius - border_width), fill=255
+        )
+    return outer, inner
+
+
+@functools.lru_cache(maxsize=16)
+def _gradient_mask(height):
+    """高度为 height 的竖直渐变（顶部 0，底部 255），由 Image.linear_gradient 缩放得到"""
+    return Image.linear_gradient('L').resize((1, height), Image.BILINEAR)
+
+
+def gradient_fill(size, start_color, end_color):
+    """整块生成竖直渐变：第一行为 start_color，最后一行为 end_color"""
+    width, height = size
+    start = Image.new('RGB', (1, height), start_color)
+    end = Image.new('RGB', (1, height), end_color)
+    column = Image.composite(end, start, _gradient_mask(height))
+    return column.resize((width, height), Image.NEAREST)
+
+
+def render_rounded(width, height, fill, border_color, border_width, radius):
+    """
+    合成带圆角和边框的按钮图像（RGBA）。
+
+    :param fill: 内部颜色（RGB 元组），或 (宽, 高) -> Image 的函数（如渐变）
+    """
+    outer, inner = rounded_masks(width, height, radius, border_width)
+    img = Image.new('RGB', (width, height), border_color)
+    if inner is not None:
+        if callable(fill):
+            inner_img = fill(inner.size)
+        else:
+            inner_img = Image.new('RGB', inner.size, fill)
+        img.paste(inner_img, (border_width, border_width), inner)
+    img.putalpha(outer)
+    return img
+
+
+class PhotoImageCache:
+    """
+    进程内共享的按钮图像 LRU 缓存：键相同（尺寸、颜色、圆角、边框）的按钮共用一张 PhotoImage。
+
+    被淘汰的图像若仍有按钮在用，由按钮自身的引用保持有效。仅主线程使用。
+    """
+
+    def __init__(self, max_images=DEFAULT_MAX_IMAGES):
+        self.max_images = max_images
+        self._images = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """返回 key 对应的 PhotoImage，没有时调用 render() 生成 PIL 图像并转换"""
+        photo = self._images.get(key)
+        if photo is not None:
+            self._images.move_to_end(key)
+            self.hits += 1
+            return photo
+        self.misses += 1
+        photo = ImageTk.PhotoImage(render())
+        self._images[key] = photo
+        while len(self._images) > self.max_images:
+            self._images.popitem(last=False)
+        return photo
+
+    def clear(self):
+        self._images.clear()
+
+
+_cache = PhotoImageCache()
+
+
+def shared_cache():
+    return _cache
+
+
+def solid_image(width, height, color, border_color, border_width, radius):
+    key = ("solid", width, height, tuple(color), tuple(border_color), border_width, radius)
+    return _cache.get(key, lambda: render_rounded(width, height, tuple(color), tuple(border_color),
+                                                  border_width, radius))
+
+
+def gradient_image(width, height, start_color, end_color, border_color, border_width, radius):
+    key = ("gradient", width, height, tuple(start_color), tuple(end_color),
+           tuple(border_color), border_width, radius)
+    fill = lambda size: gradient_fill(size, tuple(start_color), tuple(end_color))
+    return _cache.get(key, lambda: render_rounded(width, height, fill, tuple(border_color),
+                                                  border_width, radius))
@@ -1,258 +1,474 @@
-import tkinter as tk
-from tkinter import font
-from PIL import Image, ImageDraw, ImageTk
-import colorsys
-
-class ColorPicker(tk.Frame):
-    """调色盘组件，包含色相条、饱和度/亮度平面及颜色预览块。"""
-
-    def __init__(self, master, initial_color='#ff0000', scale=1.0,
-                 on_color_change=None, **kwargs):
-        super().__init__(master, **kwargs)
-        self.scale = scale
-        self.on_color_change = on_color_change
-
-        self.hue = 0.0
-        self.saturation = 1.0
-        self.value = 1.0
-
-        # 基础尺寸（未缩放）
-        base_palette = 200
-        base_bar_width = 200
-        base_bar_height = 30
-        base_display_width = 90
-        base_display_height = 35
-        gap = 5
-
-        # 缩放后尺寸
-        self.palette_width = int(base_palette * scale)
-        self.palette_height = int(base_palette * scale)
-        self.bar_width = int(base_bar_width * scale)
-        self.bar_height = int(base_bar_height * scale)
-        self.display_width = int(base_display_width * scale)
-        self.display_height = int(base_display_height * scale)
-        self.gap = int(gap * scale)
-
-        # 整体框架尺寸
-        total_width = self.palette_width + self.display_width + 3 * self.gap
-        total_height = self.palette_height + self.bar_height + 3 * self.gap
-        self.config(width=total_width, height=total_height)
-        self.grid_propagate(False)
-
-        # 创建字体（微软雅黑，按比例缩放）
-        self.label_font = font.Font(family='Microsoft YaHei', size=int(10 * scale))
-
-        self._create_palette()
-        self._create_hue_bar()
-        self._create_displays()
-
-        self.set_color(initial_color)
-
-    # ------------------------------------------------------------------
-    def _create_palette(self):
-        self.canvas_palette = tk.Canvas(self, width=self.palette_width,
-                                        height=self.palette_height,
-                                        highlightthickness=1,
-                                        highlightbackground='gray')
-        self.canvas_palette.place(x=self.gap, y=self.gap)
-        self.canvas_palette.bind('<Button-1>', self._on_palette_click)
-        self.canvas_palette.bind('<B1-Motion>', self._on_palette_drag)
-
-        marker_size = 5 * self.scale
-        self.palette_marker = self.canvas_palette.create_oval(
-            0, 0, marker_size, marker_size,
-            outline='white', width=2)
-
-    def _create_hue_bar(self):
-        y = self.gap + self.palette_height + self.gap
-        self.canvas_hue = tk.Canvas(self, width=self.bar_width,
-                                    height=self.bar_height,
-                                    highlightthickness=1,
-                                    highlightbackground='gray')
-        self.canvas_hue.place(x=self.gap, y=y)
-        self.canvas_hue.bind('<Button-1>', self._on_hue_click)
-        self.canvas_hue.bind('<B1-Motion>', self._on_hue_drag)
-
-        self.hue_marker = self.canvas_hue.create_line(
-            0, 0, 0, self.bar_height, fill='white', width=3)
-
-    def _create_displays(self):
-        x = self.gap + self.palette_width + self.gap
-        y = self.gap
-
-        # R 标签
-        self.r_label = tk.Label(self, text='R:', anchor='w',
-                                relief='solid', borderwidth=1,
-                                font=self.label_font, bg='lightgray')
-        self.r_label.place(x=x, y=y,
-                           width=self.display_width,
-                           height=self.display_height)
-        y += self.display_height + self.gap
-
-        # G 标签
-        self.g_label = tk.Label(self, text='G:', anchor='w',
-                                relief='solid', borderwidth=1,
-                                font=self.label_font, bg='lightgray')
-        self.g_label.place(x=x, y=y,
-                           width=self.display_width,
-                           height=self.display_height)
-        y += self.display_height + self.gap
-
-        # B 标签
-        self.b_label = tk.Label(self, text='B:', anchor='w',
-                                relief='solid', borderwidth=1,
-                                font=self.label_font, bg='lightgray')
-        self.b_label.place(x=x, y=y,
-                           width=self.display_width,
-                           height=self.display_height)
-        y += self.display_height + self.gap
-
-        # HEX 标签
-        self.hex_label = tk.Label(self, text='HEX:', anchor='w',
-                                  relief='solid', borderwidth=1,
-                                  font=self.label_font, bg='lightgray')
-        self.hex_label.place(x=x, y=y,
-                             width=self.display_width,
-                             height=self.display_height)
-        y += self.display_height + self.gap
-
-        # 颜色预览块（无文字，背景动态变化）
-        self.color_preview = tk.Label(self, text='', anchor='center',
-                                      relief='solid', borderwidth=2,
-                                      font=self.label_font, bg='#ffffff')
-        self.color_preview.place(x=x, y=y,
-                                 width=self.display_width,
-                                 height=self.display_height)
-
-    # ------------------------------------------------------------------
-    def _on_hue_click(self, event):
-        self._update_hue_from_event(event)
-        self._update_palette_image()
-        self._update_color()
-
-    def _on_hue_drag(self, event):
-        self._update_hue_from_event(event)
-        self._update_palette_image()
-        self._update_color()
-
-    def _update_hue_from_event(self, event):
-        x = max(0, min(event.x, self.bar_width - 1))
-        self.hue = (x / (self.bar_width - 1)) * 360.0
-        self.canvas_hue.coords(self.hue_marker, x, 0, x, self.bar_height)
-
-    def _on_palette_click(self, event):
-        self._update_sv_from_event(event)
-        self._update_color()
-
-    def _on_palette_drag(self, event):
-        self._update_sv_from_event(event)
-        self._update_color()
-
-    def _update_sv_from_event(self, event):
-        x = max(0, min(event.x, self.palette_width - 1))
-        y = max(0, min(event.y, self.palette_height - 1))
-        self.saturation = x / (self.palette_width - 1)
-        self.value = 1.0 - (y / (self.palette_height - 1))
-
-        marker_size = 5 * self.scale
-        self.canvas_palette.coords(
-            self.palette_marker,
-            x - marker_size/2, y - marker_size/2,
-            x + marker_size/2, y + marker_size/2
-        )
-
-    # ------------------------------------------------------------------
-    def _update_color(self):
-        r, g, b = self.get_rgb()
-        hex_str = self.get_hex()
-
-        self.r_label.config(text=f'R:{r}')
-        self.g_label.config(text=f'G:{g}')
-        self.b_label.config(text=f'B:{b}')
-        self.hex_label.config(text=f'HEX: {hex_str}')
-
-        # 预览块只改变背景色
-        fg = 'white' if (r*0.299 + g*0.587 + b*0.114) < 140 else 'black'
-        self.color_preview.config(bg=hex_str, fg=fg)
-
-        if self.on_color_change:
-            self.on_color_change(hex_str)
-
-    def _update_palette_image(self):
-        img = Image.new('RGB', (self.palette_width, self.palette_height))
-        draw = ImageDraw.Draw(img)
-        for x in range(self.palette_width):
-            s = x / (self.palette_width - 1)
-            for y in range(self.palette_height):
-                v = 1.0 - (y / (self.palette_height - 1))
-                r, g, b = colorsys.hsv_to_rgb(self.hue/360.0, s, v)
-                draw.point((x, y), fill=(int(r*255), int(g*255), int(b*255)))
-        self.palette_image = ImageTk.PhotoImage(img)
-        self.canvas_palette.create_image(0, 0, image=self.palette_image, anchor='nw')
-
-    def _update_hue_bar_image(self):
-        img = Image.new('RGB', (self.bar_width, self.bar_height))
-        draw = ImageDraw.Draw(img)
-        for x in range(self.bar_width):
-            hue = (x / (self.bar_width - 1)) * 360.0
-            r, g, b = colorsys.hsv_to_rgb(hue/360.0, 1.0, 1.0)
-            draw.rectangle([x, 0, x+1, self.bar_height],
-                           fill=(int(r*255), int(g*255), int(b*255)))
-        self.hue_bar_image = ImageTk.PhotoImage(img)
-        self.canvas_hue.create_image(0, 0, image=self.hue_bar_image, anchor='nw')
-
-    # ------------------------------------------------------------------
-    def get_rgb(self):
-        r, g, b = colorsys.hsv_to_rgb(self.hue/360.0, self.saturation, self.value)
-        return (int(r*255), int(g*255), int(b*255))
-
-    def get_hex(self):
-        return '#{:02x}{:02x}{:02x}'.format(*self.get_rgb())
-
-    def get_hsv(self):
-        return (self.hue, self.saturation, self.value)
-
-    def set_color(self, color):
-        if isinstance(color, str):
-            if color.startswith('#'):
-                color = color.lstrip('#')
-                rgb = tuple(int(color[i:i+2], 16) for i in (0, 2, 4))
-            else:
-                raise ValueError("Unsupported color string format")
-        elif isinstance(color, (tuple, list)) and len(color) == 3:
-            rgb = tuple(color)
-        else:
-            raise TypeError("color must be a hex string or RGB tuple")
-
-        r, g, b = [x/255.0 for x in rgb]
-        h, s, v = colorsys.rgb_to_hsv(r, g, b)
-        self.hue = h * 360.0
-        self.saturation = s
-        self.value = v
-
-        self._update_hue_bar_image()
-        self._update_palette_image()
-        self._update_color()
-        self._sync_markers()
-
-    def _sync_markers(self):
-        x_hue = int((self.hue / 360.0) * (self.bar_width - 1))
-        self.canvas_hue.coords(self.hue_marker, x_hue, 0, x_hue, self.bar_height)
-
-        x_s = int(self.saturation * (self.palette_width - 1))
-        y_v = int((1.0 - self.value) * (self.palette_height - 1))
-        marker_size = 5 * self.scale
-        self.canvas_palette.coords(
-            self.palette_marker,
-            x_s - marker_size/2, y_v - marker_size/2,
-            x_s + marker_size/2, y_v + marker_size/2
-        )
-
-# ----------------------------------------------------------------------
-if __name__ == '__main__':
-    root = tk.Tk()
-    root.title("ColorPicker")
-    picker = ColorPicker(root, initial_color='#3a6ea5', scale=1.0,
-                         on_color_change=lambda c: print("Color:", c))
-    picker.pack(padx=5, pady=5)
+import collections
+import queue
+import threading
+import tkinter as tk
+from tkinter import font
+from PIL import Image, ImageChops, ImageTk
+import colorsys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# 拖动时最多每帧重绘一次（毫秒）
+FRAME_MS = 16
+# 调色盘按色相量化缓存（度）：scale 1 时色相条每像素约 1.8 度，2 度的差别看不出来
+HUE_QUANTUM = 2
+# 调色盘缓存的内存上限（字节，按每像素 4 字节估算）
+PALETTE_CACHE_BYTES = 48 * 1024 * 1024
+# 后台预渲染时每次转换多少张、间隔多久（PhotoImage 只能在主线程创建）
+PRERENDER_BATCH = 4
+PRERENDER_POLL_MS = 30
+
+
+def _ramp(length, reverse=False):
+    """长度为 length 的 0→255（reverse 时 255→0）线性渐变字节"""
+    if length <= 1:
+        return bytes([255 if reverse else 0] * max(length, 1))
+    values = bytes(round(255 * i / (length - 1)) for i in range(length))
+    return values[::-1] if reverse else values
+
+
+def hue_color(hue):
+    """色相（0-360）对应的纯色 RGB"""
+    r, g, b = colorsys.hsv_to_rgb((hue / 360.0) % 1.0, 1.0, 1.0)
+    return (int(r*255), int(g*255), int(b*255))
+
+
+class SVLayers:
+    """
+    某一尺寸的饱和度/亮度平面所需的预计算图层，换色相时只做整图运算：
+    像素 = 亮度 × (白色 与 色相纯色 按饱和度混合)。
+    """
+
+    def __init__(self, width, height):
+        self.size = (width, height)
+        # 饱和度：从左到右 0→255；亮度：从上到下 255→0
+        self.saturation = Image.frombytes('L', (width, 1), _ramp(width)).resize(self.size, Image.NEAREST)
+        value = Image.frombytes('L', (1, height), _ramp(height, reverse=True)).resize(self.size, Image.NEAREST)
+        self.value = Image.merge('RGB', (value, value, value))
+        self.white = Image.new('RGB', self.size, (255, 255, 255))
+        if numpy is not None:
+            self._s = numpy.linspace(0.0, 1.0, width, dtype=numpy.float32)[None, :, None]
+            self._v = numpy.linspace(1.0, 0.0, height, dtype=numpy.float32)[:, None, None]
+
+    def render(self, hue):
+        color = hue_color(hue)
+        if numpy is not None:
+            c = numpy.array(color, dtype=numpy.float32)[None, None, :]
+            arr = self._v * ((1.0 - self._s) * 255.0 + self._s * c)
+            return Image.fromarray(arr.astype(numpy.uint8), 'RGB')
+        mixed = Image.composite(Image.new('RGB', self.size, color), self.white, self.saturation)
+        return ImageChops.multiply(mixed, self.value)
+
+
+def quantize_hue(hue):
+    return int(round((hue % 360.0) / HUE_QUANTUM)) * HUE_QUANTUM % 360
+
+
+class PaletteCache:
+    """
+    饱和度/亮度平面的 LRU 缓存：键为 (量化后的色相, 宽, 高)，尺寸由 scale 决定。
+
+    按每张 宽×高×4 字节统计占用，超过 max_bytes 时淘汰最久未用的。仅主线程使用。
+    """
+
+    def __init__(self, max_bytes=PALETTE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._images = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cost(size):
+        return size[0] * size[1] * 4
+
+    def __contains__(self, key):
+        return key in self._images
+
+    def get(self, key):
+        photo = self._images.get(key)
+        if photo is None:
+            self.misses += 1
+            return None
+        self._images.move_to_end(key)
+        self.hits += 1
+        return photo
+
+    def put(self, key, photo, size):
+        if key in self._images:
+            return
+        self._images[key] = photo
+        self.bytes += self.cost(size)
+        while self.bytes > self.max_bytes and len(self._images) > 1:
+            old_key, _ = self._images.popitem(last=False)
+            self.bytes -= self.cost(old_key[1:])
+
+    def room(self, size):
+        """在不淘汰任何图像的前提下还能放下几张该尺寸的平面"""
+        return max(0, (self.max_bytes - self.bytes) // self.cost(size))
+
+    def clear(self):
+        self._images.clear()
+        self.bytes = 0
+
+
+_palette_cache = PaletteCache()
+# 色相条与尺寸一一对应，每个尺寸只生成一次
+_hue_bars = {}
+
+
+def shared_palette_cache():
+    return _palette_cache
+
+
+def render_hue_bar(width, height):
+    """色相条：逐列计算一行像素后整体拉伸到 height 行"""
+    row = bytearray()
+    for x in range(width):
+        row.extend(hue_color(x / max(width - 1, 1) * 360.0))
+    return Image.frombytes('RGB', (width, 1), bytes(row)).resize((width, height), Image.NEAREST)
+
+class ColorPicker(tk.Frame):
+    """调色盘组件，包含色相条、饱和度/亮度平面及颜色预览块。"""
+
+    def __init__(self, master, initial_color='#ff0000', scale=1.0,
+                 on_color_change=None, prerender=False, **kwargs):
+        """
+        :param prerender: 为 True 时在后台线程预先渲染各色相的调色盘（不超出缓存上限）
+        """
+        super().__init__(master, **kwargs)
+        self.scale = scale
+        self.on_color_change = on_color_change
+
+        self.hue = 0.0
+        self.saturation = 1.0
+        self.value = 1.0
+        self.palette_image = None
+        self.hue_bar_image = None
+        # 拖动时的重绘合并到下一帧：None 表示没有待重绘
+        self._redraw_job = None
+        self._palette_dirty = False
+
+        # 基础尺寸（未缩放）
+        base_palette = 200
+        base_bar_width = 200
+        base_bar_height = 30
+        base_display_width = 90
+        base_display_height = 35
+        gap = 5
+
+        # 缩放后尺寸
+        self.palette_width = int(base_palette * scale)
+        self.palette_height = int(base_palette * scale)
+        self.bar_width = int(base_bar_width * scale)
+        self.bar_height = int(base_bar_height * scale)
+        self.display_width = int(base_display_width * scale)
+        self.display_height = int(base_display_height * scale)
+        self.gap = int(gap * scale)
+
+        # 整体框架尺寸
+        total_width = self.palette_width + self.display_width + 3 * self.gap
+        total_height = self.palette_height + self.bar_height + 3 * self.gap
+        self.config(width=total_width, height=total_height)
+        self.grid_propagate(False)
+
+        # 创建字体（微软雅黑，按比例缩放）
+        self.label_font = font.Font(family='Microsoft YaHei', size=int(10 * scale))
+
+        self._create_palette()
+        self._create_hue_bar()
+        self._create_displays()
+        self._sv_layers = SVLayers(self.palette_width, self.palette_height)
+        self._prerender_queue = None
+        self._prerender_stop = threading.Event()
+
+        self._update_hue_bar_image()
+        self.set_color(initial_color)
+        if prerender:
+            self.start_prerender()
+
+    # ------------------------------------------------------------------
+    def _create_palette(self):
+        self.canvas_palette = tk.Canvas(self, width=self.palette_width,
+                                        height=self.palette_height,
+                                        highlightthickness=1,
+                                        highlightbackground='gray')
+        self.canvas_palette.place(x=self.gap, y=self.gap)
+        self.canvas_palette.bind('<Button-1>', self._on_palette_click)
+        self.canvas_palette.bind('<B1-Motion>', self._on_palette_drag)
+        # 图像项只创建一次，之后换图；放在标记下面
+        self.palette_item = self.canvas_palette.create_image(0, 0, anchor='nw')
+
+        marker_size = 5 * self.scale
+        self.palette_marker = self.canvas_palette.create_oval(
+            0, 0, marker_size, marker_size,
+            outline='white', width=2)
+
+    def _create_hue_bar(self):
+        y = self.gap + self.palette_height + self.gap
+        self.canvas_hue = tk.Canvas(self, width=self.bar_width,
+                                    height=self.bar_height,
+                                    highlightthickness=1,
+                                    highlightbackground='gray')
+        self.canvas_hue.place(x=self.gap, y=y)
+        self.canvas_hue.bind('<Button-1>', self._on_hue_click)
+        self.canvas_hue.bind('<B1-Motion>', self._on_hue_drag)
+        self.hue_item = self.canvas_hue.create_image(0, 0, anchor='nw')
+
+        self.hue_marker = self.canvas_hue.create_line(
+            0, 0, 0, self.bar_height, fill='white', width=3)
+
+    def _create_displays(self):
+        x = self.gap + self.palette_width + self.gap
+        y = self.gap
+
+        # R 标签
+        self.r_label = tk.Label(self, text='R:', anchor='w',
+                                relief='solid', borderwidth=1,
+                                font=self.label_font, bg='lightgray')
+        self.r_label.place(x=x, y=y,
+                           width=self.display_width,
+                           height=self.display_height)
+        y += self.display_height + self.gap
+
+        # G 标签
+        self.g_label = tk.Label(self, text='G:', anchor='w',
+                                relief='solid', borderwidth=1,
+                                font=self.label_font, bg='lightgray')
+        self.g_label.place(x=x, y=y,
+                           width=self.display_width,
+                           height=self.display_height)
+        y += self.display_height + self.gap
+
+        # B 标签
+        self.b_label = tk.Label(self, text='B:', anchor='w',
+                                relief='solid', borderwidth=1,
+                                font=self.label_font, bg='lightgray')
+        self.b_label.place(x=x, y=y,
+                           width=self.display_width,
+                           height=self.display_height)
+        y += self.display_height + self.gap
+
+        # HEX 标签
+        self.hex_label = tk.Label(self, text='HEX:', anchor='w',
+                                  relief='solid', borderwidth=1,
+                                  font=self.label_font, bg='lightgray')
+        self.hex_label.place(x=x, y=y,
+                             width=self.display_width,
+                             height=self.display_height)
+        y += self.display_height + self.gap
+
+        # 颜色预览块（无文字，背景动态变化）
+        self.color_preview = tk.Label(self, text='', anchor='center',
+                                      relief='solid', borderwidth=2,
+                                      font=self.label_font, bg='#ffffff')
+        self.color_preview.place(x=x, y=y,
+                                 width=self.display_width,
+                                 height=self.display_height)
+
+    # ------------------------------------------------------------------
+    def _on_hue_click(self, event):
+        self._update_hue_from_event(event)
+        self._cancel_redraw()
+        self._update_palette_image()
+        self._update_color()
+
+    def _on_hue_drag(self, event):
+        # 标记立即移动，调色盘与颜色显示合并到下一帧重绘
+        self._update_hue_from_event(event)
+        self._schedule_redraw(palette=True)
+
+    def _schedule_redraw(self, palette=False):
+        self._palette_dirty = self._palette_dirty or palette
+        if self._redraw_job is None:
+            self._redraw_job = self.after(FRAME_MS, self._redraw)
+
+    def _cancel_redraw(self):
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+            self._redraw_job = None
+            self._palette_dirty = False
+
+    def _redraw(self):
+        self._redraw_job = None
+        if self._palette_dirty:
+            self._palette_dirty = False
+            self._update_palette_image()
+        self._update_color()
+
+    def _update_hue_from_event(self, event):
+        x = max(0, min(event.x, self.bar_width - 1))
+        self.hue = (x / (self.bar_width - 1)) * 360.0
+        self.canvas_hue.coords(self.hue_marker, x, 0, x, self.bar_height)
+
+    def _on_palette_click(self, event):
+        self._update_sv_from_event(event)
+        self._update_color()
+
+    def _on_palette_drag(self, event):
+        self._update_sv_from_event(event)
+        self._schedule_redraw()
+
+    def _update_sv_from_event(self, event):
+        x = max(0, min(event.x, self.palette_width - 1))
+        y = max(0, min(event.y, self.palette_height - 1))
+        self.saturation = x / (self.palette_width - 1)
+        self.value = 1.0 - (y / (self.palette_height - 1))
+
+        marker_size = 5 * self.scale
+        self.canvas_palette.coords(
+            self.palette_marker,
+            x - marker_size/2, y - marker_size/2,
+            x + marker_size/2, y + marker_size/2
+        )
+
+    # ------------------------------------------------------------------
+    def _update_color(self):
+        r, g, b = self.get_rgb()
+        hex_str = self.get_hex()
+
+        self.r_label.config(text=f'R:{r}')
+        self.g_label.config(text=f'G:{g}')
+        self.b_label.config(text=f'B:{b}')
+        self.hex_label.config(text=f'HEX: {hex_str}')
+
+        # 预览块只改变背景色
+        fg = 'white' if (r*0.299 + g*0.587 + b*0.114) < 140 else 'black'
+        self.color_preview.config(bg=hex_str, fg=fg)
+
+        if self.on_color_change:
+            self.on_color_change(hex_str)
+
+    def _palette_key(self, hue):
+        return (quantize_hue(hue), self.palette_width, self.palette_height)
+
+    def _update_palette_image(self):
+        key = self._palette_key(self.hue)
+        photo = _palette_cache.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(self._sv_layers.render(key[0]))
+            _palette_cache.put(key, photo, self._sv_layers.size)
+        self.palette_image = photo
+        self.canvas_palette.itemconfig(self.palette_item, image=self.palette_image)
+
+    def _update_hue_bar_image(self):
+        size = (self.bar_width, self.bar_height)
+        photo = _hue_bars.get(size)
+        if photo is None:
+            photo = _hue_bars[size] = ImageTk.PhotoImage(render_hue_bar(*size))
+        self.hue_bar_image = photo
+        self.canvas_hue.itemconfig(self.hue_item, image=self.hue_bar_image)
+
+    # ------------------------------------------------------------------
+    def start_prerender(self):
+        """
+        后台线程按离当前色相由近到远渲染尚未缓存的调色盘，主线程分批转换为 PhotoImage；
+        只填充缓存的空余部分，不淘汰已有图像。
+        """
+        if self._prerender_queue is not None:
+            return
+        size = self._sv_layers.size
+        current = quantize_hue(self.hue)
+        hues = sorted(range(0, 360, HUE_QUANTUM),
+                      key=lambda h: min(abs(h - current), 360 - abs(h - current)))
+        hues = [h for h in hues if (h,) + size not in _palette_cache][:_palette_cache.room(size)]
+        if not hues:
+            return
+        results = self._prerender_queue = queue.Queue()
+        layers = self._sv_layers
+
+        def worker():
+            for hue in hues:
+                if self._prerender_stop.is_set():
+                    break
+                try:
+                    results.put((hue, layers.render(hue)))
+                except Exception as e:
+                    print(f"预渲染调色盘失败: {e}")
+                    break
+            results.put(None)
+
+        threading.Thread(target=worker, name="palette-prerender", daemon=True).start()
+        self.after(PRERENDER_POLL_MS, self._drain_prerender)
+
+    def _drain_prerender(self):
+        if self._prerender_stop.is_set():
+            return
+        size = self._sv_layers.size
+        for _ in range(PRERENDER_BATCH):
+            try:
+                item = self._prerender_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._prerender_queue = None
+                return
+            hue, img = item
+            key = (hue,) + size
+            if key not in _palette_cache and _palette_cache.room(size):
+                _palette_cache.put(key, ImageTk.PhotoImage(img), size)
+        self.after(PRERENDER_POLL_MS, self._drain_prerender)
+
+    def destroy(self):
+        self._prerender_stop.set()
+        self._cancel_redraw()
+        super().destroy()
+
+    # ------------------------------------------------------------------
+    def get_rgb(self):
+        r, g, b = colorsys.hsv_to_rgb(self.hue/360.0, self.saturation, self.value)
+        return (int(r*255), int(g*255), int(b*255))
+
+    def get_hex(self):
+        return '#{:02x}{:02x}{:02x}'.format(*self.get_rgb())
+
+    def get_hsv(self):
+        return (self.hue, self.saturation, self.value)
+
+    def set_color(self, color):
+        if isinstance(color, str):
+            if color.startswith('#'):
+                color = color.lstrip('#')
+                rgb = tuple(int(color[i:i+2], 16) for i in (0, 2, 4))
+            else:
+                raise ValueError("Unsupported color string format")
+        elif isinstance(color, (tuple, list)) and len(color) == 3:
+            rgb = tuple(color)
+        else:
+            raise TypeError("color must be a hex string or RGB tuple")
+
+        r, g, b = [x/255.0 for x in rgb]
+        h, s, v = colorsys.rgb_to_hsv(r, g, b)
+        self.hue = h * 360.0
+        self.saturation = s
+        self.value = v
+
+        self._cancel_redraw()
+        self._update_palette_image()
+        self._update_color()
+        self._sync_markers()
+
+    def _sync_markers(self):
+        x_hue = int((self.hue / 360.0) * (self.bar_width - 1))
+        self.canvas_hue.coords(self.hue_marker, x_hue, 0, x_hue, self.bar_height)
+
+        x_s = int(self.saturation * (self.palette_width - 1))
+        y_v = int((1.0 - self.value) * (self.palette_height - 1))
+        marker_size = 5 * self.scale
+        self.canvas_palette.coords(
+            self.palette_marker,
+            x_s - marker_size/2, y_v - marker_size/2,
+            x_s + marker_size/2, y_v + marker_size/2
+        )
+
+# ----------------------------------------------------------------------
+if __name__ == '__main__':
+    root = tk.Tk()
+    root.title("ColorPicker")
+    picker = ColorPicker(root, initial_color='#3a6ea5', scale=1.0,
+                         on_color_change=lambda c: print("Color:", c))
+    picker.pack(padx=5, pady=5)
     root.mainloop()
\ No newline at end of file
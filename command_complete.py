@@ -0,0 +1,326 @@
+# command_complete.py
+import json
+import os
+import re
+import threading
+import tkinter as tk
+
+from server_controller import CommandTimeout
+
+# 持久化的指令历史条数上限
+HISTORY_LIMIT = 500
+HELP_CACHE_VERSION = 1
+# help 回复以静默多久视为结束（秒）与总超时；只有属于回复的行才重置静默计时
+HELP_IDLE = 0.5
+HELP_TIMEOUT = 10
+# help 回复最多收集的行数（超过即结束）
+HELP_MAX_LINES = 300
+HELP_HEADER = "Commands:"
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+# "  host [mapname] [mode] - Open the server..."
+_HELP_LINE_RE = re.compile(r"^([\w-]+)((?:\s+[\[<][^\]>]*[\]>])*)\s+-\s+(.*)$")
+_ARG_RE = re.compile(r"[\[<][^\]>]*[\]>]")
+
+
+class _HelpReply:
+    """help 回复的行（标题行与 "name [args] - 说明" 行）与结束条件（收集满 HELP_MAX_LINES 行）"""
+
+    def __init__(self):
+        self.count = 0
+
+    @staticmethod
+    def belongs(record):
+        text = _ANSI_RE.sub("", record.message).strip()
+        return text == HELP_HEADER or bool(_HELP_LINE_RE.match(text))
+
+    def __call__(self, record):
+        self.count += 1
+        return self.count >= HELP_MAX_LINES
+
+
+def parse_help(records):
+    """
+    把 help 的回复（LogRecord 列表）解析为指令列表。
+
+    :return: [{"name": 指令名, "args": ["[mapname]", "<on/off>", ...], "help": 说明}]
+    """
+    commands = []
+    for record in records:
+        # 参数写作 [mapname]，与颜色标记同形，这里只去掉 ANSI 转义
+        text = _ANSI_RE.sub("", record.message).strip()
+        m = _HELP_LINE_RE.match(text)
+        if m:
+            commands.append({"name": m.group(1), "args": _ARG_RE.findall(m.group(2)),
+                             "help": m.group(3)})
+    return commands
+
+
+class _Node:
+    __slots__ = ("children", "words")
+
+    def __init__(self):
+        self.children = {}
+        self.words = []
+
+
+class Trie:
+    """前缀树（不区分大小写），complete(prefix) 返回以 prefix 开头的原始词，按字母序"""
+
+    def __init__(self, words=()):
+        self.root = _Node()
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word):
+        node = self.root
+        for ch in word.lower():
+            node = node.children.setdefault(ch, _Node())
+        if word not in node.words:
+            node.words.append(word)
+
+    def complete(self, prefix, limit=None):
+        node = self.root
+        for ch in prefix.lower():
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        result = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            result.extend(node.words)
+            if limit is not None and len(result) >= limit:
+                break
+            # 逆序入栈，出栈时按字母序
+            stack.extend(node.children[ch] for ch in sorted(node.children, reverse=True))
+        return sorted(result, key=str.lower)[:limit]
+
+
+def common_prefix(words):
+    """不区分大小写的最长公共前缀（取第一个词的原始大小写）"""
+    if not words:
+        return ""
+    first = words[0]
+    length = len(first)
+    for word in words[1:]:
+        i = 0
+        while i < length and i < len(word) and word[i].lower() == first[i].lower():
+            i += 1
+        length = i
+    return first[:length]
+
+
+class CommandHelpCache:
+    """
+    按 jar 版本缓存 help 解析出的指令表（JSON 文件）。
+
+    每个 jar 版本只在服务器第一次就绪后静默发送一次 help，之后直接读缓存。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._tries = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._jars = data.get("jars", {}) if data.get("version") == HELP_CACHE_VERSION else {}
+        except (OSError, ValueError):
+            self._jars = {}
+
+    def get(self, key):
+        """返回 {指令名: 条目}，没有缓存时返回 None"""
+        with self._lock:
+            commands = self._jars.get(key)
+        if commands is None:
+            return None
+        return {command["name"]: command for command in commands}
+
+    def trie(self, key):
+        with self._lock:
+            trie = self._tries.get(key)
+            if trie is None and key in self._jars:
+                trie = self._tries[key] = Trie(command["name"] for command in self._jars[key])
+            return trie
+
+    def ensure(self, controller, key, on_loaded=None):
+        """该 jar 版本尚无缓存时向服务器静默发送 help（任意线程可调用）"""
+        with self._lock:
+            if key in self._jars or key in self._pending:
+                return
+            self._pending.add(key)
+        reply = _HelpReply()
+        future = controller.request("help", until=reply, idle=HELP_IDLE, timeout=HELP_TIMEOUT,
+                                    silent=True, reply=reply.belongs)
+
+        def done(future):
+            try:
+                commands = parse_help(future.result())
+            except CommandTimeout as e:
+                # 超时前收到的部分仍然可用
+                commands = parse_help(e.records)
+            except Exception as e:
+                print(f"获取指令列表失败: {e}")
+                commands = []
+            with self._lock:
+                self._pending.discard(key)
+                if not commands:
+                    return
+                self._jars[key] = commands
+                self._tries.pop(key, None)
+                data = {"version": HELP_CACHE_VERSION, "jars": dict(self._jars)}
+            self._save(data)
+            if on_loaded:
+                on_loaded()
+
+        future.add_done_callback(done)
+
+    def _save(self, data):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"保存指令列表失败: {e}")
+
+
+class CommandHistory:
+    """持久化的指令历史（JSON 列表，最新的在最后），相邻重复的指令只记一次"""
+
+    def __init__(self, path, limit=HISTORY_LIMIT):
+        self.path = path
+        self.limit = limit
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            self.entries = [e for e in entries if isinstance(e, str)][-limit:]
+        except (OSError, ValueError, TypeError):
+            self.entries = []
+
+    def add(self, cmd):
+        if not cmd or (self.entries and self.entries[-1] == cmd):
+            return
+        self.entries.append(cmd)
+        del self.entries[:-self.limit]
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"保存指令历史失败: {e}")
+
+
+class CommandCompleter:
+    """
+    给指令输入框加上历史与补全：上/下键翻历史，Tab 补全指令名、地图名与选项参数。
+
+    候选词全部来自内存中的前缀树，按键时不访问磁盘，也不与服务器通信。
+    """
+
+    def __init__(self, entry, history, get_commands, get_maps, show_hint):
+        """
+        :param get_commands: get_commands() -> ({指令名: 条目}, Trie) 或 (None, None)
+        :param get_maps: get_maps() -> 地图名列表
+        :param show_hint: show_hint(text)，显示多个候选时的提示
+        """
+        self.entry = entry
+        self.history = history
+        self.get_commands = get_commands
+        self.get_maps = get_maps
+        self.show_hint = show_hint
+        self._position = None  # 正在查看的历史下标，None 表示在编辑新指令
+        self._draft = ""
+        self._map_names = None
+        self._map_trie = None
+        entry.bind("<Up>", self._on_up)
+        entry.bind("<Down>", self._on_down)
+        entry.bind("<Tab>", self._on_tab)
+
+    def record(self, cmd):
+        """指令发送后调用：写入历史并回到新指令"""
+        self.history.add(cmd)
+        self._position = None
+        self._draft = ""
+
+    def _set_text(self, text):
+        self.entry.delete(0, tk.END)
+        self.entry.insert(0, text)
+        self.entry.icursor(tk.END)
+
+    def _on_up(self, event=None):
+        entries = self.history.entries
+        if not entries:
+            return "break"
+        if self._position is None:
+            self._draft = self.entry.get()
+            self._position = len(entries) - 1
+        elif self._position > 0:
+            self._position -= 1
+        self._set_text(entries[self._position])
+        return "break"
+
+    def _on_down(self, event=None):
+        if self._position is None:
+            return "break"
+        self._position += 1
+        if self._position >= len(self.history.entries):
+            self._position = None
+            self._set_text(self._draft)
+        else:
+            self._set_text(self.history.entries[self._position])
+        return "break"
+
+    def _maps(self):
+        names = tuple(name.replace(" ", "_") for name in self.get_maps())
+        if names != self._map_names:
+            self._map_names = names
+            self._map_trie = Trie(names)
+        return self._map_trie
+
+    def candidates(self, text):
+        """返回 (当前词的起始位置, 候选词列表)"""
+        start = text.rfind(" ") + 1
+        word = text[start:]
+        commands, trie = self.get_commands()
+        if start == 0:
+            return start, trie.complete(word) if trie else []
+        parts = text[:start].split()
+        command = commands.get(parts[0].lower()) if commands else None
+        if command is None:
+            return start, []
+        index = len(parts) - 1
+        args = command["args"]
+        if index >= len(args):
+            # 最后一个参数可以是 <mapname...> 这样的多词参数
+            if not args or "..." not in args[-1]:
+                return start, []
+            index = len(args) - 1
+        arg = args[index][1:-1].rstrip(".")
+        if "map" in arg.lower():
+            return start, self._maps().complete(word)
+        if "/" in arg:
+            return start, [choice for choice in arg.split("/") if choice.lower().startswith(word.lower())]
+        return start, []
+
+    def _on_tab(self, event=None):
+        cursor = self.entry.index(tk.INSERT)
+        text = self.entry.get()
+        before, after = text[:cursor], text[cursor:]
+        start, words = self.candidates(before)
+        if not words:
+            return "break"
+        if len(words) == 1:
+            completed = words[0] + ("" if after.startswith(" ") else " ")
+        else:
+            completed = common_prefix(words)
+            if len(completed) <= cursor - start:
+                shown = " ".join(words[:20]) + (" ..." if len(words) > 20 else "")
+                self.show_hint(f"可选：{shown}")
+                return "break"
+        self._set_text(before[:start] + completed + after)
+        self.entry.icursor(start + len(completed))
+        return "break"
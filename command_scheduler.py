@@ -0,0 +1,235 @@
+# command_scheduler.py
+import datetime
+import threading
+import time
+
+# cron 表达式最多向后查找多少天（如 "0 0 30 2 *" 永远不会触发）
+CRON_LOOKAHEAD_DAYS = 366 * 4
+# 间隔触发的最小间隔（秒）
+MIN_INTERVAL = 1
+
+_CRON_FIELDS = (
+    ("分钟", 0, 59),
+    ("小时", 0, 23),
+    ("日", 1, 31),
+    ("月", 1, 12),
+    ("星期", 0, 7),  # 0 和 7 都表示星期日
+)
+
+
+def _parse_field(text, name, low, high):
+    """解析 cron 的一个字段：* 、n、a-b、*/n、a-b/n 以及逗号分隔的组合"""
+    values = set()
+    for part in text.split(","):
+        rng, _, step = part.partition("/")
+        try:
+            step = int(step) if step else 1
+            if rng == "*":
+                start, end = low, high
+            elif "-" in rng:
+                start, end = (int(x) for x in rng.split("-", 1))
+            else:
+                start = end = int(rng)
+                if step != 1:
+                    end = high
+        except ValueError:
+            raise ValueError(f"{name}字段无法解析：{text}")
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"{name}字段超出范围 {low}-{high}：{text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronTrigger:
+    """五段式 cron 表达式：分 时 日 月 星期（日与星期都受限时满足其一即可，与 cron 一致）"""
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式应为 5 段（分 时 日 月 星期）：{expr}")
+        self.expr = expr
+        parsed = [_parse_field(text, *spec) for text, spec in zip(fields, _CRON_FIELDS)]
+        self.minutes = sorted(parsed[0])
+        self.hours = sorted(parsed[1])
+        self.days, self.months = parsed[2], parsed[3]
+        self.weekdays = {d % 7 for d in parsed[4]}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, day):
+        if day.month not in self.months:
+            return False
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return in_weekdays
+        if self._any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def next_after(self, after):
+        """严格晚于 after（时间戳）的下一次触发时间戳；找不到时返回 None"""
+        start = datetime.datetime.fromtimestamp(after).replace(second=0, microsecond=0)
+        start += datetime.timedelta(minutes=1)
+        day = start.date()
+        for _ in range(CRON_LOOKAHEAD_DAYS):
+            if self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        moment = datetime.datetime(day.year, day.month, day.day, hour, minute)
+                        if moment >= start:
+                            return moment.timestamp()
+            day += datetime.timedelta(days=1)
+        return None
+
+    def describe(self):
+        return f"cron {self.expr}"
+
+
+class IntervalTrigger:
+    """固定间隔（秒）触发；错过的触发不补发"""
+
+    def __init__(self, seconds):
+        seconds = float(seconds)
+        if seconds < MIN_INTERVAL:
+            raise ValueError(f"间隔不能小于 {MIN_INTERVAL} 秒")
+        self.seconds = seconds
+
+    def next_after(self, after):
+        return after + self.seconds
+
+    def describe(self):
+        return f"每 {self.seconds:g} 秒"
+
+
+def parse_trigger(entry):
+    """由 settings 中的任务条目创建触发器：含 "cron" 或 "interval"（秒）"""
+    if entry.get("cron"):
+        return CronTrigger(entry["cron"])
+    if entry.get("interval") is not None:
+        return IntervalTrigger(entry["interval"])
+    raise ValueError(f"任务 {entry.get('name', '')} 缺少 cron 或 interval")
+
+
+class ScheduledJob:
+    """一个定时任务：按触发器把一组指令发送到指定的服务器"""
+
+    def __init__(self, entry):
+        self.name = entry["name"]
+        self.commands = [cmd.strip() for cmd in entry.get("commands", []) if cmd.strip()]
+        self.servers = entry.get("servers") or None  # None 表示所有服务器
+        self.enabled = entry.get("enabled", True)
+        self.trigger = parse_trigger(entry)
+        self.next_run = None
+        self.last_run = None
+
+
+class CommandScheduler:
+    """
+    启动器内的定时指令：按 cron 或固定间隔把指令脚本发送到服务器。
+
+    任务来自 settings["schedules"]，每条形如
+    {"name": "整点保存", "cron": "0 * * * *", "commands": ["save auto"], "servers": ["默认"]}，
+    interval（秒）可代替 cron，servers 省略表示所有服务器，enabled 为 False 时暂停。
+    所有任务共用一个线程按最近的触发时间等待；同一任务的多条指令一次写入 stdin。
+    服务器未运行或未就绪时跳过本次触发。
+    """
+
+    def __init__(self, targets, report=None):
+        """
+        :param targets: targets(servers) -> [(服务器名, controller)]，servers 为 None 时返回所有服务器
+        :param report: report(服务器名, text)，向该服务器的终端输出提示（调度线程中调用）
+        """
+        self.targets = targets
+        self.report = report
+        self._jobs = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self, entries):
+        """
+        按 settings["schedules"] 重建任务表（界面修改后调用）。
+
+        :return: [(任务名, 错误信息)]，无法解析的任务被忽略
+        """
+        jobs = []
+        errors = []
+        now = time.time()
+        for entry in entries or []:
+            try:
+                job = ScheduledJob(entry)
+            except (KeyError, TypeError, ValueError) as e:
+                errors.append((entry.get("name", "") if isinstance(entry, dict) else "", str(e)))
+                continue
+            job.next_run = job.trigger.next_after(now)
+            jobs.append(job)
+        with self._lock:
+            self._jobs = jobs
+        self._wake.set()
+        return errors
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="command-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread = None
+
+    def run_now(self, name):
+        """立即执行一次任务（不影响下次触发时间）"""
+        for job in self.jobs():
+            if job.name == name:
+                self._execute(job)
+                return True
+        return False
+
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            now = time.time()
+            due = []
+            wait = None
+            with self._lock:
+                for job in self._jobs:
+                    if job.next_run is None:
+                        continue
+                    if job.next_run <= now:
+                        due.append(job)
+                        job.next_run = job.trigger.next_after(now)
+                    if job.next_run is not None:
+                        delay = job.next_run - now
+                        wait = delay if wait is None else min(wait, delay)
+            for job in due:
+                if job.enabled:
+                    self._execute(job)
+            # 墙上时钟可能被调整，最多等待一分钟后重新计算
+            self._wake.wait(min(wait, 60) if wait is not None else 60)
+
+    def _execute(self, job):
+        job.last_run = time.time()
+        if not job.commands:
+            return
+        for name, controller in self.targets(job.servers):
+            if controller.process is None:
+                continue
+            if not controller.ready or controller.stopping:
+                if self.report:
+                    self.report(name, f"[定时任务] {job.name}：服务器未就绪，跳过\n")
+                continue
+            if self.report:
+                self.report(name, f"[定时任务] {job.name}\n")
+            try:
+                controller.send_commands(job.commands)
+            except Exception as e:
+                print(f"定时任务 {job.name} 执行失败: {e}")
@@ -0,0 +1,354 @@
+# find_bar.py
+import bisect
+import re
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from button_style2 import create_gradient_button
+
+LEVEL_CHOICES = ("全部", "I", "W", "E", "D")
+# 输入停顿多久后开始查找（毫秒）
+SEARCH_DELAY_MS = 250
+FIND_TAG = "find"
+CURRENT_TAG = "find_current"
+
+
+def compile_query(text, regex=False):
+    """把查找输入编译为正则（不区分大小写）；非正则模式按字面匹配。空输入返回 None"""
+    if not text:
+        return None
+    return re.compile(text if regex else re.escape(text), re.IGNORECASE | re.MULTILINE)
+
+
+def find_lines(parts, pattern, level=None, cancelled=None):
+    """
+    在 Scrollback.snapshot() 上查找，返回命中行的全局行号（升序），可在后台线程调用。
+
+    每块文本整体交给正则搜索，命中后直接跳到下一行继续，不逐行切分字符串；
+    pattern 为 None 时只按级别筛选。
+    """
+    hits = []
+    for seq, text, levels in parts:
+        if cancelled and cancelled():
+            break
+        if callable(text):
+            text = text()
+            if text is None:
+                continue
+        if pattern is None:
+            hits.extend(seq + i for i, lv in enumerate(levels) if lv == level)
+            continue
+        if level:
+            # 按级别筛选时只检查该级别的行（通常远少于全部行）
+            lines = text.split("\n")
+            hits.extend(seq + i for i, lv in enumerate(levels)
+                        if lv == level and pattern.search(lines[i]))
+            continue
+        line = 0
+        counted = 0
+        pos = 0
+        while True:
+            m = pattern.search(text, pos)
+            if not m:
+                break
+            start = m.start()
+            line += text.count("\n", counted, start)
+            counted = start
+            if line >= len(levels):
+                break
+            hits.append(seq + line)
+            pos = text.find("\n", start)
+            if pos < 0:
+                break
+            pos += 1
+    return hits
+
+
+class FindBar(tk.Frame):
+    """
+    终端查找栏（Ctrl+F）。
+
+    在 Scrollback 的行镜像（含已转存的历史行）上查找：快照在主线程取得，匹配在后台线程进行，
+    结果为全局行号。只给当前可见区域内的命中批量加高亮 tag，滚动后重新计算；
+    查找栏打开期间新输出的行即时匹配。
+    """
+
+    def __init__(self, parent, post, before=None, bg=None, entry_bg=None):
+        """
+        :param post: post(func, *args)，在主线程执行 func（OutputPump.post）
+        :param before: 显示时排在该控件之前
+        """
+        super().__init__(parent, bg=bg)
+        self.post = post
+        self.before = before
+        self.scrollback = None
+        self.pattern = None
+        self.level = None
+        self.matches = []
+        self.current = None
+        self.visible = False
+        self._generation = 0
+        self._searching = False
+        self._snapshot_end = 0
+        self._appended = []
+        self._search_job = None
+        self._refresh_pending = False
+
+        tk.Label(self, text="查找", bg=bg).pack(side=tk.LEFT)
+        self.query_var = tk.StringVar()
+        self.entry = tk.Entry(self, textvariable=self.query_var, width=30, bg=entry_bg)
+        self.entry.pack(side=tk.LEFT, padx=(2, 8))
+        self.regex_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self, text="正则", variable=self.regex_var, bg=bg,
+                       command=self.search).pack(side=tk.LEFT)
+        tk.Label(self, text="级别", bg=bg).pack(side=tk.LEFT, padx=(8, 0))
+        self.level_var = tk.StringVar(value=LEVEL_CHOICES[0])
+        level_box = ttk.Combobox(self, textvariable=self.level_var, values=LEVEL_CHOICES,
+                                 width=5, state="readonly")
+        level_box.pack(side=tk.LEFT, padx=(2, 8))
+        level_box.bind("<<ComboboxSelected>>", lambda e: self.search())
+        create_gradient_button(self, text="上一个", command=self.previous,
+                               width=70, height=26).pack(side=tk.LEFT, padx=2)
+        create_gradient_button(self, text="下一个", command=self.next,
+                               width=70, height=26).pack(side=tk.LEFT, padx=2)
+        self.count_label = tk.Label(self, text="", bg=bg, anchor="w")
+        self.count_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=8)
+        create_gradient_button(self, text="关闭", command=self.hide,
+                               width=60, height=26).pack(side=tk.RIGHT, padx=2)
+
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Return>", lambda e: self.next())
+        self.entry.bind("<Shift-Return>", lambda e: self.previous())
+        self.entry.bind("<Escape>", lambda e: self.hide())
+        self._last_query = ""
+
+    # ------------------------------------------------------------------
+    def show(self, scrollback):
+        if not self.visible:
+            self.visible = True
+            if self.before is not None:
+                self.pack(fill=tk.X, pady=(5, 0), before=self.before)
+            else:
+                self.pack(fill=tk.X, pady=(5, 0))
+        self.attach(scrollback)
+        self.entry.focus_set()
+        self.entry.select_range(0, tk.END)
+
+    def hide(self):
+        if not self.visible:
+            return
+        self.visible = False
+        self.pack_forget()
+        self._detach()
+        self.scrollback = None
+
+    def attach(self, scrollback):
+        """切换到另一个终端（切换标签页时调用）；查找栏打开时才在新终端上重新查找"""
+        if not self.visible or scrollback is self.scrollback:
+            return
+        self._detach()
+        self.scrollback = scrollback
+        if scrollback is None:
+            return
+        text = scrollback.text
+        text.tag_config(FIND_TAG, background="#ffe066", foreground="#000000")
+        text.tag_config(CURRENT_TAG, background="#ff9f43", foreground="#000000")
+        # 高亮需要盖过级别颜色
+        text.tag_raise(FIND_TAG)
+        text.tag_raise(CURRENT_TAG)
+        scrollback.view_callback = self._schedule_highlight
+        scrollback.append_callback = self._on_append
+        self.search()
+
+    def _detach(self):
+        self._generation += 1
+        self._searching = False
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+            self._search_job = None
+        sb = self.scrollback
+        if sb is not None:
+            sb.view_callback = None
+            sb.append_callback = None
+            sb.text.tag_remove(FIND_TAG, "1.0", tk.END)
+            sb.text.tag_remove(CURRENT_TAG, "1.0", tk.END)
+        self.matches = []
+        self.current = None
+
+    # ------------------------------------------------------------------
+    def _on_key(self, event=None):
+        query = self.query_var.get()
+        if query == self._last_query:
+            return
+        self._last_query = query
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self.search)
+
+    def search(self):
+        """按当前输入重新查找（快照在主线程取得，匹配在后台线程进行）"""
+        self._search_job = None
+        sb = self.scrollback
+        if sb is None:
+            return
+        level = self.level_var.get()
+        level = None if level == LEVEL_CHOICES[0] else level
+        try:
+            pattern = compile_query(self.query_var.get(), self.regex_var.get())
+        except re.error as e:
+            self._generation += 1
+            self._clear_results()
+            self.count_label.config(text=f"正则有误：{e}")
+            return
+        self._generation += 1
+        self._clear_results()
+        self.pattern, self.level = pattern, level
+        if pattern is None and level is None:
+            return
+        generation = self._generation
+        parts = sb.snapshot()
+        self._snapshot_end = sb.end_seq()
+        self._searching = True
+        self.count_label.config(text="正在查找...")
+
+        def worker():
+            start = time.perf_counter()
+            try:
+                hits = find_lines(parts, pattern, level,
+                                  cancelled=lambda: self._generation != generation)
+                error = None
+            except Exception as e:
+                hits, error = [], e
+            self.post(self._on_results, generation, hits, time.perf_counter() - start, error)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _clear_results(self):
+        self.matches = []
+        self.current = None
+        self._appended = []
+        self.pattern = self.level = None
+        self.count_label.config(text="")
+        sb = self.scrollback
+        if sb is not None:
+            sb.text.tag_remove(FIND_TAG, "1.0", tk.END)
+            sb.text.tag_remove(CURRENT_TAG, "1.0", tk.END)
+
+    def _on_results(self, generation, hits, elapsed, error):
+        if generation != self._generation or self.scrollback is None:
+            return
+        self._searching = False
+        if error is not None:
+            self.count_label.config(text=f"查找失败：{error}")
+            return
+        # 查找期间新输出的行已由 _on_append 匹配
+        hits.extend(seq for seq in self._appended if seq >= self._snapshot_end)
+        self._appended = []
+        self.matches = hits
+        if not hits:
+            self.count_label.config(text=f"没有找到（{elapsed:.2f}s）")
+            return
+        # 从当前视图顶部之后的第一处开始
+        top = self.scrollback.widget_seq() + self._top_line() - 1
+        i = bisect.bisect_left(hits, top)
+        self.goto(i if i < len(hits) else len(hits) - 1)
+
+    def _on_append(self, seq, lines, levels):
+        if self.pattern is None and self.level is None:
+            return
+        pattern, level = self.pattern, self.level
+        found = [seq + i for i, line in enumerate(lines)
+                 if (not level or levels[i] == level) and (pattern is None or pattern.search(line))]
+        if not found:
+            return
+        if self._searching:
+            self._appended.extend(found)
+            return
+        self.matches.extend(found)
+        self._update_count()
+
+    # ------------------------------------------------------------------
+    def next(self):
+        self._step(1)
+
+    def previous(self):
+        self._step(-1)
+
+    def _step(self, delta):
+        if not self.matches:
+            return
+        if self.current is None:
+            self.goto(0 if delta > 0 else len(self.matches) - 1)
+        else:
+            self.goto((self.current + delta) % len(self.matches))
+
+    def goto(self, index):
+        """滚动到第 index 处命中（必要时从历史中调回）"""
+        sb = self.scrollback
+        # 已被环形缓冲丢弃的命中不再保留
+        first = sb.widget_seq() - sb.archived_lines()
+        dropped = bisect.bisect_left(self.matches, first)
+        if dropped:
+            del self.matches[:dropped]
+            index = max(0, index - dropped)
+            if not self.matches:
+                self.current = None
+                self._update_count()
+                return
+        self.current = index
+        line = sb.reveal(self.matches[index])
+        text = sb.text
+        text.tag_remove(CURRENT_TAG, "1.0", tk.END)
+        if line is not None:
+            text.tag_add(CURRENT_TAG, f"{line}.0", f"{line}.0 lineend")
+            text.see(f"{line}.0")
+        self._update_count()
+        self._schedule_highlight()
+
+    def _update_count(self):
+        total = len(self.matches)
+        if self.current is None:
+            self.count_label.config(text=f"共 {total} 处")
+        else:
+            self.count_label.config(text=f"第 {self.current + 1} / {total} 处")
+
+    # ------------------------------------------------------------------
+    def _top_line(self):
+        return int(self.scrollback.text.index("@0,0").split(".")[0])
+
+    def _schedule_highlight(self):
+        # 滚动事件很密集，合并为空闲时一次
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._highlight)
+
+    def _highlight(self):
+        """只给可见区域内的命中加高亮，一次 tag_add 批量添加所有区间"""
+        self._refresh_pending = False
+        sb = self.scrollback
+        if sb is None:
+            return
+        text = sb.text
+        text.tag_remove(FIND_TAG, "1.0", tk.END)
+        if not self.matches:
+            return
+        first = self._top_line()
+        last = int(text.index(f"@0,{text.winfo_height()}").split(".")[0])
+        base = sb.widget_seq() - 1
+        lo = bisect.bisect_left(self.matches, base + first)
+        hi = bisect.bisect_right(self.matches, base + last)
+        ranges = []
+        for seq in self.matches[lo:hi]:
+            line = seq - base
+            if line > len(sb.lines):
+                break
+            if self.pattern is None:
+                ranges += [f"{line}.0", f"{line}.0 lineend"]
+                continue
+            for m in self.pattern.finditer(sb.lines[line - 1]):
+                if m.end() > m.start():
+                    ranges += [f"{line}.{m.start()}", f"{line}.{m.end()}"]
+        if ranges:
+            text.tag_add(FIND_TAG, *ranges)
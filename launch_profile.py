@@ -0,0 +1,83 @@
+# launch_profile.py
+import os
+
+from startup_stats import jar_version_key
+
+# settings 中没有 profiles 或指定的配置不存在时使用的配置名
+DEFAULT_PROFILE_NAME = "默认"
+
+DEFAULT_PROFILE = {
+    "xms": "",           # 初始堆，例如 "512m"
+    "xmx": "",           # 最大堆，例如 "2g"
+    "gc": "",            # g1 / zgc / shenandoah / parallel / serial，留空使用 JVM 默认
+    "jvm_args": [],      # 其他 JVM 参数
+    "server_args": [],   # 追加在 jar 之后的服务器参数
+    "cds": False,        # 按 jar 版本生成并复用 AppCDS 归档
+}
+
+GC_OPTIONS = {
+    "g1": "-XX:+UseG1GC",
+    "zgc": "-XX:+UseZGC",
+    "shenandoah": "-XX:+UseShenandoahGC",
+    "parallel": "-XX:+UseParallelGC",
+    "serial": "-XX:+UseSerialGC",
+}
+
+
+def resolve_profile(settings, name=None):
+    """
+    返回 (配置名, 配置字典)，缺省项用 DEFAULT_PROFILE 补齐。
+
+    name 为空时使用 settings["java"]["profile"]；找不到时退回默认配置。
+    """
+    profiles = settings.get("profiles", {})
+    name = name or settings.get("java", {}).get("profile") or DEFAULT_PROFILE_NAME
+    if name not in profiles and name != DEFAULT_PROFILE_NAME:
+        print(f"启动配置 {name} 不存在，使用默认配置")
+        name = DEFAULT_PROFILE_NAME
+    profile = dict(DEFAULT_PROFILE)
+    profile.update(profiles.get(name, {}))
+    return name, profile
+
+
+def cds_archive_path(cds_dir, jar_path):
+    """每个 jar 版本一个 AppCDS 归档，jar 更新后自动使用新归档"""
+    return os.path.join(cds_dir, jar_version_key(jar_path) + ".jsa")
+
+
+def jvm_args(profile, jar_path=None, cds_dir=None):
+    """
+    根据配置生成 JVM 参数（位于 -jar 之前）。
+
+    开启 cds 时：归档已存在则用 -XX:SharedArchiveFile 加载；否则本次运行以
+    -XX:ArchiveClassesAtExit 在服务器正常退出时生成（JDK 13+），下次启动即可复用。
+    """
+    args = []
+    if profile.get("xms"):
+        args.append(f"-Xms{profile['xms']}")
+    if profile.get("xmx"):
+        args.append(f"-Xmx{profile['xmx']}")
+    gc = (profile.get("gc") or "").lower()
+    if gc:
+        if gc in GC_OPTIONS:
+            args.append(GC_OPTIONS[gc])
+        else:
+            print(f"未知的 GC：{gc}，使用 JVM 默认")
+    if profile.get("cds") and jar_path and cds_dir:
+        try:
+            os.makedirs(cds_dir, exist_ok=True)
+            archive = cds_archive_path(cds_dir, jar_path)
+            # 旧版 JVM 不认识这些选项时忽略它们，而不是拒绝启动
+            args.append("-XX:+IgnoreUnrecognizedVMOptions")
+            if os.path.isfile(archive) and os.path.getsize(archive) > 0:
+                args.append(f"-XX:SharedArchiveFile={archive}")
+            else:
+                args.append(f"-XX:ArchiveClassesAtExit={archive}")
+        except OSError as e:
+            print(f"创建 AppCDS 目录失败: {e}")
+    args.extend(profile.get("jvm_args") or [])
+    return args
+
+
+def server_args(profile):
+    return list(profile.get("server_args") or [])
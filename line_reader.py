@@ -0,0 +1,60 @@
+# line_reader.py
+import codecs
+
+# 每次从管道读取的最大字节数
+CHUNK_SIZE = 64 * 1024
+
+
+class LineDecoder:
+    """
+    增量解码器：把任意切分的字节块还原为完整的文本行。
+
+    按指定编码和错误策略解码，自行按换行符切分，未结束的半行保留到下一块，
+    输出的每一行都以 "\\n" 结尾（\\r\\n 统一为 \\n）。
+    """
+
+    def __init__(self, encoding="utf-8", errors="replace"):
+        self.encoding = encoding
+        self.errors = errors
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors)
+        self._tail = ""
+
+    def feed(self, data):
+        """输入一块字节，返回其中完整的行列表"""
+        text = self._decoder.decode(data)
+        if not text:
+            return []
+        if self._tail:
+            text = self._tail + text
+        parts = text.split("\n")
+        self._tail = parts.pop()
+        return [part[:-1] + "\n" if part.endswith("\r") else part + "\n" for part in parts]
+
+    def flush(self):
+        """流结束时调用，返回剩余的半行（如有）"""
+        text = self._tail + self._decoder.decode(b"", final=True)
+        self._tail = ""
+        if not text:
+            return []
+        return [line + "\n" for line in text.rstrip("\r").split("\n")]
+
+
+def read_chunks(stream, on_lines, encoding="utf-8", errors="replace", chunk_size=CHUNK_SIZE):
+    """
+    从无缓冲的二进制流中按块读取，直到 EOF。
+
+    使用可复用的缓冲区 readinto，每块解码后把整批行交给 on_lines(lines)。
+    """
+    decoder = LineDecoder(encoding, errors)
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    while True:
+        n = stream.readinto(buf)
+        if not n:
+            break
+        lines = decoder.feed(view[:n])
+        if lines:
+            on_lines(lines)
+    lines = decoder.flush()
+    if lines:
+        on_lines(lines)
@@ -0,0 +1,304 @@
+# log_archive.py
+import collections
+import gzip
+import io
+import itertools
+import lzma
+import os
+import queue
+import threading
+import time
+import zlib
+
+# 单个分段的最大字节数（未压缩）
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# 写入线程的刷新间隔（秒）
+FLUSH_INTERVAL = 0.5
+# 每个归档排队等待写入的行数上限；磁盘跟不上时丢弃最旧的行，不阻塞读取线程
+DEFAULT_QUEUE_LINES = 200000
+
+SEGMENT_SUFFIX = ".log"
+COMPRESSED_SUFFIXES = {"gzip": ".log.gz", "lzma": ".log.xz"}
+SEGMENT_TIME_FORMAT = "%Y-%m-%d_%H%M%S"
+# 压缩时每 CHUNK_LINES 行写成一个独立的 gzip member / xz 流，
+# 记下各自的起始偏移后即可只解压需要的部分（整体仍是合法的 .gz / .xz 文件）
+CHUNK_LINES = 4096
+
+
+def open_segment(path):
+    """以文本方式顺序读取一个分段（.log / .log.gz / .log.xz），按行迭代（只以 LF 分行，与 read_chunk 一致）"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="\n")
+    if path.endswith(".xz"):
+        return lzma.open(path, "rt", encoding="utf-8", errors="replace", newline="\n")
+    return open(path, "r", encoding="utf-8", errors="replace", newline="\n")
+
+
+def read_chunk(path, offset, lines=CHUNK_LINES):
+    """
+    读取分段中从 offset 开始的一个块，返回行列表（不含换行符）。
+
+    offset 为 compress_segment 返回的块表中的值：压缩分段只解压这一个 member / 流，
+    未压缩分段从该字节位置读取 lines 行。
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        if path.endswith((".gz", ".xz")):
+            d = zlib.decompressobj(31) if path.endswith(".gz") else lzma.LZMADecompressor()
+            parts = []
+            while not d.eof:
+                data = f.read(64 * 1024)
+                if not data:
+                    break
+                parts.append(d.decompress(data))
+            data = b"".join(parts)
+        else:
+            data = b"".join(itertools.islice(f, lines))
+    text = data.decode("utf-8", "replace")
+    if text.endswith("\n"):
+        text = text[:-1]
+    return text.split("\n") if text else []
+
+
+def list_segments(directory):
+    """按时间顺序列出目录中的分段（文件名以开始时间开头，字典序即时间序）"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names)
+            if name.endswith((SEGMENT_SUFFIX, ".log.gz", ".log.xz"))]
+
+
+def iter_lines(directory):
+    """依次流式读取目录中所有分段的行（不整体解压）"""
+    for path in list_segments(directory):
+        try:
+            with open_segment(path) as f:
+                yield from f
+        except (OSError, EOFError, lzma.LZMAError) as e:
+            print(f"读取日志分段失败 {path}: {e}")
+
+
+def compress_segment(path, compression, chunk_lines=CHUNK_LINES):
+    """
+    把已关闭的分段压缩为 .log.gz / .log.xz 并删除原文件。
+
+    :return: (新路径, 块表)；块表为每 chunk_lines 行一块的起始字节偏移，供 read_chunk 使用。
+             compression 为 None 时不压缩，块表为原文件中的偏移
+    """
+    suffix = COMPRESSED_SUFFIXES.get(compression)
+    chunks = []
+    if not suffix:
+        with open(path, "rb") as src:
+            offset = 0
+            while True:
+                size = sum(len(line) for line in itertools.islice(src, chunk_lines))
+                if not size:
+                    break
+                chunks.append(offset)
+                offset += size
+        return path, chunks
+    target = path[:-len(SEGMENT_SUFFIX)] + suffix
+    tmp = target + ".tmp"
+    with open(path, "rb") as src, open(tmp, "wb") as dst:
+        while True:
+            data = b"".join(itertools.islice(src, chunk_lines))
+            if not data:
+                break
+            chunks.append(dst.tell())
+            if compression == "gzip":
+                dst.write(gzip.compress(data, compresslevel=6))
+            else:
+                dst.write(lzma.compress(data))
+    os.replace(tmp, target)
+    os.remove(path)
+    return target, chunks
+
+
+class LogArchive:
+    """
+    一台服务器的持久化日志：按大小或日期切分为分段，关闭的分段压缩保存。
+
+    write() 任意线程可调用，只把行放入内存队列；实际写盘、切分和压缩都在
+    共用的 ArchiveWriter 线程中进行，磁盘慢时最多丢弃最旧的排队行。
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, rotate_daily=True,
+                 compression="gzip", queue_lines=DEFAULT_QUEUE_LINES, on_segment_closed=None):
+        """
+        :param compression: "gzip"、"lzma" 或 None（不压缩）
+        :param on_segment_closed: on_segment_closed(path, chunks)，分段关闭并压缩后在压缩线程中调用；
+                                  chunks 为 compress_segment 返回的块表
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compression = compression
+        self.on_segment_closed = on_segment_closed
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._lines = collections.deque(maxlen=queue_lines)
+        self._file = None
+        self._path = None
+        self._size = 0
+        self._day = None
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+        self.writer = shared_writer()
+        # 上次异常退出时遗留的未压缩分段和压缩中途的临时文件
+        for name in os.listdir(directory):
+            if name.endswith(".tmp"):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        for path in list_segments(directory):
+            if path.endswith(SEGMENT_SUFFIX):
+                self.writer.compress(self, path)
+        self.writer.add(self)
+
+    def write(self, records):
+        """放入一批 LogRecord（任意线程，不阻塞）"""
+        lines = self._lines
+        overflow = len(lines) + len(records) - lines.maxlen
+        if overflow > 0:
+            self.dropped += overflow
+        lines.extend(record.raw for record in records)
+
+    def close(self):
+        """停止接收新行；剩余的行由写入线程写完后关闭并压缩当前分段"""
+        self._closed = True
+        self.writer.wake()
+
+    def current_path(self):
+        return self._path
+
+    # ---------------- 以下仅在写入线程中调用 ----------------
+    def _flush(self):
+        lines = self._lines
+        count = len(lines)
+        if count:
+            text = "".join(lines.popleft() for _ in range(count))
+            dropped = self.dropped
+            if dropped != self._reported_dropped:
+                text = f"[日志归档] 写入跟不上，丢弃了 {dropped - self._reported_dropped} 行\n" + text
+                self._reported_dropped = dropped
+            data = text.encode("utf-8", "replace")
+            self._ensure_segment(len(data))
+            try:
+                self._file.write(data)
+                self._file.flush()
+                self._size += len(data)
+            except OSError as e:
+                print(f"写入日志失败: {e}")
+        if self._closed and not lines:
+            self._close_segment()
+            return False
+        return True
+
+    def _ensure_segment(self, incoming):
+        today = time.strftime("%Y-%m-%d")
+        if self._file is not None:
+            if self._size + incoming > self.max_bytes and self._size > 0:
+                self._close_segment()
+            elif self.rotate_daily and today != self._day:
+                self._close_segment()
+        if self._file is None:
+            name = time.strftime(SEGMENT_TIME_FORMAT) + SEGMENT_SUFFIX
+            path = os.path.join(self.directory, name)
+            n = 1
+            while os.path.exists(path) or any(os.path.exists(path[:-len(SEGMENT_SUFFIX)] + s)
+                                              for s in COMPRESSED_SUFFIXES.values()):
+                path = os.path.join(self.directory, f"{name[:-len(SEGMENT_SUFFIX)]}-{n}{SEGMENT_SUFFIX}")
+                n += 1
+            self._file = open(path, "ab", buffering=io.DEFAULT_BUFFER_SIZE)
+            self._path = path
+            self._size = 0
+            self._day = today
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError as e:
+            print(f"关闭日志分段失败: {e}")
+        path, self._file, self._path = self._path, None, None
+        self.writer.compress(self, path)
+
+
+class ArchiveWriter:
+    """所有 LogArchive 共用的写入线程，另有一个压缩线程处理关闭的分段"""
+
+    def __init__(self):
+        self._archives = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._compress_queue = queue.Queue()
+        threading.Thread(target=self._run, name="log-archive-writer", daemon=True).start()
+        threading.Thread(target=self._run_compressor, name="log-archive-compressor", daemon=True).start()
+
+    def add(self, archive):
+        with self._lock:
+            self._archives = self._archives + [archive]
+
+    def wake(self):
+        self._wake.set()
+
+    def compress(self, archive, path):
+        self._compress_queue.put((archive, path))
+
+    def _run(self):
+        while True:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            finished = []
+            for archive in self._archives:
+                try:
+                    if not archive._flush():
+                        finished.append(archive)
+                except Exception as e:
+                    print(f"日志归档失败: {e}")
+            if finished:
+                with self._lock:
+                    self._archives = [a for a in self._archives if a not in finished]
+
+    def _run_compressor(self):
+        while True:
+            archive, path = self._compress_queue.get()
+            try:
+                if os.path.getsize(path) == 0:
+                    os.remove(path)
+                    continue
+                path, chunks = compress_segment(path, archive.compression)
+            except OSError as e:
+                print(f"压缩日志分段失败 {path}: {e}")
+                continue
+            finally:
+                self._compress_queue.task_done()
+            if archive.on_segment_closed:
+                try:
+                    archive.on_segment_closed(path, chunks)
+                except Exception as e:
+                    print(f"日志分段回调失败: {e}")
+
+    def flushed(self):
+        """所有已关闭归档的剩余行都已写盘（压缩可以留到下次启动继续）"""
+        return not any(archive._lines or archive._closed for archive in self._archives)
+
+    def idle(self):
+        """没有待写入的行，也没有待压缩的分段"""
+        return self.flushed() and self._compress_queue.unfinished_tasks == 0
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_writer():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ArchiveWriter()
+        return _shared
@@ -0,0 +1,328 @@
+# log_index.py
+import bisect
+import gzip
+import json
+import lzma
+import os
+import re
+import threading
+import zlib
+
+from log_archive import CHUNK_LINES, SEGMENT_SUFFIX, list_segments, open_segment, read_chunk
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+# 倒排表的粒度：每 BLOCK_LINES 行为一块，倒排表记录块号而不是行号，索引文件小得多
+BLOCK_LINES = 64
+# 只索引正文中长度不小于 2 的词；时间戳前缀不进入倒排表（由时间索引负责）
+_TOKEN_RE = re.compile(r"\w{2,}")
+_LINE_RE = re.compile(r"\[(\d{2})-(\d{2})-(\d{4}) (\d{2}:\d{2}:\d{2})\] \[([IWED])\] ?")
+LEVEL_TOKEN = "level:"
+
+
+def tokenize(text):
+    return {token.lower() for token in _TOKEN_RE.findall(text)}
+
+
+def parse_line(line):
+    """返回 (可排序的时间 "YYYY-MM-DD HH:MM:SS" 或 None, 级别或 None, 正文)"""
+    m = _LINE_RE.match(line)
+    if not m:
+        return None, None, line
+    day, month, year, clock, level = m.groups()
+    return f"{year}-{month}-{day} {clock}", level, line[m.end():]
+
+
+def index_path(segment):
+    return segment + INDEX_SUFFIX
+
+
+def build_index(segment, chunks=None):
+    """
+    顺序读取一个分段，建立索引并写入 <分段>.idx（gzip 压缩的 JSON）。
+
+    索引内容：总行数、每块第一行的时间和级别（时间索引）、词 -> 块号列表（差分编码），
+    以及 compress_segment 返回的块表（chunks，可为 None）。
+    续行（无时间戳）沿用上一行的时间和级别；纯数字不进入倒排表。
+    """
+    postings = {}
+    times = []
+    levels = []
+    line_no = 0
+    time_ = None
+    level = None
+    first = last = None
+    messages = []
+    block_levels = set()
+
+    def add_block(block):
+        tokens = tokenize("\n".join(messages))
+        tokens.update(LEVEL_TOKEN + lv.lower() for lv in block_levels)
+        for token in tokens:
+            if token.isdigit():
+                continue
+            blocks = postings.get(token)
+            if blocks is None:
+                postings[token] = [block]
+            else:
+                blocks.append(block)
+        messages.clear()
+        block_levels.clear()
+
+    with open_segment(segment) as f:
+        for line in f:
+            t, lv, message = parse_line(line)
+            if t is not None:
+                time_, level = t, lv
+                if first is None or t < first:
+                    first = t
+                if last is None or t > last:
+                    last = t
+            if line_no % BLOCK_LINES == 0:
+                if line_no:
+                    add_block(line_no // BLOCK_LINES - 1)
+                times.append(time_)
+                levels.append(level)
+            messages.append(message)
+            if level:
+                block_levels.add(level)
+            line_no += 1
+    if messages:
+        add_block((line_no - 1) // BLOCK_LINES)
+
+    encoded = {}
+    for token, blocks in postings.items():
+        prev = 0
+        deltas = []
+        for block in blocks:
+            deltas.append(block - prev)
+            prev = block
+        encoded[token] = deltas
+    data = {"version": INDEX_VERSION, "lines": line_no, "block": BLOCK_LINES,
+            "chunks": chunks, "chunk_lines": CHUNK_LINES,
+            "first": first, "last": last, "times": times, "levels": levels, "tokens": encoded}
+    tmp = f"{index_path(segment)}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, index_path(segment))
+    return data
+
+
+def load_index(segment):
+    try:
+        with gzip.open(index_path(segment), "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return None
+    if data.get("version") != INDEX_VERSION:
+        return None
+    return data
+
+
+def _decode(deltas):
+    block = 0
+    for delta in deltas:
+        block += delta
+        yield block
+
+
+class SearchHit:
+    __slots__ = ("segment", "line_no", "time", "level", "text")
+
+    def __init__(self, segment, line_no, time, level, text):
+        self.segment = segment
+        self.line_no = line_no
+        self.time = time
+        self.level = level
+        self.text = text
+
+
+class LogIndex:
+    """
+    一台服务器日志目录的索引：已关闭的分段各有一个 .idx 文件。
+
+    查询时先用时间索引和倒排表确定候选分段与候选块，按块表只解压候选块所在的部分，
+    再逐行确认；尚未建索引的分段（如正在写入的分段）顺序扫描。
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._cache = {}  # 分段路径 -> 索引数据
+        self._lock = threading.Lock()
+
+    def on_segment_closed(self, segment, chunks=None):
+        """LogArchive 的回调：分段压缩完成后建立索引（压缩线程中调用）"""
+        try:
+            data = build_index(segment, chunks)
+        except Exception as e:
+            print(f"建立日志索引失败 {segment}: {e}")
+            return
+        with self._lock:
+            self._cache[segment] = data
+
+    def index_missing(self):
+        """
+        为已压缩但尚无索引的分段建立索引（可在后台线程中调用）。
+
+        这类分段没有块表（压缩后、建索引前程序退出），查询时只能整段顺序读取；
+        未压缩的 .log 可能正在写入，由 LogArchive 关闭后回调建立索引。
+        """
+        for segment in list_segments(self.directory):
+            if not segment.endswith(SEGMENT_SUFFIX) and not os.path.exists(index_path(segment)):
+                self.on_segment_closed(segment)
+
+    def _index(self, segment):
+        with self._lock:
+            data = self._cache.get(segment)
+        if data is None and os.path.exists(index_path(segment)):
+            data = load_index(segment)
+            if data is not None:
+                with self._lock:
+                    self._cache[segment] = data
+        return data
+
+    def search(self, text="", level=None, since=None, until=None, limit=1000, cancelled=None):
+        """
+        搜索日志行。
+
+        :param text: 关键词（空格分隔，全部包含才命中，不区分大小写）；
+                     倒排表中包含该词的词条所在的块为候选块，再按子串确认；
+                     纯数字不在倒排表中，只在确认时检查
+        :param level: I / W / E / D 之一，None 表示不限
+        :param since, until: "YYYY-MM-DD[ HH:MM[:SS]]" 字符串，闭区间；无时间戳的行沿用上一行的时间
+        :param cancelled: cancelled() -> bool，返回 True 时提前结束
+        :return: SearchHit 列表，按时间顺序，最多 limit 条
+        """
+        words = [w.lower() for w in text.split()]
+        tokens = set()
+        for word in words:
+            tokens |= {token for token in tokenize(word) if not token.isdigit()}
+        if level:
+            tokens.add(LEVEL_TOKEN + level.lower())
+        until_key = until + "\uffff" if until else None  # 让 "2024-01-02" 包含当天所有时刻
+
+        hits = []
+        for segment in list_segments(self.directory):
+            if cancelled and cancelled():
+                break
+            data = self._index(segment)
+            blocks = None
+            if data is not None:
+                if since and data["last"] and data["last"] < since:
+                    continue
+                if until_key and data["first"] and data["first"] > until_key:
+                    continue
+                blocks = self._candidate_blocks(data, tokens, since, until_key)
+                if not blocks:
+                    continue
+            self._scan(segment, data, blocks, words, level, since, until_key, hits, limit)
+            if len(hits) >= limit:
+                break
+        return hits
+
+    @staticmethod
+    def _candidate_blocks(data, tokens, since, until_key):
+        postings = data["tokens"]
+        keys = data.get("keys")
+        if keys is None:
+            keys = data["keys"] = sorted(postings)
+        result = None
+        for token in tokens:
+            if token.startswith(LEVEL_TOKEN):
+                blocks = set(_decode(postings.get(token, ())))
+            else:
+                # 先按前缀匹配；词中间的部分（如 PointerException）再在词表中按子串查找。
+                # 含字母的词只会出现在同样含字母的词条中，所以都找不到时该词确实不存在
+                blocks = set()
+                i = bisect.bisect_left(keys, token)
+                while i < len(keys) and keys[i].startswith(token):
+                    blocks.update(_decode(postings[keys[i]]))
+                    i += 1
+                for key in keys:
+                    if token in key and not key.startswith(token):
+                        blocks.update(_decode(postings[key]))
+            result = blocks if result is None else result & blocks
+            if not result:
+                return set()
+        times = data["times"]
+        if result is None:
+            result = set(range(len(times)))
+        if since or until_key:
+            kept = set()
+            for block in result:
+                start = times[block] if block < len(times) else None
+                end = times[block + 1] if block + 1 < len(times) else data["last"]
+                if until_key and start and start > until_key:
+                    continue
+                if since and end and end < since:
+                    continue
+                kept.add(block)
+            result = kept
+        return result
+
+    @staticmethod
+    def _scan(segment, data, blocks, words, level, since, until_key, hits, limit):
+        try:
+            if data is not None and data.get("chunks"):
+                lines = LogIndex._iter_blocks(segment, data, blocks)
+            else:
+                lines = LogIndex._iter_all(segment, data, blocks)
+            for line_no, line, time_, line_level in lines:
+                if level and line_level != level:
+                    continue
+                if since and (time_ is None or time_ < since):
+                    continue
+                if until_key and time_ is not None and time_ > until_key:
+                    continue
+                lower = line.lower()
+                if all(word in lower for word in words):
+                    hits.append(SearchHit(segment, line_no, time_, line_level, line.rstrip("\n")))
+                    if len(hits) >= limit:
+                        return
+        except (OSError, EOFError, zlib.error, lzma.LZMAError) as e:
+            print(f"读取日志分段失败 {segment}: {e}")
+
+    @staticmethod
+    def _iter_blocks(segment, data, blocks):
+        """按块表只读取候选块所在的部分；每块的起始时间和级别来自时间索引"""
+        block_lines = data["block"]
+        chunk_lines = data["chunk_lines"]
+        chunks = data["chunks"]
+        by_chunk = {}
+        for block in sorted(blocks):
+            by_chunk.setdefault(block * block_lines // chunk_lines, []).append(block)
+        for chunk, chunk_blocks in by_chunk.items():
+            if chunk >= len(chunks):
+                continue
+            lines = read_chunk(segment, chunks[chunk], chunk_lines)
+            base = chunk * chunk_lines
+            for block in chunk_blocks:
+                time_ = data["times"][block]
+                line_level = data["levels"][block]
+                start = block * block_lines
+                for line_no in range(start, min(start + block_lines, base + len(lines))):
+                    line = lines[line_no - base]
+                    t, lv, _ = parse_line(line)
+                    if t is not None:
+                        time_, line_level = t, lv
+                    yield line_no, line, time_, line_level
+
+    @staticmethod
+    def _iter_all(segment, data, blocks):
+        """没有块表时整段顺序读取，跳过非候选块"""
+        block_lines = data["block"] if data else BLOCK_LINES
+        last_block = max(blocks) if blocks else None
+        time_ = None
+        line_level = None
+        with open_segment(segment) as f:
+            for line_no, line in enumerate(f):
+                t, lv, _ = parse_line(line)
+                if t is not None:
+                    time_, line_level = t, lv
+                if blocks is not None:
+                    block = line_no // block_lines
+                    if block > last_block:
+                        break
+                    if block not in blocks:
+                        continue
+                yield line_no, line, time_, line_level
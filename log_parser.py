@@ -0,0 +1,63 @@
+# log_parser.py
+import re
+from datetime import datetime
+
+# Mindustry 控制台行格式：[dd-MM-yyyy HH:mm:ss] [I] 消息
+_LINE_RE = re.compile(r'\[(\d{2}-\d{2}-\d{4} \d{2}:\d{2}:\d{2})\] \[([IWED])\] ?(.*?)\r?\n?\Z', re.S)
+TIME_FORMAT = "%d-%m-%Y %H:%M:%S"
+LEVELS = "IWED"
+
+
+class LogRecord:
+    """
+    一行控制台输出的解析结果。
+
+    raw: 原始行（含换行符）；time: 时间戳字符串，无时间戳时为 None；
+    level: I/W/E/D 之一，启动器自身消息为 None；message: 去掉前缀后的正文。
+    """
+    __slots__ = ("raw", "time", "level", "message")
+
+    def __init__(self, raw, time, level, message):
+        self.raw = raw
+        self.time = time
+        self.level = level
+        self.message = message
+
+    def datetime(self):
+        """把时间戳解析为 datetime，无时间戳时返回 None"""
+        if self.time is None:
+            return None
+        return datetime.strptime(self.time, TIME_FORMAT)
+
+    def __repr__(self):
+        return f"LogRecord({self.time!r}, {self.level!r}, {self.message!r})"
+
+
+def local_records(text):
+    """把启动器自身产生的文本（如“> 指令”）包装为记录，不做正则匹配"""
+    # 只按 \n 切分，保证每条记录恰好对应终端中的一行
+    return [LogRecord(line + "\n", None, None, line.rstrip("\r"))
+            for line in text.rstrip("\n").split("\n")]
+
+
+class LogParser:
+    """
+    输出管道中唯一的解析阶段：每行只做一次正则匹配。
+
+    没有时间戳的行（如异常堆栈）沿用上一条记录的级别，便于按级别过滤。
+    """
+
+    def __init__(self):
+        self._last_level = None
+
+    def parse(self, line):
+        match = _LINE_RE.match(line)
+        if match:
+            time, level, message = match.groups()
+            self._last_level = level
+            return LogRecord(line, time, level, message)
+        return LogRecord(line, None, self._last_level, line.rstrip("\r\n"))
+
+    def parse_lines(self, lines):
+        parse = self.parse
+        return [parse(line) for line in lines]
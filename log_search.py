@@ -0,0 +1,129 @@
+# log_search.py
+import tkinter as tk
+from tkinter import ttk
+from button_style2 import create_gradient_button
+import os
+import json
+import re
+import threading
+import time
+
+# 单次搜索最多显示的结果数
+MAX_RESULTS = 1000
+LEVEL_CHOICES = ("全部", "I", "W", "E", "D")
+# 日期输入：YYYY-MM-DD，可带 HH:MM 或 HH:MM:SS
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}( \d{2}:\d{2}(:\d{2})?)?$")
+
+
+def show_log_search(main_window):
+    """当前标签页服务器的日志搜索窗口：关键词、级别、时间范围"""
+    slot = main_window.current
+    log_index = slot.log_index
+    if log_index is None:
+        main_window.append_output("日志归档未启用（settings 中 log_archive.enabled），无法搜索\n")
+        return
+    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+    SETTINGS_PATH = os.path.join(SCRIPT_DIR, "settings.json")
+    with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+
+    win = tk.Toplevel(main_window.root, bg=settings["color"]["windows_bg"])
+    win.title(f"日志搜索 - {slot.name}")
+    win.geometry("900x500")
+    win.transient(main_window.root)
+
+    form = tk.Frame(win, bg=settings["color"]["windows_bg"])
+    form.pack(fill='x', padx=5, pady=5)
+
+    tk.Label(form, text="关键词", bg=settings["color"]["windows_bg"]).pack(side=tk.LEFT)
+    text_var = tk.StringVar()
+    text_entry = tk.Entry(form, textvariable=text_var, width=30, bg=settings["color"]["entry"])
+    text_entry.pack(side=tk.LEFT, padx=(2, 8))
+
+    tk.Label(form, text="级别", bg=settings["color"]["windows_bg"]).pack(side=tk.LEFT)
+    level_var = tk.StringVar(value=LEVEL_CHOICES[0])
+    ttk.Combobox(form, textvariable=level_var, values=LEVEL_CHOICES, width=5,
+                 state="readonly").pack(side=tk.LEFT, padx=(2, 8))
+
+    tk.Label(form, text="从", bg=settings["color"]["windows_bg"]).pack(side=tk.LEFT)
+    since_var = tk.StringVar()
+    tk.Entry(form, textvariable=since_var, width=17, bg=settings["color"]["entry"]).pack(side=tk.LEFT, padx=2)
+    tk.Label(form, text="到", bg=settings["color"]["windows_bg"]).pack(side=tk.LEFT)
+    until_var = tk.StringVar()
+    tk.Entry(form, textvariable=until_var, width=17, bg=settings["color"]["entry"]).pack(side=tk.LEFT, padx=2)
+
+    search_btn = create_gradient_button(form, text="搜索", command=lambda: start_search(),
+                                        width=70, height=28)
+    search_btn.pack(side=tk.LEFT, padx=8)
+
+    label = tk.Label(win, text="日期格式：YYYY-MM-DD 或 YYYY-MM-DD HH:MM；例：关键词 NullPointerException，级别 E",
+                     anchor="w", bg=settings["color"]["windows_bg"])
+    label.pack(fill='x', padx=5)
+
+    result_frame = tk.Frame(win)
+    result_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+    scrollbar = tk.Scrollbar(result_frame)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    results = tk.Listbox(result_frame, font=('Consolas', 10), yscrollcommand=scrollbar.set,
+                         bg=settings["color"].get("terminal", "#ffffff"),
+                         fg=settings["color"].get("text", "#000000"))
+    results.pack(fill=tk.BOTH, expand=True)
+    scrollbar.config(command=results.yview)
+
+    state = {"generation": 0}
+
+    def parse_date(var):
+        value = var.get().strip()
+        if not value:
+            return None
+        if not _DATE_RE.match(value):
+            raise ValueError(f"日期格式不正确：{value}")
+        return value
+
+    def start_search():
+        try:
+            since = parse_date(since_var)
+            until = parse_date(until_var)
+        except ValueError as e:
+            label.config(text=str(e))
+            return
+        level = level_var.get()
+        level = None if level == LEVEL_CHOICES[0] else level
+        text = text_var.get()
+        # 新的搜索开始后，旧搜索的结果作废
+        state["generation"] += 1
+        generation = state["generation"]
+        label.config(text="正在搜索...")
+        results.delete(0, tk.END)
+
+        def worker():
+            start = time.perf_counter()
+            try:
+                hits = log_index.search(text, level=level, since=since, until=until, limit=MAX_RESULTS,
+                                        cancelled=lambda: state["generation"] != generation)
+                error = None
+            except Exception as e:
+                hits, error = [], e
+            elapsed = time.perf_counter() - start
+            main_window.pump.post(show_results, generation, hits, elapsed, error)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_results(generation, hits, elapsed, error):
+        if generation != state["generation"] or not win.winfo_exists():
+            return
+        if error is not None:
+            label.config(text=f"搜索失败：{error}")
+            return
+        more = "（仅显示前 {} 条）".format(MAX_RESULTS) if len(hits) >= MAX_RESULTS else ""
+        label.config(text=f"找到 {len(hits)} 条{more}，耗时 {elapsed:.2f}s")
+        if hits:
+            results.insert(tk.END, *[hit.text for hit in hits])
+
+    def on_close():
+        state["generation"] += 1
+        win.destroy()
+
+    text_entry.bind("<Return>", lambda e: start_search())
+    win.protocol("WM_DELETE_WINDOW", on_close)
+    text_entry.focus_set()
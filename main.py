@@ -1,8 +1,8 @@
-# main.py
-import tkinter as tk
-from ui_main import MindustryLauncher
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = MindustryLauncher(root)
+# main.py
+import tkinter as tk
+from ui_main import MindustryLauncher
+
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = MindustryLauncher(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,242 @@
+# map_catalog.py
+import json
+import os
+import re
+import struct
+import threading
+import zipfile
+import zlib
+
+# 索引文件格式版本，格式变化时旧索引自动失效
+INDEX_VERSION = 1
+# 解压 .msav 头部时每次读取的字节数
+READ_SIZE = 16 * 1024
+# 头部元数据区的最大长度，防止损坏文件导致大量读取
+MAX_META_SIZE = 1024 * 1024
+
+MSAV_HEADER = b"MSAV"
+# Mindustry 颜色标记，如 [accent]、[#ff0000]、[]
+_COLOR_RE = re.compile(r"\[(?:#?[0-9a-zA-Z]*)\]")
+
+
+def strip_colors(text):
+    return _COLOR_RE.sub("", text)
+
+
+class MapInfo:
+    """地图目录中的一条记录"""
+    __slots__ = ("name", "author", "width", "height", "kind", "path")
+
+    def __init__(self, name, author, width, height, kind, path):
+        self.name = name
+        self.author = author
+        self.width = width
+        self.height = height
+        self.kind = kind  # "Custom" 或 "Default"
+        self.path = path
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(*(data.get(slot) for slot in cls.__slots__))
+
+    def __repr__(self):
+        return f"MapInfo({self.name!r}, {self.kind}, {self.width}x{self.height})"
+
+
+def read_msav_meta(stream):
+    """
+    读取 .msav 的元数据（StringMap），只解压到元数据区结束为止。
+
+    文件格式：整体 zlib 压缩；解压后为 "MSAV" + int 版本 + int 元数据长度 +
+    short 键值对数 + (writeUTF 键, writeUTF 值)*。
+    """
+    inflater = zlib.decompressobj()
+    data = b""
+    need = 12
+    while len(data) < need:
+        # 只解压需要的长度，多余的输入留在 unconsumed_tail 中
+        chunk = inflater.unconsumed_tail or stream.read(READ_SIZE)
+        if not chunk:
+            raise ValueError("文件过短")
+        data += inflater.decompress(chunk, need - len(data))
+        if len(data) >= 12 and need == 12:
+            if data[:4] != MSAV_HEADER:
+                raise ValueError("不是 msav 文件")
+            meta_size = struct.unpack(">i", data[8:12])[0]
+            if not 0 < meta_size <= MAX_META_SIZE:
+                raise ValueError("元数据长度异常")
+            need = 12 + meta_size
+
+    meta = memoryview(data)[12:need]
+    count = struct.unpack(">h", meta[:2])[0]
+    pos = 2
+    tags = {}
+    for _ in range(count):
+        values = []
+        for _ in range(2):
+            length = struct.unpack(">H", meta[pos:pos + 2])[0]
+            pos += 2
+            values.append(bytes(meta[pos:pos + length]).decode("utf-8", "replace"))
+            pos += length
+        tags[values[0]] = values[1]
+    return tags
+
+
+# 索引文件路径 -> (条目字典, 锁)；多台服务器的目录共用同一个索引文件时也共用内存中的条目，
+# 保存时写出全部服务器的条目，不会互相覆盖
+_shared_indexes = {}
+_shared_indexes_lock = threading.Lock()
+
+
+def _load_index(index_path):
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == INDEX_VERSION:
+            return data.get("entries", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def _shared_index(index_path):
+    key = os.path.abspath(index_path)
+    with _shared_indexes_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = _shared_indexes[key] = (_load_index(index_path), threading.Lock())
+        return index
+
+
+def _map_info(tags, kind, path):
+    fallback = os.path.splitext(os.path.basename(path))[0]
+
+    def to_int(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return 0
+
+    return MapInfo(strip_colors(tags.get("name") or fallback).strip(),
+                   strip_colors(tags.get("author", "")).strip(),
+                   to_int(tags.get("width")), to_int(tags.get("height")),
+                   kind, path)
+
+
+class MapCatalog:
+    """
+    基于文件系统的地图目录，不需要服务器运行。
+
+    扫描 jar 所在工作目录下的 config/maps/*.msav（自定义地图）以及 jar 内置的
+    maps/*.msav（默认地图），结果按 (路径, mtime, 大小) 持久化到索引文件，
+    之后只重新解析发生变化的文件。同一索引文件的各个目录在进程内共用一份条目。
+    """
+
+    def __init__(self, index_path, jar_path, workdir=None):
+        self.index_path = index_path
+        self.jar_path = jar_path
+        self.workdir = os.path.abspath(workdir or os.path.dirname(os.path.abspath(jar_path)))
+        self.map_dir = os.path.join(self.workdir, "config", "maps")
+        self._entries, self._lock = _shared_index(index_path)
+
+    # ------------------------------------------------------------------
+    def _save_index(self):
+        """写出索引文件（持有 self._lock 时调用）"""
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "entries": self._entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"保存地图索引失败: {e}")
+
+    # ------------------------------------------------------------------
+    def cached(self):
+        """直接返回索引中的地图（不访问文件系统）"""
+        jar = os.path.abspath(self.jar_path)
+        with self._lock:
+            entries = dict(self._entries)
+        maps = []
+        keys = sorted(key for key in entries if os.path.dirname(key) == self.map_dir)
+        for key in [jar] + keys:
+            entry = entries.get(key)
+            if entry:
+                maps.extend(MapInfo.from_dict(m) for m in entry["maps"])
+        return maps
+
+    def scan(self):
+        """重新扫描，只解析变化的文件；返回全部地图列表"""
+        changed = False
+        seen = set()
+        maps = []
+
+        jar = os.path.abspath(self.jar_path)
+        jar_maps, jar_changed = self._scan_file(jar, self._read_jar)
+        maps.extend(jar_maps)
+        changed |= jar_changed
+        seen.add(jar)
+
+        try:
+            with os.scandir(self.map_dir) as it:
+                paths = sorted(e.path for e in it if e.is_file() and e.name.endswith(".msav"))
+        except OSError:
+            paths = []
+        for path in paths:
+            file_maps, file_changed = self._scan_file(path, self._read_custom)
+            maps.extend(file_maps)
+            changed |= file_changed
+            seen.add(path)
+
+        with self._lock:
+            # 目录中已删除的文件（同一 map_dir 与 jar 下）从索引移除
+            stale = [key for key in self._entries
+                     if key not in seen and (os.path.dirname(key) == self.map_dir or key == jar)]
+            for key in stale:
+                del self._entries[key]
+            changed |= bool(stale)
+            if changed:
+                self._save_index()
+        return maps
+
+    def _scan_file(self, path, reader):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return [], False
+        with self._lock:
+            entry = self._entries.get(path)
+        if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return [MapInfo.from_dict(m) for m in entry["maps"]], False
+
+        maps = reader(path)
+        with self._lock:
+            self._entries[path] = {"mtime": st.st_mtime_ns, "size": st.st_size,
+                                   "maps": [m.to_dict() for m in maps]}
+        return maps, True
+
+    def _read_custom(self, path):
+        try:
+            with open(path, "rb") as f:
+                return [_map_info(read_msav_meta(f), "Custom", path)]
+        except (OSError, ValueError, struct.error, zlib.error) as e:
+            print(f"读取地图失败 {path}: {e}")
+            return []
+
+    def _read_jar(self, path):
+        """读取 jar 内置的 maps/*.msav 作为默认地图"""
+        maps = []
+        try:
+            with zipfile.ZipFile(path) as jar:
+                for name in sorted(jar.namelist()):
+                    if name.startswith("maps/") and name.endswith(".msav"):
+                        try:
+                            with jar.open(name) as f:
+                                maps.append(_map_info(read_msav_meta(f), "Default", f"{path}!/{name}"))
+                        except (ValueError, struct.error, zlib.error) as e:
+                            print(f"读取内置地图失败 {name}: {e}")
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"读取服务器 jar 失败: {e}")
+        return maps
@@ -1,118 +1,182 @@
-# map_list.py
-import tkinter as tk
-from tkinter import messagebox
-import re
-from button_style2 import create_gradient_button  # 导入样式按钮
-import os
-import json
-def show_map_list(main_window, process, send_cmd, add_listener, remove_listener):
-    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-    SETTINGS_PATH = os.path.join(SCRIPT_DIR, "settings.json")
-    with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-        settings = json.load(f)
-
-    win = tk.Toplevel(main_window.root, bg=settings["color"]["windows_bg"])
-    win.title("地图列表")
-    win.geometry("400x400")
-    win.transient(main_window.root)
-    win.grab_set()
-
-    # 提示标签：水平填充以消除左侧白边
-    label = tk.Label(win, text="正在获取地图列表...", bg=settings["color"]["windows_bg"], font=('微软雅黑', 12))
-    label.pack(pady=5, fill='x')
-
-    # 带滚动条的 Canvas，背景色与窗口一致
-    canvas = tk.Canvas(win, borderwidth=0, bg=settings["color"]["windows_bg"])
-    scrollbar = tk.Scrollbar(win, orient="vertical", command=canvas.yview, bg=settings["color"]["windows_bg"])
-    scrollable_frame = tk.Frame(canvas, bg=settings["color"]["windows_bg"])
-
-    scrollable_frame.bind(
-        "<Configure>",
-        lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-    )
-
-    # 创建内部窗口并保存ID，用于动态调整宽度
-    frame_id = canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-
-    def _configure_canvas(event):
-        # 将内部frame的宽度设置为Canvas的宽度
-        canvas.itemconfig(frame_id, width=event.width)
-
-    canvas.bind('<Configure>', _configure_canvas)
-
-    canvas.configure(yscrollcommand=scrollbar.set)
-
-    canvas.pack(side="left", fill="both", expand=True)
-    scrollbar.pack(side="right", fill="y")
-
-    map_names = []
-    collecting = True
-
-    def parse_line(line):
-        # 精确匹配地图行：时间戳后至少两个空格，地图名后跟 ": Default / 数字x数字" 或 ": Custom / 数字x数字"
-        match = re.search(r'\[\d{2}-\d{2}-\d{4} \d{2}:\d{2}:\d{2}\] \[I\]\s{2,}([^:]+): (?:Default|Custom) / \d+x\d+', line)
-        if match:
-            map_name = match.group(1).strip()
-            map_names.append(map_name)
-        # 地图目录行作为结束标记
-        if "Map directory:" in line:
-            return True
-        return False
-
-    def listener(line):
-        nonlocal collecting
-        if not collecting:
-            return False
-        if not win.winfo_exists():
-            return True  # 窗口已关闭，移除监听器
-        ret = parse_line(line)
-        if ret:
-            collecting = False
-            win.after(0, update_ui)
-            return True
-        return False
-
-    def update_ui():
-        label.config(text="地图列表：")
-        for widget in scrollable_frame.winfo_children():
-            widget.destroy()
-        for name in map_names:
-            frame = tk.Frame(scrollable_frame, bg=settings["color"]["entry"])
-            frame.pack(fill=tk.X, padx=0, pady=2)
-
-            # 地图名标签：去掉固定宽度，填充剩余空间
-            lbl = tk.Label(frame, text=name, anchor="w", bg=settings["color"]["entry"], padx=5)
-            lbl.pack(side=tk.LEFT, fill='x', expand=True, padx=(0, 10))
-
-            # 按钮宽度固定
-            btn = create_gradient_button(frame, text="切换", command=lambda n=name: switch_map(n), width=60, height=25)
-            btn.pack(side=tk.RIGHT, padx=5)
-
-    def switch_map(map_name):
-        send_cmd(f"nextmap {map_name}")
-        send_cmd("gameover")
-        messagebox.showinfo("切换", f"已发送切换至地图 {map_name} 指令", parent=win)
-
-    # 注册监听器
-    add_listener(listener)
-
-    def on_close():
-        remove_listener(listener)
-        win.destroy()
-
-    win.protocol("WM_DELETE_WINDOW", on_close)
-
-    # 发送指令
-    send_cmd("maps all")
-
-    # 超时处理
-    win.after(5000, lambda: check_timeout())
-
-    def check_timeout():
-        nonlocal collecting
-        if collecting and win.winfo_exists():
-            collecting = False
-            label.config(text="获取地图列表超时，请检查服务器输出")
-            if map_names:
-                update_ui()
-            remove_listener(listener)
\ No newline at end of file
+# map_list.py
+import tkinter as tk
+from tkinter import messagebox
+from button_style2 import create_gradient_button, create_button_images  # 导入样式按钮
+from virtual_list import VirtualList
+from map_search import MapSearchIndex
+import os
+import json
+import threading
+from server_controller import CommandTimeout
+
+# "maps all" 回复的结束标记
+MAPS_END_MARKER = "Map directory:"
+# 列表每行高度（像素），含上下各 2 像素间距
+ROW_HEIGHT = 33
+
+
+def parse_map_names(records):
+    """从 "maps all" 的回复中提取地图名"""
+    names = []
+    for record in records:
+        # 地图行：[I] 后带缩进，地图名后跟 ": Default / 数字x数字" 或 ": Custom / 数字x数字"
+        # 时间戳与级别已由 LogParser 解析，这里只做字符串切分
+        message = record.message
+        if record.level == "I" and message[:1].isspace():
+            name, sep, rest = message.strip().rpartition(": ")
+            kind, _, size = rest.partition(" / ")
+            if sep and kind in ("Default", "Custom") and "x" in size:
+                names.append(name.strip())
+    return names
+
+
+def show_map_list(main_window):
+    # 地图窗口绑定打开时所在标签页的服务器，之后切换标签页不影响
+    controller = main_window.controller
+    send_cmd = controller.send_command
+    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+    SETTINGS_PATH = os.path.join(SCRIPT_DIR, "settings.json")
+    with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+        settings = json.load(f)
+
+    win = tk.Toplevel(main_window.root, bg=settings["color"]["windows_bg"])
+    win.title("地图列表")
+    win.geometry("400x400")
+    win.transient(main_window.root)
+    win.grab_set()
+
+    # 提示标签：水平填充以消除左侧白边
+    label = tk.Label(win, text="正在读取地图目录...", bg=settings["color"]["windows_bg"], font=('微软雅黑', 12))
+    label.pack(pady=5, fill='x')
+
+    # 搜索框：输入即过滤，回车切换到排名第一的地图
+    search_var = tk.StringVar()
+    search_entry = tk.Entry(win, textvariable=search_var, font=('微软雅黑', 10),
+                            bg=settings["color"]["entry"])
+    search_entry.pack(fill='x', padx=5, pady=(0, 5))
+
+    # 所有行共用一组按钮图像
+    button_images = create_button_images(60, 25)
+
+    def create_row(parent):
+        row = tk.Frame(parent, bg=settings["color"]["windows_bg"])
+        inner = tk.Frame(row, bg=settings["color"]["entry"])
+        inner.pack(fill=tk.BOTH, expand=True, pady=2)
+
+        # 地图名标签：去掉固定宽度，填充剩余空间
+        row.name_label = tk.Label(inner, anchor="w", bg=settings["color"]["entry"], padx=5)
+        row.name_label.pack(side=tk.LEFT, fill='x', expand=True, padx=(0, 10))
+        row.name_label.bind("<Double-Button-1>", lambda e: switch_map(row.map_name))
+
+        # 按钮宽度固定；点击时读取该行当前绑定的地图名
+        btn = create_gradient_button(inner, text="切换", command=lambda: switch_map(row.map_name),
+                                     width=60, height=25, images=button_images)
+        btn.pack(side=tk.RIGHT, padx=5)
+        return row
+
+    def bind_row(row, name, index):
+        row.map_name = name
+        row.name_label.config(text=name)
+
+    # 虚拟化列表：只为可见行创建控件，滚动时复用
+    map_view = VirtualList(win, ROW_HEIGHT, create_row, bind_row, bg=settings["color"]["windows_bg"])
+    map_view.pack(fill="both", expand=True)
+
+    map_names = []
+    closed = False
+    search_index = MapSearchIndex()
+    shown = []  # 当前过滤后显示的地图名
+
+    def list_title():
+        if controller.process is None:
+            return "地图列表（服务器未运行，启动后才能切换）："
+        return "地图列表："
+
+    # ---------------- 本地地图目录：不需要服务器 ----------------
+    catalog = main_window.get_map_catalog()
+
+    def show_catalog(maps, final):
+        if closed:
+            return
+        names = [m.name for m in maps]
+        if names:
+            if names != map_names:
+                map_names[:] = names
+                update_ui()
+        elif final:
+            if controller.process is not None:
+                # 目录为空（如 jar 无法读取）时退回到向服务器查询
+                label.config(text="正在获取地图列表...")
+                controller.request("maps all", until=MAPS_END_MARKER, timeout=10).add_done_callback(on_reply)
+            else:
+                label.config(text="未找到地图，请检查服务器jar路径")
+
+    def rescan():
+        try:
+            maps = catalog.scan()
+        except Exception as e:
+            print(f"扫描地图目录失败: {e}")
+            maps = []
+        main_window.pump.post(show_catalog, maps, True)
+
+    # ---------------- 向服务器查询（回退路径） ----------------
+    def on_reply(future):
+        # 在读取线程或计时器线程中执行，界面更新交给主线程
+        main_window.pump.post(show_reply, future)
+
+    def show_reply(future):
+        if closed:
+            return
+        try:
+            map_names[:] = parse_map_names(future.result())
+        except CommandTimeout as e:
+            map_names[:] = parse_map_names(e.records)
+            label.config(text="获取地图列表超时，请检查服务器输出")
+            if map_names:
+                update_ui(keep_label=True)
+            return
+        except Exception as e:
+            label.config(text=f"获取地图列表失败：{e}")
+            return
+        update_ui()
+
+    def update_ui(keep_label=False):
+        if not keep_label:
+            label.config(text=list_title())
+        search_index.build(map_names)
+        apply_filter()
+
+    def apply_filter(*_):
+        shown[:] = [search_index.names[i] for i in search_index.search(search_var.get())]
+        map_view.set_items(shown)
+        map_view.scroll_to(0)
+
+    def switch_first(event=None):
+        if shown:
+            switch_map(shown[0])
+
+    search_var.trace_add("write", apply_filter)
+    search_entry.bind("<Return>", switch_first)
+    search_entry.focus_set()
+
+    def switch_map(map_name):
+        if controller.process is None:
+            messagebox.showwarning("切换", "服务器未运行，无法切换地图", parent=win)
+            return
+        send_cmd(f"nextmap {map_name}")
+        send_cmd("gameover")
+        messagebox.showinfo("切换", f"已发送切换至地图 {map_name} 指令", parent=win)
+
+    def on_close():
+        nonlocal closed
+        closed = True
+        win.destroy()
+
+    win.protocol("WM_DELETE_WINDOW", on_close)
+
+    if catalog is None:
+        label.config(text="错误：未设置服务器jar路径")
+        return
+    # 先显示索引中的结果，再在后台只重新解析发生变化的文件
+    show_catalog(catalog.cached(), False)
+    threading.Thread(target=rescan, daemon=True).start()
\ No newline at end of file
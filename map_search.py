@@ -0,0 +1,116 @@
+# map_search.py
+import re
+
+from map_catalog import strip_colors
+
+_SPACE_RE = re.compile(r"[\s_]+")
+
+# 排名分档：越小越靠前
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_WORD_PREFIX = 2
+RANK_SUBSTRING = 3
+RANK_FUZZY = 4
+
+
+def normalize(name):
+    """统一大小写、去掉颜色标记，空格与下划线视为同一分隔符（与 nextmap 的匹配规则一致）"""
+    return _SPACE_RE.sub(" ", strip_colors(name)).strip().lower()
+
+
+def _trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MapSearchIndex:
+    """
+    地图名的增量搜索索引。
+
+    预先建立规范化名称与三元组（trigram）倒排表：三个字符以上的查询先用倒排表
+    取交集得到候选，再做子串确认；没有子串命中时按共享三元组数量和子序列做模糊匹配。
+    """
+
+    def __init__(self, names=()):
+        self.build(names)
+
+    def build(self, names):
+        self.names = list(names)
+        self.normalized = [normalize(name) for name in self.names]
+        self.postings = {}
+        for i, text in enumerate(self.normalized):
+            for gram in _trigrams(text):
+                self.postings.setdefault(gram, []).append(i)
+
+    def search(self, query):
+        """返回按相关度排序的名称下标列表；空查询返回全部（保持原顺序）"""
+        q = normalize(query)
+        if not q:
+            return list(range(len(self.names)))
+
+        if len(q) >= 3:
+            grams = _trigrams(q)
+            # 查询首尾的填充三元组只在整词边界出现，子串匹配时不作要求
+            inner = {g for g in grams if " " not in (g[0], g[-1])} or grams
+            candidates = self._intersect(inner)
+        else:
+            candidates = range(len(self.names))
+
+        ranked = []
+        for i in candidates:
+            rank = self._rank(q, self.normalized[i])
+            if rank is not None:
+                ranked.append((rank, i))
+        if not ranked:
+            ranked = self._fuzzy(q)
+        ranked.sort(key=lambda item: (item[0], len(self.normalized[item[1]]), self.normalized[item[1]]))
+        return [i for _, i in ranked]
+
+    # ------------------------------------------------------------------
+    def _intersect(self, grams):
+        lists = []
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return []
+            lists.append(posting)
+        lists.sort(key=len)
+        result = set(lists[0])
+        for posting in lists[1:]:
+            result.intersection_update(posting)
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def _rank(q, text):
+        if text == q:
+            return (RANK_EXACT, 0)
+        pos = text.find(q)
+        if pos < 0:
+            return None
+        if pos == 0:
+            return (RANK_PREFIX, 0)
+        if text[pos - 1] == " ":
+            return (RANK_WORD_PREFIX, pos)
+        return (RANK_SUBSTRING, pos)
+
+    def _fuzzy(self, q):
+        """容错匹配：共享三元组越多越靠前，子序列匹配作为兜底"""
+        counts = {}
+        grams = _trigrams(q)
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        threshold = max(2, len(grams) // 2)
+        ranked = [((RANK_FUZZY, -count), i) for i, count in counts.items() if count >= threshold]
+        matched = {i for _, i in ranked}
+        for i, text in enumerate(self.normalized):
+            if i not in matched and _is_subsequence(q, text):
+                ranked.append(((RANK_FUZZY, 0), i))
+        return ranked
+
+
+def _is_subsequence(q, text):
+    it = iter(text)
+    return all(ch in it for ch in q)
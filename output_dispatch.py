@@ -0,0 +1,133 @@
+# output_dispatch.py
+import re
+import threading
+
+
+class _Entry:
+    """一个已注册的监听器及其谓词"""
+    __slots__ = ("listener", "level", "pattern", "combinable")
+
+    def __init__(self, listener, level, pattern, combinable):
+        self.listener = listener
+        self.level = level
+        self.pattern = pattern
+        self.combinable = combinable
+
+
+class _Group:
+    """同一日志级别下的监听器集合（不可变快照的一部分）"""
+    __slots__ = ("always", "patterned", "separate", "combined")
+
+    def __init__(self, entries):
+        # 没有文本谓词的监听器：级别命中即调用
+        self.always = tuple(e for e in entries if e.pattern is None)
+        self.patterned = tuple(e for e in entries if e.pattern is not None)
+        self.separate = tuple(e for e in self.patterned if not e.combinable)
+        # 所有可合并的文本谓词编译为一个正则，大多数行只需扫描这一次
+        sources = [f"(?:{e.pattern.pattern})" for e in self.patterned if e.combinable]
+        self.combined = re.compile("|".join(sources)) if sources else None
+
+
+class OutputDispatcher:
+    """
+    按谓词索引的输出分发器。
+
+    监听器注册时可指定：字面前缀、子串、日志级别或正则（作用于 LogRecord.message）。
+    级别通过字典直接索引；同一级别下的文本谓词合并为一个正则，行未命中时
+    一次扫描即可跳过全部监听器，命中后才逐个确认。
+    注册与移除可在任意线程调用：写操作加锁并重建不可变快照，分发时只读快照。
+    监听器返回 True 时被移除（与旧接口一致）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._groups = {}
+
+    def add(self, listener, prefix=None, contains=None, level=None, regex=None):
+        """注册监听器，prefix / contains / regex 至多指定一个"""
+        if sum(p is not None for p in (prefix, contains, regex)) > 1:
+            raise ValueError("prefix、contains、regex 只能指定一个")
+        combinable = True
+        if prefix is not None:
+            pattern = re.compile(r"\A" + re.escape(prefix))
+        elif contains is not None:
+            pattern = re.compile(re.escape(contains))
+        elif regex is not None:
+            pattern = re.compile(regex) if isinstance(regex, str) else regex
+            # 带额外标志（如 IGNORECASE）或捕获分组（可能被反向引用）的正则无法安全合并，单独匹配
+            combinable = not (pattern.flags & ~re.UNICODE) and pattern.groups == 0
+        else:
+            pattern = None
+        with self._lock:
+            self._entries.append(_Entry(listener, level, pattern, combinable))
+            self._rebuild()
+        return listener
+
+    def remove(self, listener):
+        with self._lock:
+            entries = [e for e in self._entries if e.listener is not listener]
+            if len(entries) != len(self._entries):
+                self._entries = entries
+                self._rebuild()
+
+    def clear(self):
+        with self._lock:
+            self._entries = []
+            self._rebuild()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _rebuild(self):
+        by_level = {}
+        for entry in self._entries:
+            by_level.setdefault(entry.level, []).append(entry)
+        # 赋值是原子的，分发线程总能看到完整的快照
+        self._groups = {level: _Group(entries) for level, entries in by_level.items()}
+
+    # ------------------------------------------------------------------
+    def dispatch(self, records):
+        """把一批记录分发给匹配的监听器（读取线程调用）"""
+        groups = self._groups
+        if not groups:
+            return
+        any_level = groups.get(None)
+        finished = []
+        for record in records:
+            if any_level is not None:
+                self._dispatch_group(any_level, record, finished)
+            if record.level is not None:
+                group = groups.get(record.level)
+                if group is not None:
+                    self._dispatch_group(group, record, finished)
+            if finished:
+                for listener in finished:
+                    self.remove(listener)
+                finished.clear()
+                groups = self._groups
+                if not groups:
+                    return
+                any_level = groups.get(None)
+
+    def _dispatch_group(self, group, record, finished):
+        for entry in group.always:
+            self._call(entry, record, finished)
+        if not group.patterned:
+            return
+        message = record.message
+        if group.combined is not None and group.combined.search(message) is None:
+            # 合并正则未命中：只需检查不可合并的谓词
+            candidates = group.separate
+        else:
+            candidates = group.patterned
+        for entry in candidates:
+            if entry.pattern.search(message):
+                self._call(entry, record, finished)
+
+    def _call(self, entry, record, finished):
+        try:
+            if entry.listener(record):
+                finished.append(entry.listener)
+        except Exception as e:
+            print(f"输出监听器出错: {e}")
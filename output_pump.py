@@ -0,0 +1,183 @@
+# output_pump.py
+import collections
+import threading
+from log_parser import local_records
+
+# 每帧间隔（毫秒），约 60 帧/秒
+FRAME_MS = 16
+# 每帧最多写入终端的行数，超出部分留到下一帧
+MAX_LINES_PER_TICK = 5000
+# 理论吞吐上限（行/秒）：MAX_LINES_PER_TICK * 1000 / FRAME_MS ≈ 312500
+LINES_PER_SECOND_CEILING = MAX_LINES_PER_TICK * 1000 // FRAME_MS
+
+
+class OutputChannel:
+    """
+    输出泵中的一路输出（对应一个终端，例如一台服务器）。
+
+    put_* 方法任意线程可调用；写入与状态回调由输出泵在主线程执行。
+    """
+
+    def __init__(self, output_sink, status_callback=None):
+        self.output_sink = output_sink
+        self.status_callback = status_callback
+        # deque 的 append/extend/popleft 是线程安全的
+        self._lines = collections.deque()
+        self._lock = threading.Lock()
+        self._status = None
+
+    def put_records(self, records):
+        """放入一批已解析的输出记录"""
+        self._lines.extend(records)
+
+    def put_output(self, text):
+        """放入一段启动器自身的文本（可包含多行）"""
+        if text:
+            self._lines.extend(local_records(text))
+
+    def put_status(self, text):
+        """放入状态文本，同一帧内只保留最后一次"""
+        with self._lock:
+            self._status = text
+
+    def pending(self):
+        return len(self._lines)
+
+    def _flush(self, max_lines):
+        lines = self._lines
+        count = min(len(lines), max_lines)
+        if count:
+            self.output_sink([lines.popleft() for _ in range(count)])
+
+        with self._lock:
+            status, self._status = self._status, None
+        if status is not None and self.status_callback:
+            self.status_callback(status)
+        return count
+
+
+class OutputPump:
+    """
+    后台线程与 Tk 主线程之间的输出泵。
+
+    读取线程只负责把解析好的记录和回调放进队列；Tk 主循环每帧通过 after()
+    取出队列，每路输出合并为一次插入、一次滚动，避免在非主线程中操作 Tk。
+    多台服务器共用同一个输出泵，各自占一路 OutputChannel。
+    """
+
+    def __init__(self, root, output_sink=None, frame_ms=FRAME_MS,
+                 max_lines_per_tick=MAX_LINES_PER_TICK):
+        """
+        :param root: Tk 根窗口，用于 after() 调度
+        :param output_sink: 默认输出通道的写入函数，接受一帧内的 LogRecord 列表
+        """
+        self.root = root
+        self.frame_ms = frame_ms
+        self.max_lines_per_tick = max_lines_per_tick
+        self.channels = []
+        self.default = self.add_channel(output_sink) if output_sink else None
+        self._calls = collections.deque()
+        self._after_id = None
+        # 统计信息，用于测量吞吐
+        self.lines_total = 0
+        self.ticks_total = 0
+
+    def add_channel(self, output_sink, status_callback=None):
+        """新增一路输出，仅主线程调用"""
+        channel = OutputChannel(output_sink, status_callback)
+        self.channels = self.channels + [channel]
+        return channel
+
+    def remove_channel(self, channel):
+        self.channels = [c for c in self.channels if c is not channel]
+
+    # ---------------- 任意线程可调用（默认通道） ----------------
+    def put_records(self, records):
+        self.default.put_records(records)
+
+    def put_output(self, text):
+        self.default.put_output(text)
+
+    def put_status(self, text):
+        self.default.put_status(text)
+
+    def post(self, func, *args):
+        """把任意回调转交到 Tk 主线程执行"""
+        self._calls.append((func, args))
+
+    # ---------------- 仅主线程调用 ----------------
+    def bind_status(self, status_callback):
+        self.default.status_callback = status_callback
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.frame_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        try:
+            self.flush()
+        finally:
+            self._after_id = self.root.after(self.frame_ms, self._tick)
+
+    def flush(self):
+        """把各通道队列中的内容一次性写入界面"""
+        for channel in self.channels:
+            try:
+                self.lines_total += channel._flush(self.max_lines_per_tick)
+            except Exception as e:
+                print(f"输出泵写入失败: {e}")
+        self.ticks_total += 1
+
+        calls = self._calls
+        for _ in range(len(calls)):
+            func, args = calls.popleft()
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"输出泵回调失败: {e}")
+
+    def pending(self):
+        return sum(channel.pending() for channel in self.channels)
+
+# ----------------------------------------------------------------------
+if __name__ == '__main__':
+    # 简单压测：后台线程尽可能快地写入，统计终端实际吞吐（行/秒）
+    import time
+    import tkinter as tk
+    from tkinter import scrolledtext
+
+    root = tk.Tk()
+    root.title("OutputPump benchmark")
+    area = scrolledtext.ScrolledText(root, font=('Consolas', 10))
+    area.pack(fill=tk.BOTH, expand=True)
+
+    def sink(records):
+        area.insert(tk.END, "".join(r.raw for r in records))
+        area.see(tk.END)
+
+    pump = OutputPump(root, sink)
+    pump.start()
+    total = 200000
+    start_time = time.perf_counter()
+
+    def flood():
+        for i in range(total):
+            pump.put_output(f"[01-01-2024 00:00:00] [I] line {i}\n")
+
+    def report():
+        if pump.lines_total < total:
+            root.after(100, report)
+            return
+        elapsed = time.perf_counter() - start_time
+        print(f"{total} 行耗时 {elapsed:.2f}s，约 {total / elapsed:.0f} 行/秒"
+              f"（上限 {LINES_PER_SECOND_CEILING} 行/秒，{pump.ticks_total} 帧）")
+        root.destroy()
+
+    threading.Thread(target=flood, daemon=True).start()
+    root.after(100, report)
+    root.mainloop()
@@ -0,0 +1,214 @@
+# proc_sampler.py
+import collections
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 采样间隔（秒）与每台服务器保留的采样点数（默认约 5 分钟）
+DEFAULT_INTERVAL = 1.0
+DEFAULT_HISTORY = 300
+
+_PROC = "/proc"
+try:
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLK_TCK = 100
+
+
+class RawSample:
+    """一次原始读数：累计 CPU 秒数、常驻内存、线程数、累计 I/O 字节数"""
+    __slots__ = ("time", "cpu", "rss", "threads", "io")
+
+    def __init__(self, t, cpu, rss, threads, io):
+        self.time = t
+        self.cpu = cpu
+        self.rss = rss
+        self.threads = threads
+        self.io = io
+
+
+class Point:
+    """图表中的一个采样点：CPU%（多核可超过 100）、RSS 字节、线程数、I/O 字节/秒"""
+    __slots__ = ("time", "cpu", "rss", "threads", "io_rate")
+
+    def __init__(self, t, cpu, rss, threads, io_rate):
+        self.time = t
+        self.cpu = cpu
+        self.rss = rss
+        self.threads = threads
+        self.io_rate = io_rate
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def read_proc(pid):
+    """从 /proc/<pid>/stat、status、io 读取一次原始读数；io 无权限读取时记为 None"""
+    base = f"{_PROC}/{pid}"
+    t = time.monotonic()
+    stat = _read(base + "/stat")
+    # comm 字段可能含空格和括号，从最后一个 ")" 之后开始按空格切分（字段 3 起）
+    fields = stat[stat.rindex(b")") + 2:].split()
+    cpu = (int(fields[11]) + int(fields[12])) / _CLK_TCK  # utime + stime
+    threads = int(fields[17])
+    rss = None
+    for line in _read(base + "/status").splitlines():
+        if line.startswith(b"VmRSS:"):
+            rss = int(line.split()[1]) * 1024
+            break
+    try:
+        io = 0
+        for line in _read(base + "/io").splitlines():
+            key, _, value = line.partition(b":")
+            if key in (b"read_bytes", b"write_bytes"):
+                io += int(value)
+    except OSError:
+        io = None
+    return RawSample(t, cpu, rss, threads, io)
+
+
+def read_psutil(pid):
+    """没有 /proc 的平台（Windows）使用 psutil 读取同样的数据"""
+    proc = psutil.Process(pid)
+    t = time.monotonic()
+    with proc.oneshot():
+        times = proc.cpu_times()
+        rss = proc.memory_info().rss
+        threads = proc.num_threads()
+        try:
+            counters = proc.io_counters()
+            io = counters.read_bytes + counters.write_bytes
+        except (psutil.AccessDenied, AttributeError):
+            io = None
+    return RawSample(t, times.user + times.system, rss, threads, io)
+
+
+def available():
+    return os.path.isdir(_PROC) or psutil is not None
+
+
+def read_sample(pid):
+    if os.path.isdir(_PROC):
+        return read_proc(pid)
+    if psutil is not None:
+        return read_psutil(pid)
+    raise OSError("没有 /proc，也未安装 psutil")
+
+
+class ResourceSampler:
+    """
+    后台线程按固定间隔采样所有已注册服务器进程的资源占用。
+
+    每个间隔在同一个线程中依次读取所有进程，换算为 Point 存入定长环形缓冲；
+    界面线程只通过 history() 取快照，不做任何系统调用。
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, history=DEFAULT_HISTORY):
+        self.interval = interval
+        self.history_size = history
+        self._targets = {}  # key -> get_pid()
+        self._buffers = {}  # key -> deque[Point]
+        self._last = {}     # key -> (pid, RawSample)
+        self._lock = threading.Lock()
+        self._stop = None   # 当前采样线程专属的停止事件
+        self._thread = None
+
+    def add(self, key, get_pid):
+        """
+        注册一个采样对象。
+
+        :param get_pid: get_pid() -> pid 或 None（进程未运行）；每次采样时调用，服务器重启后自动跟随新进程
+        """
+        with self._lock:
+            self._targets[key] = get_pid
+            self._buffers[key] = collections.deque(maxlen=self.history_size)
+
+    def remove(self, key):
+        with self._lock:
+            self._targets.pop(key, None)
+            self._buffers.pop(key, None)
+            self._last.pop(key, None)
+
+    def history(self, key):
+        """返回该服务器的采样点列表（快照）"""
+        with self._lock:
+            buffer = self._buffers.get(key)
+            return list(buffer) if buffer is not None else []
+
+    def latest(self, key):
+        with self._lock:
+            buffer = self._buffers.get(key)
+            return buffer[-1] if buffer else None
+
+    # ------------------------------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._thread is not None or not available():
+                return
+            # 每次启动使用新的事件：stop() 后立即 start() 时，旧线程仍能看到自己的停止信号并退出
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                            name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+            self._stop = None
+            self._thread = None
+
+    def _run(self, stop):
+        while not stop.wait(self.interval):
+            with self._lock:
+                targets = list(self._targets.items())
+            for key, get_pid in targets:
+                if stop.is_set():
+                    return
+                try:
+                    pid = get_pid()
+                except Exception:
+                    pid = None
+                if pid is None:
+                    self._forget(key)
+                    continue
+                try:
+                    sample = read_sample(pid)
+                except Exception:
+                    # 进程刚好退出等情况，下一轮再试
+                    self._forget(key)
+                    continue
+                self._add_sample(key, pid, sample)
+
+    def _forget(self, key):
+        with self._lock:
+            self._last.pop(key, None)
+
+    def _add_sample(self, key, pid, sample):
+        with self._lock:
+            if key not in self._targets:
+                return  # 采样期间已被 remove()
+            last = self._last.get(key)
+            self._last[key] = (pid, sample)
+        if last is None or last[0] != pid:
+            return  # 新进程的第一个读数只作为基准
+        prev = last[1]
+        dt = sample.time - prev.time
+        if dt <= 0:
+            return
+        cpu = max(0.0, (sample.cpu - prev.cpu) / dt * 100)
+        io_rate = None
+        if sample.io is not None and prev.io is not None:
+            io_rate = max(0.0, (sample.io - prev.io) / dt)
+        point = Point(time.time(), cpu, sample.rss, sample.threads, io_rate)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is not None:
+                buffer.append(point)
@@ -0,0 +1,67 @@
+# resource_graph.py
+import tkinter as tk
+
+# (属性名, 标题, 颜色, 数值格式化)
+SERIES = (
+    ("cpu", "CPU", "#c62828", lambda v: f"{v:.0f}%"),
+    ("rss", "内存", "#1565c0", lambda v: f"{v / 1048576:.0f} MB"),
+    ("threads", "线程", "#2e7d32", lambda v: f"{v:.0f}"),
+    ("io_rate", "I/O", "#6a1b9a", lambda v: f"{v / 1024:.0f} KB/s"),
+)
+LABEL_WIDTH = 110
+
+
+class ResourceGraph(tk.Canvas):
+    """
+    资源占用小图：CPU%、内存、线程数、I/O 速率各占一栏折线。
+
+    折线和文字项只创建一次，刷新时用 coords/itemconfig 更新，不重建画布项。
+    """
+
+    def __init__(self, master, height=64, bg="#ffffff", **kwargs):
+        super().__init__(master, height=height, bg=bg, highlightthickness=0, **kwargs)
+        self._points = []
+        self._items = []
+        for name, title, color, _ in SERIES:
+            label = self.create_text(4, 0, anchor="w", text=title, fill=color, font=('Consolas', 8))
+            line = self.create_line(0, 0, 0, 0, fill=color, width=1)
+            self._items.append((label, line))
+        self.bind("<Configure>", lambda e: self._draw())
+
+    def update_points(self, points):
+        """用新的采样点列表刷新（主线程调用），没有新采样时不重绘"""
+        old = self._points
+        if old and points and len(old) == len(points) and old[-1] is points[-1]:
+            return
+        self._points = points
+        self._draw()
+
+    def _draw(self):
+        width = self.winfo_width()
+        height = self.winfo_height()
+        if width <= LABEL_WIDTH or height <= 1:
+            return
+        band = height / len(SERIES)
+        plot_width = width - LABEL_WIDTH - 4
+        points = self._points
+        for row, ((name, title, color, fmt), (label, line)) in enumerate(zip(SERIES, self._items)):
+            top = row * band
+            values = [getattr(p, name) for p in points]
+            current = values[-1] if values else None
+            text = f"{title} {fmt(current)}" if current is not None else f"{title} -"
+            self.itemconfig(label, text=text)
+            self.coords(label, 4, top + band / 2)
+
+            known = [v for v in values if v is not None]
+            if len(known) < 2:
+                self.coords(line, 0, 0, 0, 0)
+                continue
+            peak = max(known) or 1
+            step = plot_width / max(1, len(values) - 1)
+            coords = []
+            for i, v in enumerate(values):
+                if v is None:
+                    continue
+                coords.append(LABEL_WIDTH + i * step)
+                coords.append(top + band - 2 - (band - 4) * v / peak)
+            self.coords(line, *coords)
@@ -0,0 +1,163 @@
+# schedule_dialog.py
+import time
+import tkinter as tk
+from tkinter import messagebox, ttk
+from button_style2 import create_gradient_button
+from command_scheduler import parse_trigger
+
+TRIGGER_CHOICES = ("cron", "interval")
+
+
+def show_schedules(main_window):
+    """定时任务窗口：查看、添加、修改、删除任务，修改后立即保存到 settings 并生效"""
+    settings = main_window.settings
+    scheduler = main_window.scheduler
+    bg = settings["color"]["windows_bg"]
+
+    win = tk.Toplevel(main_window.root, bg=bg)
+    win.title("定时任务")
+    win.geometry("820x420")
+    win.transient(main_window.root)
+
+    list_frame = tk.Frame(win, bg=bg)
+    list_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+    job_list = tk.Listbox(list_frame, font=('Consolas', 10), exportselection=False)
+    job_list.pack(fill=tk.BOTH, expand=True)
+
+    form = tk.Frame(win, bg=bg)
+    form.pack(side=tk.RIGHT, fill=tk.Y, padx=5, pady=5)
+    name_var = tk.StringVar()
+    trigger_var = tk.StringVar(value=TRIGGER_CHOICES[0])
+    expr_var = tk.StringVar()
+    servers_var = tk.StringVar()
+    enabled_var = tk.BooleanVar(value=True)
+
+    tk.Label(form, text="名称", bg=bg).grid(row=0, column=0, sticky='w', pady=4)
+    tk.Entry(form, textvariable=name_var, width=30, bg=settings["color"]["entry"]).grid(row=0, column=1, sticky='ew')
+    tk.Label(form, text="触发方式", bg=bg).grid(row=1, column=0, sticky='w', pady=4)
+    ttk.Combobox(form, textvariable=trigger_var, values=TRIGGER_CHOICES, width=10,
+                 state="readonly").grid(row=1, column=1, sticky='w')
+    tk.Label(form, text="表达式", bg=bg).grid(row=2, column=0, sticky='w', pady=4)
+    tk.Entry(form, textvariable=expr_var, width=30, bg=settings["color"]["entry"]).grid(row=2, column=1, sticky='ew')
+    tk.Label(form, text="cron：分 时 日 月 星期，如 0 */2 * * *；interval：秒数",
+             bg=bg, fg="#555555").grid(row=3, column=0, columnspan=2, sticky='w')
+    tk.Label(form, text="服务器", bg=bg).grid(row=4, column=0, sticky='w', pady=4)
+    tk.Entry(form, textvariable=servers_var, width=30, bg=settings["color"]["entry"]).grid(row=4, column=1, sticky='ew')
+    tk.Label(form, text="逗号分隔，留空表示所有服务器", bg=bg, fg="#555555").grid(row=5, column=0, columnspan=2, sticky='w')
+    tk.Checkbutton(form, text="启用", variable=enabled_var, bg=bg).grid(row=6, column=1, sticky='w')
+    tk.Label(form, text="指令（每行一条）", bg=bg).grid(row=7, column=0, columnspan=2, sticky='w')
+    commands_text = tk.Text(form, width=40, height=8, bg=settings["color"]["entry"])
+    commands_text.grid(row=8, column=0, columnspan=2, sticky='nsew')
+
+    buttons = tk.Frame(form, bg=bg)
+    buttons.grid(row=9, column=0, columnspan=2, pady=8)
+
+    def entries():
+        return settings.setdefault("schedules", [])
+
+    def refresh():
+        jobs = {job.name: job for job in scheduler.jobs()}
+        job_list.delete(0, tk.END)
+        for entry in entries():
+            job = jobs.get(entry.get("name"))
+            mark = "●" if entry.get("enabled", True) else "○"
+            if entry.get("cron"):
+                trigger = f"cron {entry['cron']}"
+            else:
+                trigger = f"每 {entry.get('interval')} 秒"
+            next_run = ""
+            if job is not None and job.enabled and job.next_run:
+                next_run = time.strftime("  下次 %m-%d %H:%M:%S", time.localtime(job.next_run))
+            job_list.insert(tk.END, f"{mark} {entry.get('name', '')}  [{trigger}]{next_run}")
+
+    def on_select(event=None):
+        selection = job_list.curselection()
+        if not selection:
+            return
+        entry = entries()[selection[0]]
+        name_var.set(entry.get("name", ""))
+        if entry.get("cron"):
+            trigger_var.set("cron")
+            expr_var.set(entry["cron"])
+        else:
+            trigger_var.set("interval")
+            expr_var.set(str(entry.get("interval", "")))
+        servers_var.set(", ".join(entry.get("servers") or []))
+        enabled_var.set(entry.get("enabled", True))
+        commands_text.delete("1.0", tk.END)
+        commands_text.insert("1.0", "\n".join(entry.get("commands", [])))
+
+    def apply_changes():
+        main_window.save_settings()
+        for name, error in scheduler.load(entries()):
+            messagebox.showwarning("提示", f"定时任务 {name} 无效：{error}", parent=win)
+        refresh()
+
+    def save():
+        name = name_var.get().strip()
+        if not name:
+            messagebox.showwarning("提示", "请输入任务名称", parent=win)
+            return
+        entry = {"name": name}
+        expr = expr_var.get().strip()
+        if trigger_var.get() == "cron":
+            entry["cron"] = expr
+        else:
+            try:
+                entry["interval"] = float(expr) if "." in expr else int(expr)
+            except ValueError:
+                messagebox.showwarning("提示", "interval 应为秒数", parent=win)
+                return
+        try:
+            parse_trigger(entry)
+        except ValueError as e:
+            messagebox.showwarning("提示", str(e), parent=win)
+            return
+        servers = [s.strip() for s in servers_var.get().split(",") if s.strip()]
+        if servers:
+            entry["servers"] = servers
+        entry["commands"] = [line.strip() for line in commands_text.get("1.0", tk.END).splitlines() if line.strip()]
+        if not entry["commands"]:
+            messagebox.showwarning("提示", "请输入至少一条指令", parent=win)
+            return
+        entry["enabled"] = enabled_var.get()
+        # 同名任务视为修改
+        schedules = entries()
+        for i, old in enumerate(schedules):
+            if old.get("name") == name:
+                schedules[i] = entry
+                break
+        else:
+            schedules.append(entry)
+        apply_changes()
+
+    def delete():
+        selection = job_list.curselection()
+        if not selection:
+            return
+        entry = entries()[selection[0]]
+        if not messagebox.askyesno("确认", f"删除定时任务 {entry.get('name', '')}？", parent=win):
+            return
+        del entries()[selection[0]]
+        apply_changes()
+
+    def run_now():
+        name = name_var.get().strip()
+        if not scheduler.run_now(name):
+            messagebox.showwarning("提示", f"没有名为 {name} 的已保存任务", parent=win)
+
+    def new():
+        job_list.selection_clear(0, tk.END)
+        name_var.set("")
+        expr_var.set("")
+        servers_var.set("")
+        enabled_var.set(True)
+        commands_text.delete("1.0", tk.END)
+
+    create_gradient_button(buttons, text="保存", command=save, width=70, height=28).pack(side=tk.LEFT, padx=3)
+    create_gradient_button(buttons, text="新建", command=new, width=70, height=28).pack(side=tk.LEFT, padx=3)
+    create_gradient_button(buttons, text="删除", command=delete, width=70, height=28).pack(side=tk.LEFT, padx=3)
+    create_gradient_button(buttons, text="立即运行", command=run_now, width=80, height=28).pack(side=tk.LEFT, padx=3)
+
+    job_list.bind("<<ListboxSelect>>", on_select)
+    refresh()
@@ -0,0 +1,416 @@
+# scrollback.py
+import collections
+import tempfile
+import threading
+import tkinter as tk
+
+# 默认终端保留行数与字符数上限
+DEFAULT_MAX_LINES = 5000
+DEFAULT_MAX_MB = 4
+# 内存环形缓冲中保留的历史行数（未开启落盘时）
+DEFAULT_RING_LINES = 100000
+# 落盘文件中保留的历史上限（MB），超出时丢弃最旧的块
+DEFAULT_SPILL_MB = 256
+# 落盘文件中的失效空间超过有效数据且文件大于该字节数时整理文件
+SPILL_COMPACT_MIN = 4 * 1024 * 1024
+# 超出上限多少比例才触发一次批量裁剪，避免每次插入都裁剪
+TRIM_SLACK = 0.1
+# 用户向上翻看时，终端最多允许膨胀到上限的倍数
+HARD_CAP_FACTOR = 2
+# 级别镜像中表示“无级别”的占位符
+NO_LEVEL = "-"
+
+
+class Scrollback:
+    """
+    终端回滚缓冲：限制 Text 控件中的行数与字符数。
+
+    超出上限的旧行从控件头部批量删除，转存到内存环形缓冲（或临时落盘文件），
+    用户滚动到顶部时再按块调回控件。self.lines / self.levels 与控件内容逐行对应，
+    每行按日志级别（I/W/E/D）打上同名 tag。
+
+    无论是否在向上翻看，控件都不超过上限的 HARD_CAP_FACTOR 倍：调回历史使控件超限时，
+    底部的行暂存到“尾部”，此后的新输出也追加到尾部，用户滚动回底部时再按块放回控件。
+
+    每行有一个全局行号（自创建以来递增，裁剪、调回都不变），查找等功能用它定位行。
+    """
+
+    def __init__(self, text_widget, max_lines=DEFAULT_MAX_LINES, max_mb=DEFAULT_MAX_MB,
+                 ring_lines=DEFAULT_RING_LINES, spill=False, spill_mb=DEFAULT_SPILL_MB):
+        self.text = text_widget
+        self.max_lines = max(1, int(max_lines))
+        self.max_chars = int(float(max_mb) * 1024 * 1024) if max_mb else None
+        self.ring_lines = int(ring_lines)
+
+        # 控件中每一行的镜像（含换行符）及其级别
+        self.lines = collections.deque()
+        self.levels = collections.deque()
+        self._chars = 0
+
+        # 被裁剪的旧行按块保存：(文本块, 级别串, 行数)；落盘时为 (偏移, 字节数, 级别串, 行数)
+        self._blocks = collections.deque()
+        self._archived_lines = 0
+        # 暂时移出控件底部的较新的行（格式同 _blocks，按时间顺序）
+        self._tail = collections.deque()
+        self._tail_lines = 0
+        self._spill = tempfile.TemporaryFile() if spill else None
+        self.max_spill_bytes = int(float(spill_mb) * 1024 * 1024)
+        # 落盘文件的长度与其中仍被引用的字节数；被丢弃或读回的块留下失效空间，由 _compact_spill 回收
+        self._spill_end = 0
+        self._spill_live = 0
+        # 落盘文件也会被查找线程读取
+        self._spill_lock = threading.Lock()
+        # 最旧的保留行（归档块中的第一行）的全局行号
+        self._first_seq = 0
+
+        # view_callback()：视图滚动或内容变化后调用；
+        # append_callback(seq, lines, levels)：追加新行后调用，seq 为第一行的全局行号
+        self.view_callback = None
+        self.append_callback = None
+
+        # 接管滚动条回调，用于检测“滚动到顶部”
+        self._vbar_set = getattr(text_widget, "vbar", None)
+        self._vbar_set = self._vbar_set.set if self._vbar_set else None
+        self._paging = False
+        self.text.config(yscrollcommand=self._on_yscroll)
+
+    # ------------------------------------------------------------------
+    def write(self, records):
+        """追加一批 LogRecord 并按需裁剪，仅主线程调用"""
+        if not records:
+            return
+        lines = [r.raw for r in records]
+        levels = "".join(r.level or NO_LEVEL for r in records)
+        seq = self.end_seq()
+        if self._tail:
+            # 控件底部之后还有暂存的行，新输出接在它们后面，等用户滚动回底部再放回控件
+            self._tail.append(self._store("".join(lines), levels))
+            self._tail_lines += len(levels)
+            self._enforce_ring()
+            if self.append_callback:
+                self.append_callback(seq, lines, levels)
+            return
+        following = self.text.yview()[1] >= 0.999
+
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(tk.END, *_tagged_chunks(lines, levels))
+        self.lines.extend(lines)
+        self.levels.extend(levels)
+        self._chars += sum(map(len, lines))
+
+        # 用户向上翻看时放宽上限，避免正在查看的内容被立即裁掉
+        factor = 1 if following else HARD_CAP_FACTOR
+        line_limit = self.max_lines * factor
+        char_limit = self.max_chars * factor if self.max_chars else None
+        if (len(self.lines) > line_limit * (1 + TRIM_SLACK)
+                or (char_limit and self._chars > char_limit * (1 + TRIM_SLACK))):
+            # 用户向上翻看时不裁掉正在查看的行
+            keep = None if following else self._top_line() - 1
+            self._trim(line_limit, char_limit, keep)
+            if not following and self._over(line_limit, char_limit):
+                # 正在查看的行也超出了硬上限：照样裁掉最旧的行，视图停在剩下的第一行
+                self._trim(line_limit, char_limit)
+                self.text.yview("1.0")
+        self.text.config(state=tk.DISABLED)
+
+        if following:
+            self.text.see(tk.END)
+        if self.append_callback:
+            self.append_callback(seq, lines, levels)
+
+    def clear(self):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.config(state=tk.DISABLED)
+        self._first_seq += self._archived_lines + len(self.lines) + self._tail_lines
+        self.lines.clear()
+        self.levels.clear()
+        self._chars = 0
+        self._blocks.clear()
+        self._archived_lines = 0
+        self._tail.clear()
+        self._tail_lines = 0
+        if self._spill:
+            with self._spill_lock:
+                self._spill.seek(0)
+                self._spill.truncate()
+                self._spill_end = 0
+                self._spill_live = 0
+
+    def close(self):
+        if self._spill:
+            with self._spill_lock:
+                self._spill.close()
+                self._spill = None
+
+    def archived_lines(self):
+        return self._archived_lines
+
+    def widget_seq(self):
+        """控件第 1 行的全局行号"""
+        return self._first_seq + self._archived_lines
+
+    def end_seq(self):
+        """下一行新输出的全局行号"""
+        return self.widget_seq() + len(self.lines) + self._tail_lines
+
+    def snapshot(self):
+        """
+        当前全部保留行的快照（主线程调用，开销与块数成正比），可交给后台线程遍历。
+
+        :return: [(第一行的全局行号, 文本或 loader, 级别串)]，按时间顺序；文本以换行符分行，
+                 落盘块为 loader() -> 文本，块已被调回控件时返回 None
+        """
+        parts = []
+        seq = self._first_seq
+        for entry in self._blocks:
+            parts.append(self._part(seq, entry))
+            seq += entry[-1]
+        parts.append((seq, "".join(self.lines), "".join(self.levels)))
+        seq += len(self.lines)
+        for entry in self._tail:
+            parts.append(self._part(seq, entry))
+            seq += entry[-1]
+        return parts
+
+    def _part(self, seq, entry):
+        if self._spill:
+            return seq, self._loader(entry), entry[2]
+        return seq, entry[0], entry[1]
+
+    def _loader(self, entry):
+        def load():
+            with self._spill_lock:
+                if self._spill is None or not any(e is entry for e in self._blocks) \
+                        and not any(e is entry for e in self._tail):
+                    return None
+                self._spill.seek(entry[0])
+                return self._spill.read(entry[1]).decode("utf-8")
+        return load
+
+    def reveal(self, seq):
+        """
+        让全局行号 seq 的行出现在控件中（必要时逐块调回历史），返回其控件行号；
+        该行已被环形缓冲丢弃时返回 None
+        """
+        if seq < self._first_seq:
+            return None
+        while seq < self.widget_seq() and self._blocks:
+            self.page_in()
+        while seq >= self.widget_seq() + len(self.lines) and self._tail:
+            self.page_tail()
+        line = seq - self.widget_seq() + 1
+        if line < 1 or line > len(self.lines):
+            return None
+        return line
+
+    # ------------------------------------------------------------------
+    def _top_line(self):
+        return int(self.text.index("@0,0").split(".")[0])
+
+    def _over(self, line_limit, char_limit):
+        return (len(self.lines) > line_limit * (1 + TRIM_SLACK)
+                or bool(char_limit and self._chars > char_limit * (1 + TRIM_SLACK)))
+
+    def _hard_limits(self):
+        line_limit = self.max_lines * HARD_CAP_FACTOR
+        char_limit = self.max_chars * HARD_CAP_FACTOR if self.max_chars else None
+        return line_limit, char_limit
+
+    def _trim(self, line_limit, char_limit, keep=None):
+        """
+        从控件头部批量删除旧行，直到行数与字符数都回到上限以内；最多删除 keep 行。
+
+        :return: 删除的行数
+        """
+        lines = self.lines
+        count = max(0, len(lines) - line_limit)
+        if keep is not None:
+            count = min(count, keep)
+        removed = [lines.popleft() for _ in range(count)]
+        chars = sum(len(line) for line in removed)
+        if char_limit:
+            while (len(lines) > 1 and self._chars - chars > char_limit
+                   and (keep is None or len(removed) < keep)):
+                line = lines.popleft()
+                removed.append(line)
+                chars += len(line)
+        if not removed:
+            return 0
+        levels = "".join(self.levels.popleft() for _ in removed)
+        self._chars -= chars
+        self.text.delete("1.0", f"{len(removed) + 1}.0")
+        self._archive("".join(removed), levels)
+        return len(removed)
+
+    def _trim_bottom(self, line_limit, char_limit):
+        """从控件底部删除较新的行放到尾部的最前面，直到回到上限以内"""
+        lines = self.lines
+        removed = []
+        chars = 0
+        while len(lines) > 1 and (len(lines) > line_limit
+                                  or (char_limit and self._chars - chars > char_limit)):
+            line = lines.pop()
+            removed.append(line)
+            chars += len(line)
+        if not removed:
+            return
+        removed.reverse()
+        levels = "".join(reversed([self.levels.pop() for _ in removed]))
+        self._chars -= chars
+        self.text.delete(f"{len(lines) + 1}.0", tk.END)
+        self._tail.appendleft(self._store("".join(removed), levels))
+        self._tail_lines += len(removed)
+
+    def _store(self, block, levels):
+        """
+        保存一块行，返回 _blocks / _tail 的条目。
+
+        落盘条目为列表 [偏移, 字节数, 级别串, 行数]：整理文件时原地更新偏移，
+        查找线程持有的 loader 仍能按同一个条目读取
+        """
+        count = len(levels)
+        if not self._spill:
+            return (block, levels, count)
+        data = block.encode("utf-8")
+        with self._spill_lock:
+            offset = self._spill_end
+            self._spill.seek(offset)
+            self._spill.write(data)
+            self._spill_end += len(data)
+            self._spill_live += len(data)
+        return [offset, len(data), levels, count]
+
+    def _load(self, entry):
+        """读回条目，返回 (文本, 级别串)"""
+        if not self._spill:
+            return entry[0], entry[1]
+        with self._spill_lock:
+            offset, size, levels, count = entry
+            self._spill.seek(offset)
+            block = self._spill.read(size).decode("utf-8")
+            self._spill_live -= size
+            # 最后写入的块读回后可直接截断文件；其余的失效空间由 _compact_spill 回收
+            if offset + size == self._spill_end:
+                self._spill.truncate(offset)
+                self._spill_end = offset
+        self._compact_spill()
+        return block, levels
+
+    def _archive(self, block, levels):
+        self._blocks.append(self._store(block, levels))
+        self._archived_lines += len(levels)
+        self._enforce_ring()
+
+    def _can_drop(self, entry):
+        """丢弃 entry 后历史仍不少于上限（内存按行数含尾部，落盘按字节数）"""
+        if self._spill:
+            return self._spill_live - entry[1] >= self.max_spill_bytes
+        return self._archived_lines + self._tail_lines - entry[-1] >= self.ring_lines
+
+    def _enforce_ring(self):
+        # 内存环形缓冲（含尾部）按行数、落盘文件按字节数限制，超出时丢弃最旧的块
+        while self._blocks and self._can_drop(self._blocks[0]):
+            entry = self._blocks.popleft()
+            self._archived_lines -= entry[-1]
+            self._first_seq += entry[-1]
+            if self._spill:
+                with self._spill_lock:
+                    self._spill_live -= entry[1]
+        if self._spill:
+            self._compact_spill()
+        over = (self._spill_live > self.max_spill_bytes if self._spill
+                else self._tail_lines > self.ring_lines)
+        if not self._blocks and over:
+            # 已没有可丢弃的旧块：把尾部放回控件，由控件的上限把最旧的行裁掉
+            while self._tail:
+                self.page_tail()
+
+    def _compact_spill(self):
+        """失效空间超过有效数据时，把仍被引用的块按顺序复制到新文件并更新偏移"""
+        with self._spill_lock:
+            if (self._spill is None or self._spill_end < SPILL_COMPACT_MIN
+                    or self._spill_end < 2 * self._spill_live):
+                return
+            old = self._spill
+            new = tempfile.TemporaryFile()
+            end = 0
+            for entry in list(self._blocks) + list(self._tail):
+                old.seek(entry[0])
+                new.write(old.read(entry[1]))
+                entry[0] = end
+                end += entry[1]
+            old.close()
+            self._spill = new
+            self._spill_end = self._spill_live = end
+
+    def _pop_block(self):
+        """取出最近一次归档的块，返回 (文本, 级别串)"""
+        entry = self._blocks.pop()
+        self._archived_lines -= entry[-1]
+        return self._load(entry)
+
+    # ------------------------------------------------------------------
+    def _on_yscroll(self, first, last):
+        if self._vbar_set:
+            self._vbar_set(first, last)
+        # 仅在内容超出一屏且已滚动到顶部时调回历史
+        if float(first) <= 0.0 and float(last) < 1.0 and self._blocks and not self._paging:
+            self._paging = True
+            self.text.after_idle(self.page_in)
+        # 滚动到底部时把暂存的尾部放回控件
+        elif float(last) >= 1.0 and self._tail and not self._paging:
+            self._paging = True
+            self.text.after_idle(self.page_tail)
+        if self.view_callback:
+            self.view_callback()
+
+    def page_in(self):
+        """把最近归档的一块历史行插回控件顶部，并保持当前视图位置"""
+        self._paging = False
+        if not self._blocks:
+            return
+        block, levels = self._pop_block()
+        # 只按 \n 切分，与 Text 控件的行号保持一致
+        lines = [line + "\n" for line in block.split("\n")[:-1]]
+        self.text.config(state=tk.NORMAL)
+        self.text.insert("1.0", *_tagged_chunks(lines, levels))
+        self.lines.extendleft(reversed(lines))
+        self.levels.extendleft(reversed(levels))
+        self._chars += len(block)
+        # 控件超出硬上限时把底部的行移到尾部，顶部视图不受影响
+        self._trim_bottom(*self._hard_limits())
+        self.text.config(state=tk.DISABLED)
+        self.text.yview(f"{len(lines) + 1}.0")
+
+    def page_tail(self):
+        """把尾部最前面的一块放回控件底部，超出硬上限时裁掉顶部的旧行，并保持当前视图位置"""
+        self._paging = False
+        if not self._tail:
+            return
+        entry = self._tail.popleft()
+        self._tail_lines -= entry[-1]
+        block, levels = self._load(entry)
+        lines = [line + "\n" for line in block.split("\n")[:-1]]
+        top = self._top_line()
+        self.text.config(state=tk.NORMAL)
+        self.text.insert(tk.END, *_tagged_chunks(lines, levels))
+        self.lines.extend(lines)
+        self.levels.extend(levels)
+        self._chars += len(block)
+        removed = self._trim(*self._hard_limits())
+        self.text.config(state=tk.DISABLED)
+        self.text.yview(f"{max(1, top - removed)}.0")
+
+
+def _tagged_chunks(lines, levels):
+    """把连续同级别的行合并，生成 Text.insert 的 (文本, tag, 文本, tag, ...) 参数"""
+    args = []
+    start = 0
+    for i in range(1, len(levels) + 1):
+        if i == len(levels) or levels[i] != levels[start]:
+            level = levels[start]
+            args.append("".join(lines[start:i]))
+            args.append(level if level != NO_LEVEL else ())
+            start = i
+    return args
@@ -1,95 +1,547 @@
-# server_controller.py
-import subprocess
-import threading
-
-class ServerController:
-    def __init__(self, output_callback, status_callback):
-        """
-        :param output_callback: 处理输出行的函数，接受一个字符串参数
-        :param status_callback: 更新状态栏的函数，接受一个字符串参数
-        """
-        self.process = None
-        self.running = False
-        self.output_listeners = []
-        self.output_callback = output_callback
-        self.status_callback = status_callback
-
-    def start(self, java, jar):
-        """启动服务器进程"""
-        cmd = [java, "-jar", jar]
-        try:
-            self.process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            self.output_callback(f"服务器启动：{' '.join(cmd)}\n")
-            self.running = True
-            self.status_callback("服务器运行中")
-            threading.Thread(target=self._read_output, daemon=True).start()
-            return True
-        except Exception as e:
-            self.output_callback(f"启动失败：{e}\n")
-            return False
-
-    def stop(self):
-        """停止服务器进程"""
-        if self.process:
-            self.process.terminate()
-            self.process = None
-            self.output_callback("服务器已停止\n")
-            self.running = False
-            self.output_listeners.clear()
-            self.status_callback("已停止")
-
-    def send_command(self, cmd):
-        """发送指令到服务器"""
-        if not self.process:
-            self.output_callback("服务器未运行\n")
-            return
-        if cmd:
-            self.process.stdin.write(cmd + "\n")
-            self.process.stdin.flush()
-            self.output_callback(f"> {cmd}\n")
-
-    def add_listener(self, listener):
-        """添加输出监听器（用于地图列表等）"""
-        self.output_listeners.append(listener)
-
-    def remove_listener(self, listener):
-        if listener in self.output_listeners:
-            self.output_listeners.remove(listener)
-
-    def _read_output(self):
-        """后台读取服务器输出"""
-        while self.running and self.process:
-            line = self.process.stdout.readline()
-            if line:
-                # 通过回调在主线程处理输出
-                self.output_callback(line)
-                # 调用监听器
-                remaining = []
-                for listener in self.output_listeners:
-                    if not listener(line):
-                        remaining.append(listener)
-                self.output_listeners = remaining
-            else:
-                break
-        if self.process:
-            self.process = None
-            self.running = False
-            self.status_callback("已停止")
-
-    def exit_gracefully(self, timeout=5):
-        """发送 exit 并等待进程结束"""
-        if self.process and self.running:
-            self.running = False
-            self.send_command("exit")
-            try:
-                self.process.wait(timeout=timeout)
-            except subprocess.TimeoutExpired:
-                self.process.terminate()
\ No newline at end of file
+# server_controller.py
+import collections
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from async_backend import AsyncProcess, shared_loop
+from line_reader import read_chunks
+from log_parser import LogParser, local_records
+from output_dispatch import OutputDispatcher
+
+# 未指定结束条件时，输出静默多久视为指令回复结束（秒）
+DEFAULT_REQUEST_IDLE = 0.3
+# 服务器控制台就绪的日志行："Server loaded. Type 'help' for help."
+READY_MARKER = "Server loaded."
+# host 成功的日志行："Opened a server on port 6567."
+HOSTED_MARKER = "Opened a server on port"
+
+# 分阶段停止：依次执行，每个阶段在期限（秒）内进程退出即结束；期限为 0 的阶段跳过
+SHUTDOWN_STAGES = ("exit", "save", "terminate", "kill")
+DEFAULT_SHUTDOWN_DEADLINES = {"exit": 5, "save": 5, "terminate": 5, "kill": 3}
+DEFAULT_SAVE_COMMAND = "save shutdown"
+# exit_gracefully 在 exit 期限之后最多再等待多久（秒），之后直接终止进程
+GRACEFUL_TERMINATE_WAIT = 0.5
+SHUTDOWN_STAGE_LABELS = {
+    "exit": "发送 exit",
+    "save": "保存存档",
+    "terminate": "终止进程",
+    "kill": "强制结束进程",
+}
+
+
+class CommandTimeout(TimeoutError):
+    """request() 超时，records 为超时前已收到的输出"""
+
+    def __init__(self, cmd, records):
+        super().__init__(f"指令 {cmd} 超时")
+        self.cmd = cmd
+        self.records = records
+
+
+class _Request:
+    """一次排队中的指令请求"""
+    __slots__ = ("cmd", "until", "timeout", "idle", "silent", "reply", "future",
+                 "records", "timer", "idle_timer")
+
+    def __init__(self, cmd, until, timeout, idle, silent, reply=None):
+        self.cmd = cmd
+        if isinstance(until, str):
+            marker = until
+            until = lambda record: marker in record.message
+        self.until = until
+        self.timeout = timeout
+        self.idle = idle if idle is not None or until is not None else DEFAULT_REQUEST_IDLE
+        self.silent = silent
+        self.reply = reply
+        self.future = Future()
+        self.records = []
+        self.timer = None
+        self.idle_timer = None
+
+
+class ServerController:
+    def __init__(self, output_callback, status_callback,
+                 encoding="utf-8", errors="replace", read_mode="chunked",
+                 timing_callback=None, backend="thread", backlog=None, exit_callback=None,
+                 records_callback=None):
+        """
+        :param output_callback: 显示输出的函数，接受一个 LogRecord 列表（静默请求的回复不在其中）
+        :param status_callback: 更新状态栏的函数，接受一个字符串参数
+        :param encoding: 服务器控制台编码，同时通过 JVM 参数要求服务器使用该编码
+        :param errors: 解码错误策略（replace / ignore / strict）
+        :param read_mode: "chunked" 按块读取原始字节；"line" 使用文本模式 readline
+        :param timing_callback: 启动完成后调用，参数为启动耗时字典（读取线程中调用）
+        :param backend: "thread" 每台服务器一个读取线程；"asyncio" 所有服务器共用一个事件循环线程
+                        （此时忽略 read_mode，始终按块读取）
+        :param backlog: backlog() -> int，界面尚未处理的输出行数，asyncio 后端据此暂停读取
+        :param exit_callback: 进程退出后调用 exit_callback(returncode, requested)，
+                              requested 表示是否由 stop() 发起（读取线程或事件循环线程中调用）
+        :param records_callback: 接收全部输出（含静默请求的回复与启动器提示）的函数，用于写入日志归档
+        """
+        self.process = None
+        self.running = False
+        self.stopping = False
+        self._stop_future = None
+        # stopping 与 _stop_future 总是在该锁内一起设置和清除
+        self._stop_lock = threading.Lock()
+        # 由 stop() 发起停止的进程；stopping 在停止线程等到退出后即被清除，不能用来判断
+        self._stop_requested = None
+        self.dispatcher = OutputDispatcher()
+        self.output_callback = output_callback
+        self.status_callback = status_callback
+        self.encoding = encoding
+        self.errors = errors
+        self.read_mode = read_mode
+        self.backend = backend
+        self.backlog = backlog
+        self.exit_callback = exit_callback
+        self.records_callback = records_callback
+        self.parser = LogParser()
+        # 指令请求按提交顺序串行执行，同一时刻只有一个请求在收集输出
+        self._request_lock = threading.Lock()
+        self._requests = collections.deque()
+        self._active_request = None
+        self._write_lock = threading.Lock()
+        # 保护 process 的赋值与清除：asyncio 后端的退出通知可能早于 start() 赋值
+        self._process_lock = threading.Lock()
+        # 启动阶段：控制台就绪后立即发送启动指令，并记录各阶段耗时
+        self.timing_callback = timing_callback
+        self.startup_commands = []
+        self.timings = {}
+        self._startup_lock = threading.Lock()
+        self._ready = False
+        self._ready_timer = None
+
+    @property
+    def ready(self):
+        """控制台已就绪且未在停止中，可以接收指令"""
+        return self._ready and self.process is not None and not self.stopping
+
+    def start(self, java, jar, cwd=None, startup_commands=("host",), ready_timeout=120,
+              jvm_args=(), server_args=()):
+        """
+        启动服务器进程。
+
+        :param cwd: 服务器工作目录（config/ 所在目录）
+        :param startup_commands: 控制台就绪后依次发送的指令
+        :param ready_timeout: 超过该秒数仍未检测到就绪行时，照常发送启动指令
+        :param jvm_args: 位于 -jar 之前的 JVM 参数（堆、GC、AppCDS 等，见 launch_profile）
+        :param server_args: 追加在 jar 之后的服务器参数
+        """
+        cmd = [java,
+               *jvm_args,
+               f"-Dfile.encoding={self.encoding}",
+               f"-Dstdout.encoding={self.encoding}",
+               f"-Dstderr.encoding={self.encoding}",
+               "-jar", jar,
+               *server_args]
+        try:
+            if self.backend == "asyncio":
+                # 读写都在共用的事件循环中进行，不创建线程；
+                # 持锁赋值，进程立即退出时 _on_exit 会等到 process 赋值后再处理
+                with self._process_lock:
+                    self.process = AsyncProcess.spawn(
+                        cmd, self._handle_lines, self._on_exit, cwd=cwd,
+                        encoding=self.encoding, errors=self.errors, backlog=self.backlog,
+                        creationflags=subprocess.CREATE_NO_WINDOW
+                    )
+                    self.running = True
+                    self.stopping = False
+            else:
+                if self.read_mode == "line":
+                    pipe_args = dict(text=True, bufsize=1, encoding=self.encoding, errors=self.errors)
+                else:
+                    # 无缓冲二进制管道，由 _read_output 自行分块解码
+                    pipe_args = dict(bufsize=0)
+                self.process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    cwd=cwd,
+                    creationflags=subprocess.CREATE_NO_WINDOW,
+                    **pipe_args
+                )
+                self.running = True
+                self.stopping = False
+            self._echo(f"服务器启动：{' '.join(cmd)}\n")
+            if self.process:
+                self.status_callback("服务器启动中")
+            self._watch_startup(startup_commands, ready_timeout)
+            if self.backend != "asyncio":
+                threading.Thread(target=self._read_output, daemon=True).start()
+            return True
+        except Exception as e:
+            self._echo(f"启动失败：{e}\n")
+            return False
+
+    # ------------------------------------------------------------------
+    def _watch_startup(self, startup_commands, ready_timeout):
+        self.startup_commands = list(startup_commands or ())
+        self.timings = {"spawn": time.monotonic()}
+        self._ready = False
+        self.add_listener(lambda record: self._on_ready(), contains=READY_MARKER, level="I")
+        if ready_timeout:
+            self._ready_timer = self.call_later(ready_timeout, self._on_ready, True)
+
+    def call_later(self, delay, func, *args):
+        """启动一次性计时器，返回带 cancel() 的对象；asyncio 后端使用事件循环计时，不创建线程"""
+        if self.backend == "asyncio":
+            return shared_loop().call_later(delay, func, *args)
+        timer = threading.Timer(delay, func, args)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _on_ready(self, timed_out=False):
+        with self._startup_lock:
+            if self._ready or not self.process:
+                return True
+            self._ready = True
+        if self._ready_timer:
+            self._ready_timer.cancel()
+            self._ready_timer = None
+        now = time.monotonic()
+        self.timings["ready"] = now
+        self.timings["spawn_to_ready"] = now - self.timings["spawn"]
+        if timed_out:
+            self._echo("警告：未检测到服务器就绪信息，照常发送启动指令\n")
+        else:
+            self._echo(f"服务器就绪，耗时 {self.timings['spawn_to_ready']:.2f}s\n")
+        self.status_callback("服务器运行中")
+
+        hosting = any(cmd.split(" ", 1)[0] == "host" for cmd in self.startup_commands)
+        if hosting:
+            self.add_listener(self._on_hosted, contains=HOSTED_MARKER, level="I")
+        self.send_commands(self.startup_commands)
+        if not hosting:
+            self._report_timings()
+        return True
+
+    def _on_hosted(self, record):
+        now = time.monotonic()
+        self.timings["ready_to_hosted"] = now - self.timings["ready"]
+        self.status_callback("服务器运行中（已开放）")
+        self._report_timings()
+        return True
+
+    def _report_timings(self):
+        if self.timing_callback:
+            self.timing_callback({key: round(value, 3) for key, value in self.timings.items()
+                                  if key.endswith(("_to_ready", "_to_hosted"))})
+
+    def stop(self, deadlines=None, save_command=DEFAULT_SAVE_COMMAND):
+        """
+        分阶段停止服务器，不阻塞调用线程：exit → save → terminate → kill。
+
+        每个阶段发出后在期限内等待进程退出（并回收），超时则进入下一阶段，
+        进度通过 status_callback 显示。
+
+        :param deadlines: 各阶段期限（秒）的字典，缺省项使用 DEFAULT_SHUTDOWN_DEADLINES
+        :param save_command: save 阶段发送的指令
+        :return: Future，结果为进程退出时所处的阶段；未运行时为 None，kill 后仍未退出时为 "failed"
+        """
+        with self._stop_lock:
+            if self._stop_future is not None:
+                return self._stop_future
+            future = Future()
+            process = self.process
+            if not process:
+                future.set_result(None)
+                return future
+            self.stopping = True
+            self._stop_requested = process
+            self._stop_future = future
+        self.running = False
+        if self._ready_timer:
+            self._ready_timer.cancel()
+            self._ready_timer = None
+        stages = dict(DEFAULT_SHUTDOWN_DEADLINES)
+        stages.update(deadlines or {})
+        threading.Thread(target=self._shutdown, args=(process, stages, save_command, future),
+                         daemon=True).start()
+        return future
+
+    def _shutdown(self, process, deadlines, save_command, future):
+        """停止线程：按阶段发出指令或信号，并等待进程退出"""
+        result = "failed"
+        for stage in SHUTDOWN_STAGES:
+            deadline = deadlines.get(stage)
+            if not deadline:
+                continue
+            self.status_callback(f"正在停止：{SHUTDOWN_STAGE_LABELS[stage]}（{deadline}s）")
+            try:
+                if stage == "exit":
+                    self._write("exit\n")
+                    self._echo("> exit\n")
+                elif stage == "save":
+                    self._write(save_command + "\n")
+                    self._echo(f"> {save_command}\n")
+                elif stage == "terminate":
+                    process.terminate()
+                else:
+                    process.kill()
+            except (OSError, ValueError, AttributeError):
+                # 管道已关闭，直接等待进程退出
+                pass
+            try:
+                process.wait(timeout=deadline)
+                result = stage
+                break
+            except subprocess.TimeoutExpired:
+                if stage in ("terminate", "kill"):
+                    self._echo(f"警告：{SHUTDOWN_STAGE_LABELS[stage]}后 {deadline}s 内未退出\n")
+        if result == "failed":
+            self._echo("错误：无法结束服务器进程\n")
+            self.status_callback("停止失败")
+        else:
+            self._echo(f"服务器已停止（{SHUTDOWN_STAGE_LABELS[result]}）\n")
+        with self._stop_lock:
+            self.stopping = False
+            self._stop_future = None
+        future.set_result(result)
+
+    def send_command(self, cmd):
+        """发送指令到服务器"""
+        return self.send_commands([cmd])
+
+    def send_commands(self, cmds):
+        """
+        一次写入发送多条指令（任意线程可调用），空指令忽略。
+
+        :return: 是否已写入
+        """
+        cmds = [cmd for cmd in cmds if cmd]
+        if not self.process or self.stopping:
+            self._echo("服务器未运行\n")
+            return False
+        if not cmds:
+            return False
+        try:
+            self._write("".join(cmd + "\n" for cmd in cmds))
+        except OSError as e:
+            self._echo(f"发送失败：{e}\n")
+            return False
+        self._echo("".join(f"> {cmd}\n" for cmd in cmds))
+        return True
+
+    def request(self, cmd, until=None, timeout=10, idle=None, silent=False, reply=None):
+        """
+        发送指令并收集它产生的输出，返回 concurrent.futures.Future。
+
+        多个请求按提交顺序串行执行：上一条的回复收集完毕后才发送下一条，
+        因此每个 Future 只会拿到属于自己的输出。任意线程可调用，
+        Future 的回调在读取线程或计时器线程中执行，操作界面请经由输出泵转交。
+
+        :param until: 结束条件，子串（匹配 LogRecord.message）或 callable(record) -> bool，
+                      命中的那一行包含在结果中
+        :param timeout: 总超时（秒），超时后 Future 抛出 CommandTimeout
+        :param idle: 回复静默多少秒视为结束；until 和 idle 都未指定时默认 0.3 秒
+        :param silent: 为 True 时指令及其回复不显示在终端中
+        :param reply: callable(record) -> bool，判断一行是否属于回复；
+                      只有属于回复的行才被收集、检查 until、重置 idle 计时并在 silent 时隐藏，
+                      其余输出（聊天、加入、警告等）照常显示。None 表示请求期间的所有输出都属于回复
+        :return: Future，结果为 LogRecord 列表
+        """
+        req = _Request(cmd, until, timeout, idle, silent, reply)
+        with self._request_lock:
+            self._requests.append(req)
+        self._activate_next_request()
+        return req.future
+
+    def _activate_next_request(self):
+        while True:
+            with self._request_lock:
+                if self._active_request is not None or not self._requests:
+                    return
+                req = self._requests.popleft()
+                if not req.future.set_running_or_notify_cancel():
+                    continue  # 已被取消
+                if not self.process:
+                    error = RuntimeError("服务器未运行")
+                else:
+                    error = None
+                    self._active_request = req
+            if error:
+                req.future.set_exception(error)
+                continue
+            if req.timeout is not None:
+                req.timer = self.call_later(req.timeout, self._finish_request, req, True)
+            self._arm_idle(req)
+            try:
+                self._write(req.cmd + "\n")
+            except (OSError, ValueError, AttributeError) as e:
+                self._finish_request(req, error=e)
+                continue
+            if not req.silent:
+                self._echo(f"> {req.cmd}\n")
+            return
+
+    def _arm_idle(self, req):
+        if req.idle is None:
+            return
+        if req.idle_timer:
+            req.idle_timer.cancel()
+        req.idle_timer = self.call_later(req.idle, self._finish_request, req)
+
+    def _finish_request(self, req, timed_out=False, error=None, activate_next=True):
+        with self._request_lock:
+            if self._active_request is not req:
+                return
+            self._active_request = None
+        for timer in (req.timer, req.idle_timer):
+            if timer:
+                timer.cancel()
+        if error is not None:
+            req.future.set_exception(error)
+        elif timed_out:
+            req.future.set_exception(CommandTimeout(req.cmd, req.records))
+        else:
+            req.future.set_result(req.records)
+        if activate_next:
+            self._activate_next_request()
+
+    def _fail_requests(self):
+        """服务器停止时让所有未完成的请求失败"""
+        with self._request_lock:
+            pending = list(self._requests)
+            self._requests.clear()
+            active = self._active_request
+        if active:
+            self._finish_request(active, error=RuntimeError("服务器已停止"))
+        for req in pending:
+            if req.future.set_running_or_notify_cancel():
+                req.future.set_exception(RuntimeError("服务器已停止"))
+
+    def _feed_request(self, records):
+        """把输出交给当前请求，返回应显示在终端中的记录"""
+        req = self._active_request
+        if req is None:
+            return records
+        visible = []
+        replied = False
+        for i, record in enumerate(records):
+            if req.reply is not None and not req.reply(record):
+                visible.append(record)
+                continue
+            replied = True
+            req.records.append(record)
+            if not req.silent:
+                visible.append(record)
+            if req.until is not None and req.until(record):
+                # 下一条请求在本批输出显示之后再发送，保证终端中的顺序
+                self._finish_request(req, activate_next=False)
+                # 结束行之后的输出不属于该请求
+                visible.extend(records[i + 1:])
+                return visible
+        if replied:
+            self._arm_idle(req)
+        return visible
+
+    def _echo(self, text):
+        """输出启动器自身的提示信息"""
+        records = local_records(text)
+        if self.records_callback:
+            self.records_callback(records)
+        self.output_callback(records)
+
+    def _write(self, text):
+        if self.backend == "asyncio":
+            # 放入写队列立即返回，由事件循环按管道的消化速度写出
+            self.process.write(text.encode(self.encoding, self.errors))
+            return
+        stdin = self.process.stdin
+        # 界面、定时任务和请求可能在不同线程中同时写入，整段写完前不允许穿插
+        with self._write_lock:
+            if self.read_mode == "line":
+                stdin.write(text)
+                stdin.flush()
+                return
+            # 无缓冲管道可能只写入一部分，循环直到写完
+            data = memoryview(text.encode(self.encoding, self.errors))
+            while data:
+                written = stdin.write(data)
+                data = data[written:]
+
+    def add_listener(self, listener, prefix=None, contains=None, level=None, regex=None):
+        """
+        添加输出监听器（用于地图列表等），任意线程可调用。
+
+        监听器接收 LogRecord，返回 True 时被移除；可选谓词见 OutputDispatcher.add。
+        """
+        return self.dispatcher.add(listener, prefix=prefix, contains=contains,
+                                   level=level, regex=regex)
+
+    def remove_listener(self, listener):
+        self.dispatcher.remove(listener)
+
+    def _read_output(self):
+        """后台读取服务器输出"""
+        process = self.process
+        try:
+            if self.read_mode == "line":
+                while self.running and process:
+                    line = process.stdout.readline()
+                    if not line:
+                        break
+                    self._handle_lines([line])
+            else:
+                read_chunks(process.stdout, self._handle_lines, self.encoding, self.errors)
+        except (OSError, ValueError):
+            # 管道被 stop() 关闭
+            pass
+        try:
+            # 回收进程并取得退出码（asyncio 后端在事件循环中完成）
+            process.wait()
+        except Exception as e:
+            print(f"等待服务器进程失败: {e}")
+        self._on_exit(process)
+
+    def _on_exit(self, process):
+        """服务器输出结束（进程退出或被停止）"""
+        with self._process_lock:
+            if self.process is not process or not process:
+                return
+            requested = self._stop_requested is process
+            self._stop_requested = None
+            self.process = None
+            self.running = False
+        self.dispatcher.clear()
+        self._fail_requests()
+        self.status_callback("已停止")
+        if self.exit_callback:
+            self.exit_callback(process.returncode, requested)
+
+    def _handle_lines(self, lines):
+        """处理一批完整的输出行：每行只解析一次，整批交给输出回调，按谓词分发给监听器"""
+        records = self.parser.parse_lines(lines)
+        # 全部输出都写入归档，不受静默请求影响
+        if self.records_callback:
+            self.records_callback(records)
+        # 静默请求的回复不进入终端，但仍分发给监听器
+        visible = self._feed_request(records)
+        # 通过回调在主线程处理输出
+        if visible:
+            self.output_callback(visible)
+        self.dispatcher.dispatch(records)
+        if self._requests and self._active_request is None:
+            self._activate_next_request()
+
+    def exit_gracefully(self, timeout=5):
+        """
+        发送 exit，最多等待 timeout 秒，仍未退出则终止进程（阻塞；界面中请使用非阻塞的 stop()）。
+
+        :return: 进程退出时所处的阶段；未运行时为 None，终止后未等到退出时为 "terminate"
+        """
+        process = self.process
+        future = self.stop({"exit": timeout, "save": 0})
+        try:
+            return future.result(timeout + GRACEFUL_TERMINATE_WAIT)
+        except FutureTimeout:
+            # 已在进行中的停止可能还有更长的阶段，不再等待
+            try:
+                process.terminate()
+            except (OSError, AttributeError):
+                pass
+            return "terminate"
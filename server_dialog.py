@@ -0,0 +1,85 @@
+# server_dialog.py
+import tkinter as tk
+import json
+import os
+from tkinter import filedialog, messagebox
+from button_style2 import create_gradient_button
+
+
+def show_add_server(parent, settings, exists, on_add):
+    """
+    添加服务器窗口。
+
+    :param exists: exists(name) -> bool，判断名称是否已被占用
+    :param on_add: on_add(entry)，entry 为写入 settings["servers"] 的条目
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    lang_path = os.path.join(script_dir, "language.json")
+    with open(lang_path, "r", encoding="utf-8") as f:
+        lgag = json.load(f)
+    lang = lgag["language"][lgag["user_choice"]]
+
+    win = tk.Toplevel(parent, bg=settings["color"]["windows_bg"])
+    win.title(lang.get("add_server", "add server"))
+    win.resizable(False, False)
+    win.transient(parent)
+    win.grab_set()
+    win.columnconfigure(1, weight=1)
+
+    fields = [
+        ("server_name", "name", ""),
+        ("java_exe_path", "java_path", settings["java"].get("java_path", "")),
+        ("server_jar_path", "jar_path", settings["java"].get("jar_path", "")),
+        ("server_workdir", "workdir", ""),
+        ("server_port", "port", ""),
+    ]
+    field_vars = {}
+    for row, (label_key, key, default) in enumerate(fields):
+        tk.Label(win, text=lang.get(label_key, label_key),
+                 bg=settings["color"]["windows_bg"], fg='black').grid(row=row, column=0, sticky='w', padx=10, pady=8)
+        var = tk.StringVar(value=default)
+        tk.Entry(win, textvariable=var, width=50,
+                 bg=settings["color"]["entry"]).grid(row=row, column=1, padx=10, pady=8, sticky='ew')
+        field_vars[key] = var
+
+    def browse_java():
+        current = field_vars["java_path"].get().strip()
+        path = filedialog.askopenfilename(
+            parent=win, title=lang.get("java_exe_path", "java"),
+            initialdir=os.path.dirname(current) if current else None
+        )
+        if path:
+            field_vars["java_path"].set(path)
+
+    java_row = [key for _, key, _ in fields].index("java_path")
+    create_gradient_button(win, text="浏览", command=browse_java,
+                           width=60, height=28).grid(row=java_row, column=2, padx=(0, 10), pady=8)
+
+    def apply():
+        name = field_vars["name"].get().strip()
+        if not name:
+            messagebox.showwarning("提示", "请输入服务器名称", parent=win)
+            return
+        if exists(name):
+            messagebox.showwarning("提示", f"服务器 {name} 已存在", parent=win)
+            return
+        entry = {"name": name}
+        # 与全局设置相同的 Java 路径不写入条目，之后修改全局设置时仍然生效
+        java_path = field_vars["java_path"].get().strip()
+        if java_path and java_path != settings["java"].get("java_path", ""):
+            entry["java_path"] = java_path
+        for key in ("jar_path", "workdir"):
+            value = field_vars[key].get().strip()
+            if value:
+                entry[key] = value
+        port = field_vars["port"].get().strip()
+        if port:
+            if not port.isdigit() or not 0 < int(port) < 65536:
+                messagebox.showwarning("提示", "端口应为 1-65535 之间的整数", parent=win)
+                return
+            entry["port"] = int(port)
+        on_add(entry)
+        win.destroy()
+
+    btn_apply = create_gradient_button(win, text=lang["apply"], command=apply, width=80, height=30)
+    btn_apply.grid(row=len(fields), column=1, sticky='e', padx=10, pady=10)
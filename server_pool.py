@@ -0,0 +1,138 @@
+# server_pool.py
+import collections
+import hashlib
+import os
+import re
+
+from map_catalog import MapCatalog
+
+# settings 中没有 servers 列表时，唯一一台服务器的名字
+DEFAULT_SERVER_NAME = "默认"
+
+
+def safe_dir_name(name):
+    """
+    服务器名对应的目录名（日志等）：替换路径中不允许的字符，去掉首尾空格和末尾的点。
+
+    改写过的名字追加原名的短哈希，"a/b" 与 "a:b" 不会落到同一目录；
+    只由点组成的名字（"."、".."）不能直接作为目录名，同样改写。
+    """
+    safe = re.sub(r'[\\/:*?"<>|\x00-\x1f]', "_", name).strip().rstrip(". ")
+    if safe == name and safe.strip("."):
+        return safe
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:8]
+    return f"{safe or 'server'}-{digest}"
+
+
+def server_entries(settings):
+    """返回 settings 中的服务器条目列表；未配置时视为只有一台默认服务器"""
+    return settings.get("servers") or [{"name": DEFAULT_SERVER_NAME}]
+
+
+class ServerSlot:
+    """
+    服务器池中的一台服务器：配置条目 + 控制器 + 该服务器的终端。
+
+    配置按需合并：条目中未指定的项（java_path、jar_path、encoding 等）沿用
+    settings["java"]，因此在设置窗口中修改 java 段对所有服务器立即生效。
+    """
+
+    def __init__(self, settings, entry):
+        self.settings = settings
+        self.entry = entry
+        self.name = entry["name"]
+        self.controller = None
+        self.supervisor = None
+        self.status = "就绪"
+        self.started_with = None
+        # 界面相关对象由 MindustryLauncher 创建
+        self.tab = None
+        self.console = None
+        self.scrollback = None
+        self.channel = None
+        self.graph = None
+        self.poller = None
+        self.metrics = None  # 最近一次 status 轮询结果
+        self.archive = None
+        self.log_index = None
+        self.command_key = None  # jar 版本键，用于查找缓存的指令表
+        self._map_catalog = None
+
+    def safe_name(self):
+        """可用作目录名的服务器名，见 safe_dir_name"""
+        return safe_dir_name(self.name)
+
+    def on_records(self, records):
+        """控制器的全部输出（读取线程中调用，含静默请求的回复）：写入日志归档"""
+        if self.archive:
+            self.archive.write(records)
+
+    def on_output(self, records):
+        """控制器的显示输出回调（读取线程中调用）：交给终端的输出通道"""
+        self.channel.put_records(records)
+
+    @property
+    def config(self):
+        config = dict(self.settings.get("java", {}))
+        config.update(self.entry)
+        return config
+
+    def workdir(self):
+        """服务器工作目录：默认为 jar 所在目录，地图目录为其下的 config/maps"""
+        config = self.config
+        return config.get("workdir") or os.path.dirname(os.path.abspath(config.get("jar_path") or "."))
+
+    def startup_commands(self):
+        """就绪后发送的指令；配置了端口时先设置端口再 host"""
+        config = self.config
+        commands = list(config.get("startup_commands", ["host"]))
+        port = self.entry.get("port")
+        if port:
+            commands.insert(0, f"config port {port}")
+        return commands
+
+    def get_map_catalog(self, index_path):
+        """返回该服务器 jar 对应的地图目录，jar 或工作目录变化时重新创建"""
+        jar = self.config.get("jar_path")
+        if not jar:
+            return None
+        workdir = self.workdir()
+        catalog = self._map_catalog
+        if catalog is None or catalog.jar_path != jar or catalog.workdir != os.path.abspath(workdir):
+            catalog = self._map_catalog = MapCatalog(index_path, jar, workdir)
+        return catalog
+
+
+class ServerPool:
+    """按名字管理多台服务器，保持添加顺序"""
+
+    def __init__(self):
+        self.slots = collections.OrderedDict()
+
+    def add(self, slot):
+        if slot.name in self.slots:
+            raise ValueError(f"服务器 {slot.name} 已存在")
+        self.slots[slot.name] = slot
+        return slot
+
+    def remove(self, name):
+        return self.slots.pop(name, None)
+
+    def get(self, name):
+        return self.slots.get(name)
+
+    def name_taken(self, name):
+        """名字已被占用，或与已有服务器的目录名冲突（Windows 上目录名不区分大小写）"""
+        if name in self.slots:
+            return True
+        folded = safe_dir_name(name).casefold()
+        return any(slot.safe_name().casefold() == folded for slot in self)
+
+    def __iter__(self):
+        return iter(list(self.slots.values()))
+
+    def __len__(self):
+        return len(self.slots)
+
+    def running(self):
+        return [slot for slot in self if slot.controller and slot.controller.process]
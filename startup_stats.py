@@ -0,0 +1,128 @@
+# startup_stats.py
+import json
+import os
+import statistics
+import time
+import zipfile
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def jar_version(jar_path):
+    """
+    读取服务器 jar 的版本标识。
+
+    优先使用 jar 内 version.properties 中的 build 号，并附带文件大小与 mtime，
+    这样同一 build 的不同构建也能区分。
+    """
+    build = None
+    try:
+        with zipfile.ZipFile(jar_path) as jar:
+            with jar.open("version.properties") as f:
+                for line in f.read().decode("utf-8", "replace").splitlines():
+                    key, sep, value = line.partition("=")
+                    if sep and key.strip() == "build":
+                        build = value.strip()
+    except (OSError, KeyError, zipfile.BadZipFile):
+        pass
+    try:
+        st = os.stat(jar_path)
+        size, mtime = st.st_size, int(st.st_mtime)
+    except OSError:
+        size, mtime = 0, 0
+    return {"jar": os.path.basename(jar_path), "build": build, "size": size, "mtime": mtime}
+
+
+def jar_version_key(jar_path):
+    """用于按 jar 版本缓存数据的字符串键"""
+    info = jar_version(jar_path)
+    return f"{info['jar']}-{info['build']}-{info['size']}-{info['mtime']}"
+
+
+def record(path, entry):
+    """追加一条启动耗时记录（JSON Lines）"""
+    entry = dict(entry)
+    entry.setdefault("time", time.strftime("%Y-%m-%d %H:%M:%S"))
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"保存启动耗时失败: {e}")
+
+
+def load(path):
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    pass
+    except OSError:
+        pass
+    return entries
+
+
+def process_rss(pid):
+    """进程常驻内存（字节）：有 psutil 时使用 psutil，否则读取 /proc（仅 Linux），都不可用时返回 None"""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except Exception:
+            return None
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def summarize(entries, key=("profile", "build")):
+    """
+    按启动配置（及 jar build）汇总启动记录：次数、各阶段耗时中位数、开放时内存中位数。
+
+    返回按就绪耗时从快到慢排序的字典列表。
+    """
+    groups = {}
+    for entry in entries:
+        if "spawn_to_ready" not in entry:
+            continue
+        group = tuple(entry.get(k) for k in key)
+        groups.setdefault(group, []).append(entry)
+
+    def median(values):
+        values = [v for v in values if v is not None]
+        return statistics.median(values) if values else None
+
+    rows = []
+    for group, items in groups.items():
+        row = dict(zip(key, group))
+        row["runs"] = len(items)
+        row["spawn_to_ready"] = median(e.get("spawn_to_ready") for e in items)
+        row["ready_to_hosted"] = median(e.get("ready_to_hosted") for e in items)
+        row["rss_mb"] = median(e["rss"] / 1048576 if e.get("rss") else None for e in items)
+        rows.append(row)
+    rows.sort(key=lambda row: row["spawn_to_ready"])
+    return rows
+
+
+# ----------------------------------------------------------------------
+if __name__ == '__main__':
+    # 汇总 startup_stats.jsonl：哪个启动配置启动最快、占用内存最少
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "startup_stats.jsonl")
+    print(f"{'配置':<12}{'build':<10}{'次数':>6}{'就绪(s)':>10}{'开放(s)':>10}{'内存(MB)':>10}")
+    for row in summarize(load(path)):
+        hosted = f"{row['ready_to_hosted']:.2f}" if row["ready_to_hosted"] is not None else "-"
+        rss = f"{row['rss_mb']:.0f}" if row["rss_mb"] is not None else "-"
+        print(f"{str(row['profile']):<12}{str(row['build']):<10}{row['runs']:>6}"
+              f"{row['spawn_to_ready']:>10.2f}{hosted:>10}{rss:>10}")
@@ -0,0 +1,195 @@
+# status_poller.py
+import re
+import threading
+
+from map_catalog import strip_colors
+
+# 默认轮询间隔与单次超时（秒）
+DEFAULT_INTERVAL = 10
+DEFAULT_TIMEOUT = 5
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+_MAP_RE = re.compile(r"Playing on map (.+?) / Wave (\d+)")
+_NEXT_WAVE_RE = re.compile(r"(\d+) seconds until next wave")
+_UNITS_RE = re.compile(r"(\d+) units / (\d+) enemies")
+_FPS_RE = re.compile(r"(\d+) FPS, (\d+) MB used")
+_PLAYERS_RE = re.compile(r"Players: (\d+)")
+CLOSED_MARKER = "Status: server closed"
+NO_PLAYERS_MARKER = "No players connected."
+
+
+def _clean(message):
+    return strip_colors(_ANSI_RE.sub("", message)).strip()
+
+
+class StatusMetrics:
+    """
+    status 指令回复的解析结果。
+
+    hosted 为 False 时（服务器未开放）其余字段均为 None；
+    tps 即服务器报告的 FPS（服务器每帧一次逻辑更新），memory_mb 为 JVM 已用堆内存。
+    """
+    __slots__ = ("hosted", "map", "wave", "next_wave", "units", "enemies",
+                 "tps", "memory_mb", "players", "player_names")
+
+    def __init__(self, hosted=False):
+        self.hosted = hosted
+        self.map = None
+        self.wave = None
+        self.next_wave = None
+        self.units = None
+        self.enemies = None
+        self.tps = None
+        self.memory_mb = None
+        self.players = None
+        self.player_names = []
+
+    def __repr__(self):
+        return (f"StatusMetrics(hosted={self.hosted}, map={self.map!r}, wave={self.wave}, "
+                f"tps={self.tps}, memory_mb={self.memory_mb}, players={self.players})")
+
+
+def parse_status(records):
+    """把 status 回复（LogRecord 列表）解析为 StatusMetrics；没有找到 Status 行时返回 None"""
+    metrics = None
+    in_players = False
+    for record in records:
+        text = _clean(record.message)
+        if text.startswith(CLOSED_MARKER):
+            return StatusMetrics(hosted=False)
+        if text.startswith("Status:"):
+            metrics = StatusMetrics(hosted=True)
+            continue
+        if metrics is None:
+            continue
+        if in_players:
+            name, sep, _ = text.rpartition(" / ")
+            if sep:
+                metrics.player_names.append(name)
+            continue
+        m = _MAP_RE.search(text)
+        if m:
+            metrics.map, metrics.wave = m.group(1), int(m.group(2))
+            continue
+        m = _NEXT_WAVE_RE.search(text)
+        if m:
+            metrics.next_wave = int(m.group(1))
+            continue
+        m = _UNITS_RE.search(text)
+        if m:
+            metrics.units, metrics.enemies = int(m.group(1)), int(m.group(2))
+            continue
+        m = _FPS_RE.search(text)
+        if m:
+            metrics.tps, metrics.memory_mb = int(m.group(1)), int(m.group(2))
+            continue
+        m = _PLAYERS_RE.search(text)
+        if m:
+            metrics.players = int(m.group(1))
+            in_players = True
+            continue
+        if text == NO_PLAYERS_MARKER:
+            metrics.players = 0
+    return metrics
+
+
+class _StatusReply:
+    """
+    status 回复的行与结束条件：未开放时只有一行；否则从 Status 行开始，在玩家列表的最后一行结束。
+
+    belongs(record) 判断一行是否属于回复，期间夹杂的聊天、加入等输出不属于回复，照常显示。
+    """
+
+    def __init__(self):
+        self.started = False
+        self.remaining = None
+
+    def belongs(self, record):
+        text = _clean(record.message)
+        if not self.started:
+            self.started = text.startswith(("Status:", CLOSED_MARKER))
+            return self.started
+        if self.remaining is not None:
+            return " / " in text
+        return bool(text == NO_PLAYERS_MARKER or _MAP_RE.search(text) or _NEXT_WAVE_RE.search(text)
+                    or _UNITS_RE.search(text) or _FPS_RE.search(text) or _PLAYERS_RE.search(text))
+
+    def __call__(self, record):
+        """只对属于回复的行调用"""
+        if self.remaining is not None:
+            self.remaining -= 1
+            return self.remaining <= 0
+        text = _clean(record.message)
+        if text.startswith(CLOSED_MARKER) or text == NO_PLAYERS_MARKER:
+            return True
+        m = _PLAYERS_RE.search(text)
+        if m:
+            self.remaining = int(m.group(1))
+            return self.remaining <= 0
+        return False
+
+
+class StatusPoller:
+    """
+    按固定间隔向服务器发送 status（静默请求，不显示在终端），解析后交给 callback。
+
+    同一时刻最多一个轮询在进行，上一次完成后才计划下一次；服务器未就绪时跳过。
+    """
+
+    def __init__(self, controller, callback, interval=DEFAULT_INTERVAL, timeout=DEFAULT_TIMEOUT):
+        """
+        :param callback: callback(metrics)，metrics 为 StatusMetrics；服务器停止时为 None
+                         （读取线程或计时器线程中调用）
+        """
+        self.controller = controller
+        self.callback = callback
+        self.interval = interval
+        self.timeout = timeout
+        self.latest = None
+        self._timer = None
+        self._active = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._active:
+                return
+            self._active = True
+        self._schedule()
+
+    def stop(self):
+        with self._lock:
+            self._active = False
+            timer, self._timer = self._timer, None
+        if timer:
+            timer.cancel()
+
+    def _schedule(self):
+        with self._lock:
+            if self._active:
+                self._timer = self.controller.call_later(self.interval, self._poll)
+
+    def _poll(self):
+        if not self._active:
+            return
+        if not self.controller.ready:
+            if self.latest is not None:
+                self.latest = None
+                self.callback(None)
+            self._schedule()
+            return
+        reply = _StatusReply()
+        future = self.controller.request("status", until=reply, reply=reply.belongs,
+                                         timeout=self.timeout, silent=True)
+        future.add_done_callback(self._on_reply)
+
+    def _on_reply(self, future):
+        try:
+            metrics = parse_status(future.result())
+        except Exception:
+            # 超时或服务器停止：本次没有数据
+            metrics = None
+        if metrics is not None:
+            self.latest = metrics
+            self.callback(metrics)
+        self._schedule()
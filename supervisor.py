@@ -0,0 +1,215 @@
+# supervisor.py
+import collections
+import threading
+import time
+
+from log_parser import local_records
+
+# 退出分类
+EXIT_STOPPED = "stopped"  # 由 stop() 发起
+EXIT_CLEAN = "clean"      # 退出码 0（控制台 exit 等）
+EXIT_OOM = "oom"          # 内存不足
+EXIT_CRASH = "crash"      # 其他非零退出码或被信号结束
+EXIT_START_FAILED = "start_failed"  # 自动重启时进程未能启动（java 路径、jar 缺失等）
+
+EXIT_LABELS = {
+    EXIT_STOPPED: "已停止",
+    EXIT_CLEAN: "正常退出",
+    EXIT_OOM: "内存不足",
+    EXIT_CRASH: "崩溃",
+    EXIT_START_FAILED: "启动失败",
+}
+
+# 输出中出现这些内容时视为内存不足；-XX:+ExitOnOutOfMemoryError 的退出码为 3
+OOM_MARKERS = ("java.lang.OutOfMemoryError", "Out of memory", "insufficient memory")
+OOM_EXIT_CODES = (3,)
+
+DEFAULT_SUPERVISOR = {
+    "auto_restart": True,
+    "backoff_initial": 2,   # 首次重启前等待（秒），之后每次翻倍
+    "backoff_max": 60,
+    "crash_window": 300,    # 统计崩溃次数的时间窗口（秒）
+    "max_crashes": 5,       # 窗口内崩溃达到该次数视为崩溃循环，停止自动重启
+    "stable_after": 120,    # 连续运行超过该秒数后，退避时间恢复初始值
+    "keep_seconds": 30,     # 崩溃报告保留退出前多少秒的输出
+}
+# 崩溃前输出环形缓冲的行数上限，避免刷屏时占用过多内存
+KEEP_MAX_LINES = 5000
+# 内存中保留的崩溃报告数
+MAX_REPORTS = 20
+
+
+class CrashReport:
+    """一次非正常退出：分类、退出码、运行时长以及退出前的输出"""
+    __slots__ = ("time", "kind", "returncode", "uptime", "output")
+
+    def __init__(self, kind, returncode, uptime, output):
+        self.time = time.time()
+        self.kind = kind
+        self.returncode = returncode
+        self.uptime = uptime
+        self.output = output
+
+    def summary(self):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.time))
+        return (f"{stamp} {EXIT_LABELS[self.kind]}，退出码 {self.returncode}，"
+                f"运行 {self.uptime:.0f}s，保留输出 {len(self.output)} 行")
+
+
+def classify_exit(returncode, requested, output):
+    """根据退出码和退出前的输出判断退出类型"""
+    if requested:
+        return EXIT_STOPPED
+    if returncode == 0:
+        return EXIT_CLEAN
+    if returncode in OOM_EXIT_CODES or any(marker in line for line in output for marker in OOM_MARKERS):
+        return EXIT_OOM
+    return EXIT_CRASH
+
+
+class ServerSupervisor:
+    """
+    包装 ServerController：服务器崩溃或内存不足退出时按指数退避自动重启。
+
+    短时间内崩溃次数过多（崩溃循环）时停止重启并调用 alert_callback。
+    每次非正常退出都会生成 CrashReport，保留退出前 keep_seconds 秒的输出。
+    """
+
+    def __init__(self, controller, options=None, alert_callback=None):
+        """
+        :param options: 覆盖 DEFAULT_SUPERVISOR 中的项
+        :param alert_callback: alert_callback(text)，检测到崩溃循环时调用（读取线程中调用）
+        """
+        self.controller = controller
+        self.options = dict(DEFAULT_SUPERVISOR)
+        self.options.update(options or {})
+        self.alert_callback = alert_callback
+        self.reports = collections.deque(maxlen=MAX_REPORTS)
+        self.restarts = 0
+        self.crash_loop = False
+        self._start_args = None
+        self._started_at = None
+        self._crash_times = collections.deque()
+        self._backoff = self.options["backoff_initial"]
+        self._restart_timer = None
+        self._lock = threading.Lock()
+        self._recent = collections.deque(maxlen=KEEP_MAX_LINES)  # (monotonic, raw)
+
+        # 接管控制器的输出与退出回调：输出先进入环形缓冲再照常显示
+        self._forward = controller.output_callback
+        controller.output_callback = self._on_output
+        controller.exit_callback = self._on_exit
+
+    # ------------------------------------------------------------------
+    def start(self, *args, **kwargs):
+        """启动服务器并记住参数，自动重启时使用同样的参数"""
+        with self._lock:
+            self._cancel_restart()
+            self._start_args = (args, kwargs)
+            self.crash_loop = False
+        return self._start()
+
+    def _start(self):
+        args, kwargs = self._start_args
+        self._recent.clear()
+        started = self.controller.start(*args, **kwargs)
+        if started:
+            self._started_at = time.monotonic()
+        return started
+
+    def stop(self, *args, **kwargs):
+        """手动停止：取消等待中的重启，再分阶段停止服务器"""
+        with self._lock:
+            pending = self._cancel_restart()
+        if pending and not self.controller.process:
+            self.controller.status_callback("已停止，取消自动重启")
+        return self.controller.stop(*args, **kwargs)
+
+    def restart_pending(self):
+        return self._restart_timer is not None
+
+    # ------------------------------------------------------------------
+    def _on_output(self, records):
+        now = time.monotonic()
+        recent = self._recent
+        recent.extend((now, record.raw) for record in records)
+        horizon = now - self.options["keep_seconds"]
+        while recent and recent[0][0] < horizon:
+            recent.popleft()
+        self._forward(records)
+
+    def _on_exit(self, returncode, requested):
+        output = [raw for _, raw in self._recent]
+        kind = classify_exit(returncode, requested, output)
+        if kind == EXIT_STOPPED:
+            return
+        now = time.monotonic()
+        uptime = now - self._started_at if self._started_at else 0
+        report = CrashReport(kind, returncode, uptime, output)
+        self.reports.append(report)
+        self._echo(f"服务器{EXIT_LABELS[kind]}（退出码 {returncode}，运行 {uptime:.0f}s）\n")
+        if kind == EXIT_CLEAN or not self.options["auto_restart"] or not self._start_args:
+            return
+        self._schedule_restart(report, now, uptime)
+
+    def _schedule_restart(self, report, now, uptime):
+        """计入崩溃窗口并按退避时间计划重启；达到崩溃循环上限时停止并提醒"""
+        kind = report.kind
+        with self._lock:
+            # 稳定运行一段时间后的崩溃不再沿用之前的退避时间
+            if uptime >= self.options["stable_after"]:
+                self._backoff = self.options["backoff_initial"]
+            crash_times = self._crash_times
+            crash_times.append(now)
+            while crash_times and crash_times[0] < now - self.options["crash_window"]:
+                crash_times.popleft()
+            if len(crash_times) >= self.options["max_crashes"]:
+                self.crash_loop = True
+                crash_times.clear()
+                self._backoff = self.options["backoff_initial"]
+                delay = None
+            else:
+                delay = self._backoff
+                self._backoff = min(self._backoff * 2, self.options["backoff_max"])
+                # 重启在独立的计时器线程中进行：asyncio 后端的退出回调位于事件循环线程，不能在其中启动进程
+                self._restart_timer = threading.Timer(delay, self._restart)
+                self._restart_timer.daemon = True
+                self._restart_timer.start()
+
+        if delay is None:
+            text = (f"服务器在 {self.options['crash_window']}s 内崩溃 {self.options['max_crashes']} 次，"
+                    f"已停止自动重启（最近一次：{report.summary()}）")
+            self._echo(f"警告：{text}\n")
+            self.controller.status_callback("崩溃循环，已停止自动重启")
+            if self.alert_callback:
+                self.alert_callback(text)
+        else:
+            self.controller.status_callback(f"服务器{EXIT_LABELS[kind]}，{delay:g}s 后自动重启")
+
+    def _echo(self, text):
+        records = local_records(text)
+        if self.controller.records_callback:
+            self.controller.records_callback(records)
+        self._forward(records)
+
+    def _restart(self):
+        with self._lock:
+            if self._restart_timer is None:
+                return
+            self._restart_timer = None
+            if self.controller.process:
+                return
+        self.restarts += 1
+        self._echo(f"自动重启服务器（第 {self.restarts} 次）\n")
+        if self._start():
+            return
+        # 启动失败与崩溃同样计入崩溃窗口并退避重试，否则服务器会无声地停在未运行状态
+        report = CrashReport(EXIT_START_FAILED, None, 0, [raw for _, raw in self._recent])
+        self.reports.append(report)
+        self._schedule_restart(report, time.monotonic(), 0)
+
+    def _cancel_restart(self):
+        timer, self._restart_timer = self._restart_timer, None
+        if timer:
+            timer.cancel()
+        return timer is not None
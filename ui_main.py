@@ -1,271 +1,775 @@
-# ui_main.py
-import tkinter as tk
-from tkinter import scrolledtext
-import json
-import os
-import setting
-import map_list
-from button_style2 import create_gradient_button
-from server_controller import ServerController
-
-try:# 获取脚本所在目录，用于构建绝对路径
-    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-    SETTINGS_PATH = os.path.join(SCRIPT_DIR, "settings.json")
-    
-except:
-    with open("settings.json", "w", encoding="utf-8") as f:
-        json.dump({
-  "java": {
-    "java_path": "C:\\Apps\\coding\\Zulu\\bin\\java.exe",
-    "jar_path": "C:\\Users\\26529\\Documents\\MDT\\mdt_be.jar"
-  },
-  "color": {
-    "windows_bg": "#5dbcc8",
-    "entry": "#3d7980",
-    "terminal": "#549ea8",
-    "text": "#49254d"
-  }
-}, f)
-
-LANGUAGE_PATH = os.path.join(SCRIPT_DIR, "language.json")
-
-
-
-class MindustryLauncher:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("MIGO 1.0")
-        self.root.geometry("960x540")
-        self.root.minsize(800, 500)
-
-        try:
-            self.root.iconbitmap("icon.ico")
-        except:
-            pass
-
-        self.settings = self.load_settings()
-        self.controller = ServerController(
-            output_callback=self.append_output,
-            status_callback=self.update_status
-        )
-
-        self.create_widgets()
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-
-    def load_language(self):
-        try:
-            with open(LANGUAGE_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            with open(LANGUAGE_PATH, "w", encoding="utf-8") as f:
-                json.dump({
-    "user_choice": "en",
-    "language": {
-        "cn_zh": {
-            "start_server": "启动服务器",
-            "stop_server": "停止服务器",
-            "setting": "设置",
-            "map_list": "地图列表",
-            "stop_game": "暂停游戏",
-            "start_game": "开始游戏",
-			"enter_command":"键入指令",
-			"java_exe_path":"Java路径（exe）",
-			"server_jar_path":"服务器jar路径",
-			"apply":"确定",
-			"close":"关闭",
-			"windows_bg_color":"窗口背景色",
-			"terminal_bg_color":"终端背景色",
-			"terminal_font_color":"终端字体颜色",
-			"entry_color":"输入框颜色"
-			
-			
-        },
-        "en": {
-            "start_server": "start server",
-            "stop_server": "stop server",
-            "setting": "setting",
-            "map_list": "map list",
-            "stop_game": "stop game",
-            "start_game": "start game",
-			"enter_command":"enter command",
-			"java_exe_path":"java.exe path",
-			"server_jar_path":"server jar path",
-			"apply":"apply",
-			"close":"close",
-			"windows_bg_color":"windows background color",
-			"terminal_bg_color":"terminal background color",
-			"terminal_font_color":"terminal font color",
-			"entry_color":"input box color"
-			
-        }
-    }
-}, f)       
-            with open(LANGUAGE_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-            
-
-    def load_settings(self):
-        try:
-            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-                json.dump({
-  "java": {
-    "java_path": "C:\\Apps\\coding\\Zulu\\bin\\java.exe",
-    "jar_path": "C:\\Users\\26529\\Documents\\MDT\\mdt_be.jar"
-  },
-  "color": {
-    "windows_bg": "#5dbcc8",
-    "entry": "#3d7980",
-    "terminal": "#549ea8",
-    "text": "#49254d"
-  }
-}, f)
-            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-
-
-    def save_settings(self):
-        """保存设置到文件"""
-        try:
-            with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f"保存 settings.json 失败: {e}")
-
-    def update_status(self, text):
-        self.status_var.set(text)
-
-    def create_widgets(self):
-        # 主容器
-        main_frame = tk.Frame(self.root, bg=self.settings["color"]["windows_bg"], padx=10, pady=10)
-        main_frame.pack(fill=tk.BOTH, expand=True)
-
-        # 顶部按钮区域（使用 get 提供默认值，防止键缺失）
-        top_frame_bg = self.settings["color"].get("windows_bg", "#9ec3f6")
-        top_frame = tk.Frame(main_frame, bg=top_frame_bg)
-        top_frame.pack(fill=tk.X, pady=(0,10))
-
-        lgag = self.load_language()
-
-        self.start_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["start_server"],
-                                                command=self.start_server,
-                                                width=120, height=35)
-        self.start_btn.pack(side=tk.LEFT, padx=5)
-
-        self.stop_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["stop_server"],
-                                               command=self.stop_server,
-                                               width=120, height=35)
-        self.stop_btn.pack(side=tk.LEFT, padx=5)
-        self.stop_btn.config(state=tk.DISABLED)
-
-        self.setting_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["setting"],
-                                                  command=self.open_settings,
-                                                  width=120, height=35)
-        self.setting_btn.pack(side=tk.LEFT, padx=5)
-
-        self.map_list_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["map_list"],
-                                                   command=self.show_map_list,
-                                                   width=120, height=35)
-        self.map_list_btn.pack(side=tk.LEFT, padx=5)
-
-        self.game_stop_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["stop_game"],
-                                                   command=self.stop_game,
-                                                   width=120, height=35)
-        self.game_stop_btn.pack(side=tk.LEFT, padx=5)
-
-        self.game_start_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["start_game"],
-                                                   command=self.start_game,
-                                                   width=120, height=35)
-        self.game_start_btn.pack(side=tk.LEFT, padx=5)
-
-        # 指令输入区域
-        cmd_frame = tk.Frame(main_frame, bg=self.settings["color"].get("entry", "#9ec3f6"))
-        cmd_frame.pack(fill=tk.X, pady=5)
-
-        self.cmd_entry = tk.Entry(cmd_frame, font=('微软雅黑', 10), bg=self.settings["color"].get("entry", "#c1dcfc"))
-        self.cmd_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0,5))
-
-        self.send_btn = create_gradient_button(cmd_frame, text=lgag["language"][lgag["user_choice"]]["enter_command"],
-                                               command=self.send_command,
-                                               width=100, height=30)
-        self.send_btn.pack(side=tk.LEFT)
-
-        # 输出区域
-        output_frame = tk.Frame(main_frame)
-        output_frame.pack(fill=tk.BOTH, expand=True, pady=(5,0))
-
-        self.output_area = scrolledtext.ScrolledText(
-            output_frame, wrap=tk.WORD,
-            font=('Consolas', 10), background=self.settings["color"].get("terminal", "#1e1e1e"), foreground=self.settings["color"].get("text", "#9cc5f8"),
-            insertbackground='white', borderwidth=1, relief=tk.SUNKEN
-        )
-        self.output_area.pack(fill=tk.BOTH, expand=True)
-
-        # 状态栏
-        self.status_var = tk.StringVar()
-        self.status_var.set("就绪")
-        status_bar = tk.Label(main_frame, textvariable=self.status_var,
-                              relief=tk.SUNKEN, anchor=tk.W, bg=self.settings["color"].get("windows_bg", "#9cc5f8"))
-        status_bar.pack(fill=tk.X, pady=(5,0))
-
-    def open_settings(self):
-        setting.show_settings(self.root, self.settings, self.save_settings)
-
-    def show_map_list(self):
-        if self.controller.process is None:
-            self.append_output("错误：服务器未运行，无法获取地图列表\n")
-            return
-        map_list.show_map_list(self, self.controller.process,
-                               self.send_command,
-                               self.controller.add_listener,
-                               self.controller.remove_listener)
-
-    def start_server(self):
-        java = self.settings["java"].get("java_path") or "java"
-        jar = self.settings["java"].get("jar_path")
-        if not jar:
-            self.append_output("错误：未设置服务器jar路径\n")
-            return
-
-        if self.controller.start(java, jar):
-            self.start_btn.config(state=tk.DISABLED)
-            self.stop_btn.config(state=tk.NORMAL)
-            self.root.after(2000, lambda: self.send_command("host"))
-
-    def stop_server(self):
-        self.controller.stop()
-        self.start_btn.config(state=tk.NORMAL)
-        self.stop_btn.config(state=tk.DISABLED)
-
-    def stop_game(self):
-        if self.controller.process is None:
-            self.append_output("服务器未运行\n")
-            return
-        self.root.after(20, lambda: self.send_command("pause on"))
-
-    def start_game(self):
-        if self.controller.process is None:
-            self.append_output("服务器未运行\n")
-            return
-        self.root.after(20, lambda: self.send_command("pause off"))
-
-    def send_command(self, cmd=None):
-        if cmd is None:
-            cmd = self.cmd_entry.get()
-            if cmd:
-                self.controller.send_command(cmd)
-                self.cmd_entry.delete(0, tk.END)
-        else:
-            self.controller.send_command(cmd)
-
-    def append_output(self, text):
-        self.output_area.config(state=tk.NORMAL)
-        self.output_area.insert(tk.END, text)
-        self.output_area.see(tk.END)
-        self.output_area.config(state=tk.DISABLED)
-
-    def on_closing(self):
-        self.controller.exit_gracefully()
+# ui_main.py
+import tkinter as tk
+from tkinter import messagebox, scrolledtext, ttk
+import json
+import os
+import threading
+import time
+import setting
+import map_list
+import server_dialog
+import log_search
+import schedule_dialog
+from find_bar import FindBar
+import startup_stats
+from button_style2 import create_gradient_button
+from server_controller import ServerController, DEFAULT_SAVE_COMMAND
+from output_pump import OutputPump
+from scrollback import Scrollback
+from server_pool import ServerPool, ServerSlot, server_entries
+from supervisor import ServerSupervisor
+import launch_profile
+from proc_sampler import ResourceSampler
+from resource_graph import ResourceGraph
+from status_poller import StatusPoller
+from log_archive import LogArchive, shared_writer
+from log_index import LogIndex
+from command_scheduler import CommandScheduler
+from command_complete import CommandCompleter, CommandHelpCache, CommandHistory
+
+try:# 获取脚本所在目录，用于构建绝对路径
+    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+    SETTINGS_PATH = os.path.join(SCRIPT_DIR, "settings.json")
+    
+except:
+    with open("settings.json", "w", encoding="utf-8") as f:
+        json.dump({
+  "java": {
+    "java_path": "C:\\Apps\\coding\\Zulu\\bin\\java.exe",
+    "jar_path": "C:\\Users\\26529\\Documents\\MDT\\mdt_be.jar",
+    "encoding": "utf-8",
+    "errors": "replace",
+    "read_mode": "chunked",
+    "backend": "thread",
+    "startup_commands": ["host"],
+    "ready_timeout": 120,
+    "profile": "默认"
+  },
+  "profiles": {
+    "默认": {
+      "xms": "",
+      "xmx": "",
+      "gc": "",
+      "jvm_args": [],
+      "server_args": [],
+      "cds": False
+    },
+    "快速启动": {
+      "xms": "1g",
+      "xmx": "2g",
+      "gc": "g1",
+      "jvm_args": [],
+      "server_args": [],
+      "cds": True
+    }
+  },
+  "color": {
+    "windows_bg": "#5dbcc8",
+    "entry": "#3d7980",
+    "terminal": "#549ea8",
+    "text": "#49254d"
+  },
+  "console": {
+    "max_lines": 5000,
+    "max_mb": 4,
+    "ring_lines": 100000,
+    "spill": False,
+    "spill_mb": 256
+  },
+  "shutdown": {
+    "exit": 5,
+    "save": 5,
+    "terminate": 5,
+    "kill": 3,
+    "save_command": "save shutdown"
+  },
+  "monitor": {
+    "enabled": True,
+    "interval": 1.0,
+    "history": 300,
+    "redraw_ms": 500
+  },
+  "log_archive": {
+    "enabled": True,
+    "max_mb": 16,
+    "rotate_daily": True,
+    "compression": "gzip",
+    "queue_lines": 200000
+  },
+  "status_poll": {
+    "enabled": False,
+    "interval": 10,
+    "timeout": 5,
+    "low_tps": 30
+  },
+  "supervisor": {
+    "auto_restart": True,
+    "backoff_initial": 2,
+    "backoff_max": 60,
+    "crash_window": 300,
+    "max_crashes": 5,
+    "stable_after": 120,
+    "keep_seconds": 30
+  },
+  "schedules": []
+}, f)
+
+LANGUAGE_PATH = os.path.join(SCRIPT_DIR, "language.json")
+MAP_INDEX_PATH = os.path.join(SCRIPT_DIR, "map_index.json")
+STARTUP_STATS_PATH = os.path.join(SCRIPT_DIR, "startup_stats.jsonl")
+COMMAND_HISTORY_PATH = os.path.join(SCRIPT_DIR, "command_history.json")
+COMMAND_HELP_PATH = os.path.join(SCRIPT_DIR, "command_help.json")
+CDS_DIR = os.path.join(SCRIPT_DIR, "cds")
+LOG_DIR = os.path.join(SCRIPT_DIR, "logs")
+# 退出时最多等待日志写盘的时间（秒），未完成的压缩在下次启动时继续
+LOG_FLUSH_TIMEOUT = 3
+
+
+
+class MindustryLauncher:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("MIGO 1.0")
+        self.root.geometry("960x540")
+        self.root.minsize(800, 500)
+
+        try:
+            self.root.iconbitmap("icon.ico")
+        except:
+            pass
+
+        self.settings = self.load_settings()
+        # 后台线程的输出和状态都经由输出泵转交给主线程，每台服务器占一路通道
+        self.pump = OutputPump(self.root)
+        self.pool = ServerPool()
+        self.current = None  # 当前标签页对应的服务器
+        self._closing = False
+        # 资源采样在后台线程中进行，界面只按 redraw_ms 取快照重绘当前标签页的图表
+        monitor = self.settings.get("monitor", {})
+        self.monitor_enabled = monitor.get("enabled", True)
+        self.sampler = ResourceSampler(monitor.get("interval", 1.0), monitor.get("history", 300))
+        self.redraw_ms = monitor.get("redraw_ms", 500)
+        # 定时指令：settings["schedules"] 中的任务由一个后台线程按时发送
+        self.scheduler = CommandScheduler(
+            self.schedule_targets,
+            report=lambda name, text: self.pool.get(name).channel.put_output(text)
+        )
+        # 各 jar 版本的指令表（来自服务器的 help，缓存在磁盘上），用于 Tab 补全
+        self.command_help = CommandHelpCache(COMMAND_HELP_PATH)
+
+        self.create_widgets()
+        for entry in server_entries(self.settings):
+            self.add_server(entry)
+        for name, error in self.scheduler.load(self.settings.get("schedules", [])):
+            print(f"定时任务 {name} 无效: {error}")
+        self.scheduler.start()
+        self.pump.start()
+        if self.monitor_enabled:
+            self.sampler.start()
+            self.root.after(self.redraw_ms, self._redraw_graph)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+    def load_language(self):
+        try:
+            with open(LANGUAGE_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except:
+            with open(LANGUAGE_PATH, "w", encoding="utf-8") as f:
+                json.dump({
+    "user_choice": "en",
+    "language": {
+        "cn_zh": {
+            "start_server": "启动服务器",
+            "stop_server": "停止服务器",
+            "setting": "设置",
+            "map_list": "地图列表",
+            "stop_game": "暂停游戏",
+            "start_game": "开始游戏",
+			"enter_command":"键入指令",
+			"java_exe_path":"Java路径（exe）",
+			"server_jar_path":"服务器jar路径",
+			"apply":"确定",
+			"close":"关闭",
+			"windows_bg_color":"窗口背景色",
+			"terminal_bg_color":"终端背景色",
+			"terminal_font_color":"终端字体颜色",
+			"entry_color":"输入框颜色",
+			"add_server":"添加服务器",
+			"server_name":"服务器名称",
+			"server_workdir":"工作目录（可选）",
+			"server_port":"端口（可选）",
+			"log_search":"日志搜索",
+			"schedules":"定时任务"
+			
+			
+        },
+        "en": {
+            "start_server": "start server",
+            "stop_server": "stop server",
+            "setting": "setting",
+            "map_list": "map list",
+            "stop_game": "stop game",
+            "start_game": "start game",
+			"enter_command":"enter command",
+			"java_exe_path":"java.exe path",
+			"server_jar_path":"server jar path",
+			"apply":"apply",
+			"close":"close",
+			"windows_bg_color":"windows background color",
+			"terminal_bg_color":"terminal background color",
+			"terminal_font_color":"terminal font color",
+			"entry_color":"input box color",
+			"add_server":"add server",
+			"server_name":"server name",
+			"server_workdir":"working dir (optional)",
+			"server_port":"port (optional)",
+			"log_search":"log search",
+			"schedules":"schedules"
+			
+        }
+    }
+}, f)       
+            with open(LANGUAGE_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+            
+
+    def load_settings(self):
+        try:
+            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except:
+            with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
+                json.dump({
+  "java": {
+    "java_path": "C:\\Apps\\coding\\Zulu\\bin\\java.exe",
+    "jar_path": "C:\\Users\\26529\\Documents\\MDT\\mdt_be.jar",
+    "encoding": "utf-8",
+    "errors": "replace",
+    "read_mode": "chunked",
+    "backend": "thread",
+    "startup_commands": ["host"],
+    "ready_timeout": 120,
+    "profile": "默认"
+  },
+  "profiles": {
+    "默认": {
+      "xms": "",
+      "xmx": "",
+      "gc": "",
+      "jvm_args": [],
+      "server_args": [],
+      "cds": False
+    },
+    "快速启动": {
+      "xms": "1g",
+      "xmx": "2g",
+      "gc": "g1",
+      "jvm_args": [],
+      "server_args": [],
+      "cds": True
+    }
+  },
+  "color": {
+    "windows_bg": "#5dbcc8",
+    "entry": "#3d7980",
+    "terminal": "#549ea8",
+    "text": "#49254d"
+  },
+  "console": {
+    "max_lines": 5000,
+    "max_mb": 4,
+    "ring_lines": 100000,
+    "spill": False,
+    "spill_mb": 256
+  },
+  "shutdown": {
+    "exit": 5,
+    "save": 5,
+    "terminate": 5,
+    "kill": 3,
+    "save_command": "save shutdown"
+  },
+  "monitor": {
+    "enabled": True,
+    "interval": 1.0,
+    "history": 300,
+    "redraw_ms": 500
+  },
+  "log_archive": {
+    "enabled": True,
+    "max_mb": 16,
+    "rotate_daily": True,
+    "compression": "gzip",
+    "queue_lines": 200000
+  },
+  "status_poll": {
+    "enabled": False,
+    "interval": 10,
+    "timeout": 5,
+    "low_tps": 30
+  },
+  "supervisor": {
+    "auto_restart": True,
+    "backoff_initial": 2,
+    "backoff_max": 60,
+    "crash_window": 300,
+    "max_crashes": 5,
+    "stable_after": 120,
+    "keep_seconds": 30
+  },
+  "schedules": []
+}, f)
+            with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+
+    def save_settings(self):
+        """保存设置到文件"""
+        try:
+            with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
+                json.dump(self.settings, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存 settings.json 失败: {e}")
+
+    # 以下属性指向当前标签页的服务器，地图列表等窗口通过它们操作服务器
+    @property
+    def controller(self):
+        return self.current.controller
+
+    @property
+    def scrollback(self):
+        return self.current.scrollback
+
+    @property
+    def output_area(self):
+        return self.current.console
+
+    def update_status(self, text):
+        self.status_var.set(text)
+
+    def on_server_status(self, slot, text):
+        """某台服务器的状态变化（主线程）：更新标签页标题，当前标签页同时更新状态栏与按钮"""
+        slot.status = text
+        running = slot.controller.process is not None
+        self.notebook.tab(slot.tab, text=f"● {slot.name}" if running else slot.name)
+        if slot is self.current:
+            self.refresh_server_state()
+
+    def on_metrics(self, slot, metrics):
+        slot.metrics = metrics
+        if slot is self.current:
+            self.update_metrics(metrics)
+
+    def update_metrics(self, metrics):
+        if metrics is None:
+            self.metrics_var.set("")
+            return
+        if not metrics.hosted:
+            self.metrics_var.set("未开放")
+            self.metrics_label.config(fg=self.metrics_fg)
+            return
+        text = f"TPS {metrics.tps}  玩家 {metrics.players}  内存 {metrics.memory_mb} MB"
+        if metrics.map:
+            text += f"  {metrics.map} 第 {metrics.wave} 波"
+        self.metrics_var.set(text)
+        # TPS 低于阈值时标红，便于发现负载过高
+        low_tps = self.settings.get("status_poll", {}).get("low_tps", 30)
+        low = metrics.tps is not None and metrics.tps < low_tps
+        self.metrics_label.config(fg="#c62828" if low else self.metrics_fg)
+
+    def refresh_server_state(self):
+        slot = self.current
+        self.update_status(f"[{slot.name}] {slot.status}" if len(self.pool) > 1 else slot.status)
+        self.update_metrics(slot.metrics)
+        running = slot.controller.process is not None
+        # 等待自动重启期间也可以停止（取消重启）
+        stoppable = (running and not slot.controller.stopping) or slot.supervisor.restart_pending()
+        self.start_btn.config(state=tk.DISABLED if running or self._closing else tk.NORMAL)
+        self.stop_btn.config(state=tk.NORMAL if stoppable else tk.DISABLED)
+
+    def on_tab_changed(self, event=None):
+        selected = self.notebook.select()
+        for slot in self.pool:
+            if str(slot.tab) == selected:
+                self.current = slot
+                self.refresh_server_state()
+                self.find_bar.attach(slot.scrollback)
+                break
+
+    def create_widgets(self):
+        # 主容器
+        main_frame = tk.Frame(self.root, bg=self.settings["color"]["windows_bg"], padx=10, pady=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # 顶部按钮区域（使用 get 提供默认值，防止键缺失）
+        top_frame_bg = self.settings["color"].get("windows_bg", "#9ec3f6")
+        top_frame = tk.Frame(main_frame, bg=top_frame_bg)
+        top_frame.pack(fill=tk.X, pady=(0,10))
+
+        lgag = self.load_language()
+
+        self.start_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["start_server"],
+                                                command=self.start_server,
+                                                width=120, height=35)
+        self.start_btn.pack(side=tk.LEFT, padx=5)
+
+        self.stop_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["stop_server"],
+                                               command=self.stop_server,
+                                               width=120, height=35)
+        self.stop_btn.pack(side=tk.LEFT, padx=5)
+        self.stop_btn.config(state=tk.DISABLED)
+
+        self.setting_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["setting"],
+                                                  command=self.open_settings,
+                                                  width=120, height=35)
+        self.setting_btn.pack(side=tk.LEFT, padx=5)
+
+        self.map_list_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["map_list"],
+                                                   command=self.show_map_list,
+                                                   width=120, height=35)
+        self.map_list_btn.pack(side=tk.LEFT, padx=5)
+
+        self.game_stop_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["stop_game"],
+                                                   command=self.stop_game,
+                                                   width=120, height=35)
+        self.game_stop_btn.pack(side=tk.LEFT, padx=5)
+
+        self.game_start_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]]["start_game"],
+                                                   command=self.start_game,
+                                                   width=120, height=35)
+        self.game_start_btn.pack(side=tk.LEFT, padx=5)
+
+        self.add_server_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]].get("add_server", "添加服务器"),
+                                                     command=self.open_add_server,
+                                                     width=120, height=35)
+        self.add_server_btn.pack(side=tk.LEFT, padx=5)
+
+        self.log_search_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]].get("log_search", "日志搜索"),
+                                                     command=self.show_log_search,
+                                                     width=120, height=35)
+        self.log_search_btn.pack(side=tk.LEFT, padx=5)
+
+        self.schedules_btn = create_gradient_button(top_frame, text=lgag["language"][lgag["user_choice"]].get("schedules", "定时任务"),
+                                                    command=self.show_schedules,
+                                                    width=120, height=35)
+        self.schedules_btn.pack(side=tk.LEFT, padx=5)
+
+        # 指令输入区域
+        cmd_frame = tk.Frame(main_frame, bg=self.settings["color"].get("entry", "#9ec3f6"))
+        cmd_frame.pack(fill=tk.X, pady=5)
+
+        self.cmd_entry = tk.Entry(cmd_frame, font=('微软雅黑', 10), bg=self.settings["color"].get("entry", "#c1dcfc"))
+        self.cmd_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0,5))
+        self.cmd_entry.bind("<Return>", lambda e: self.send_command())
+        # 上/下键翻历史（跨会话保存），Tab 补全指令名、地图名和选项
+        self.completer = CommandCompleter(self.cmd_entry, CommandHistory(COMMAND_HISTORY_PATH),
+                                          self.current_commands, self.current_map_names,
+                                          self.update_status)
+
+        self.send_btn = create_gradient_button(cmd_frame, text=lgag["language"][lgag["user_choice"]]["enter_command"],
+                                               command=self.send_command,
+                                               width=100, height=30)
+        self.send_btn.pack(side=tk.LEFT)
+
+        # 输出区域：每台服务器一个标签页
+        self.notebook = ttk.Notebook(main_frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True, pady=(5,0))
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+        # 终端查找栏（Ctrl+F 打开，Esc 关闭），平时隐藏
+        self.find_bar = FindBar(main_frame, self.pump.post, before=self.notebook,
+                                bg=self.settings["color"].get("windows_bg", "#9cc5f8"),
+                                entry_bg=self.settings["color"].get("entry", "#c1dcfc"))
+        self.root.bind("<Control-f>", self.show_find_bar)
+        self.root.bind("<Control-F>", self.show_find_bar)
+
+        # 状态栏
+        status_frame = tk.Frame(main_frame, bg=self.settings["color"].get("windows_bg", "#9cc5f8"))
+        status_frame.pack(fill=tk.X, pady=(5,0))
+        self.status_var = tk.StringVar()
+        self.status_var.set("就绪")
+        status_bar = tk.Label(status_frame, textvariable=self.status_var,
+                              relief=tk.SUNKEN, anchor=tk.W, bg=self.settings["color"].get("windows_bg", "#9cc5f8"))
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        # 游戏状态（status 轮询结果）：TPS、玩家数、内存、地图与波次
+        self.metrics_var = tk.StringVar()
+        self.metrics_label = tk.Label(status_frame, textvariable=self.metrics_var,
+                                      relief=tk.SUNKEN, anchor=tk.E, bg=self.settings["color"].get("windows_bg", "#9cc5f8"))
+        self.metrics_label.pack(side=tk.RIGHT)
+        self.metrics_fg = self.metrics_label.cget("fg")
+
+    def open_settings(self):
+        setting.show_settings(self.root, self.settings, self.save_settings)
+
+    def show_map_list(self):
+        map_list.show_map_list(self)
+
+    def show_log_search(self):
+        log_search.show_log_search(self)
+
+    def show_schedules(self):
+        schedule_dialog.show_schedules(self)
+
+    def schedule_targets(self, servers):
+        """定时任务的目标服务器：servers 为 None 时为全部"""
+        return [(slot.name, slot.controller) for slot in self.pool
+                if servers is None or slot.name in servers]
+
+    def show_find_bar(self, event=None):
+        if self.current is not None:
+            self.find_bar.show(self.scrollback)
+        return "break"
+
+    def add_server(self, entry):
+        """为一台服务器创建标签页终端、输出通道和控制器"""
+        slot = ServerSlot(self.settings, entry)
+        config = slot.config
+
+        slot.tab = tk.Frame(self.notebook)
+        if self.monitor_enabled:
+            slot.graph = ResourceGraph(slot.tab, bg=self.settings["color"].get("windows_bg", "#ffffff"))
+            slot.graph.pack(side=tk.BOTTOM, fill=tk.X)
+        slot.console = scrolledtext.ScrolledText(
+            slot.tab, wrap=tk.WORD,
+            font=('Consolas', 10), background=self.settings["color"].get("terminal", "#1e1e1e"), foreground=self.settings["color"].get("text", "#9cc5f8"),
+            insertbackground='white', borderwidth=1, relief=tk.SUNKEN
+        )
+        slot.console.pack(fill=tk.BOTH, expand=True)
+        # 按日志级别着色（tag 名与 LogRecord.level 一致）
+        slot.console.tag_config("W", foreground="#9a6700")
+        slot.console.tag_config("E", foreground="#c62828")
+
+        # 回滚缓冲：限制终端行数，旧行转存到内存环形缓冲或临时文件
+        console = self.settings.get("console", {})
+        slot.scrollback = Scrollback(
+            slot.console,
+            max_lines=console.get("max_lines", 5000),
+            max_mb=console.get("max_mb", 4),
+            ring_lines=console.get("ring_lines", 100000),
+            spill=console.get("spill", False),
+            spill_mb=console.get("spill_mb", 256)
+        )
+
+        slot.channel = self.pump.add_channel(slot.scrollback.write,
+                                             lambda text: self.on_server_status(slot, text))
+        # 持久化日志：每台服务器一个目录，由后台写入线程切分、压缩
+        archive = self.settings.get("log_archive", {})
+        if archive.get("enabled", True):
+            log_dir = os.path.join(LOG_DIR, slot.safe_name())
+            # 分段压缩完成后建立索引；以前遗留的未索引分段在后台补建
+            slot.log_index = LogIndex(log_dir)
+            slot.archive = LogArchive(
+                log_dir,
+                max_bytes=int(archive.get("max_mb", 16) * 1024 * 1024),
+                rotate_daily=archive.get("rotate_daily", True),
+                compression=archive.get("compression", "gzip"),
+                queue_lines=archive.get("queue_lines", 200000),
+                on_segment_closed=slot.log_index.on_segment_closed
+            )
+            threading.Thread(target=slot.log_index.index_missing, daemon=True).start()
+        slot.controller = ServerController(
+            output_callback=slot.on_output,
+            records_callback=slot.on_records,
+            status_callback=slot.channel.put_status,
+            encoding=config.get("encoding", "utf-8"),
+            errors=config.get("errors", "replace"),
+            read_mode=config.get("read_mode", "chunked"),
+            timing_callback=lambda timings: self.on_started(slot, timings),
+            backend=config.get("backend", "thread"),
+            backlog=slot.channel.pending
+        )
+        # 崩溃后自动重启；崩溃循环时弹窗提醒
+        slot.supervisor = ServerSupervisor(
+            slot.controller, self.settings.get("supervisor"),
+            alert_callback=lambda text: self.pump.post(self.on_crash_loop, slot, text)
+        )
+        # 定时静默发送 status，解析结果显示在状态栏右侧
+        poll = self.settings.get("status_poll", {})
+        slot.poller = StatusPoller(
+            slot.controller, lambda metrics: self.pump.post(self.on_metrics, slot, metrics),
+            interval=poll.get("interval", 10), timeout=poll.get("timeout", 5)
+        )
+        if poll.get("enabled", False):
+            slot.poller.start()
+        self.pool.add(slot)
+        self.sampler.add(slot.name, lambda: slot.controller.process.pid if slot.controller.process else None)
+        self.notebook.add(slot.tab, text=slot.name)
+        if self.current is None:
+            self.current = slot
+            self.refresh_server_state()
+        return slot
+
+    def _redraw_graph(self):
+        """定时刷新当前标签页的资源图（其他标签页不可见，不重绘）"""
+        slot = self.current
+        if slot is not None and slot.graph is not None:
+            slot.graph.update_points(self.sampler.history(slot.name))
+        self.root.after(self.redraw_ms, self._redraw_graph)
+
+    def open_add_server(self):
+        server_dialog.show_add_server(self.root, self.settings,
+                                      self.pool.name_taken,
+                                      self.on_server_added)
+
+    def on_server_added(self, entry):
+        servers = self.settings.get("servers")
+        if not servers:
+            # 之前只有隐式的默认服务器，先把它写入列表
+            servers = self.settings["servers"] = [slot.entry for slot in self.pool]
+        servers.append(entry)
+        self.save_settings()
+        slot = self.add_server(entry)
+        self.notebook.select(slot.tab)
+
+    def server_workdir(self):
+        return self.current.workdir()
+
+    def get_map_catalog(self):
+        """返回当前标签页服务器的地图目录"""
+        return self.current.get_map_catalog(MAP_INDEX_PATH)
+
+    def current_commands(self):
+        """当前标签页服务器 jar 版本的指令表与前缀树，尚未获取过 help 时为 (None, None)"""
+        slot = self.current
+        if slot is None:
+            return None, None
+        if slot.command_key is None:
+            jar = slot.config.get("jar_path")
+            if not jar or not os.path.exists(jar):
+                return None, None
+            slot.command_key = startup_stats.jar_version_key(jar)
+        return self.command_help.get(slot.command_key), self.command_help.trie(slot.command_key)
+
+    def current_map_names(self):
+        catalog = self.get_map_catalog() if self.current is not None else None
+        return [info.name for info in catalog.cached()] if catalog else []
+
+    def start_server(self):
+        slot = self.current
+        config = slot.config
+        java = config.get("java_path") or "java"
+        jar = config.get("jar_path")
+        if not jar:
+            self.append_output("错误：未设置服务器jar路径\n")
+            return
+
+        # 启动配置：堆大小、GC、AppCDS 归档与额外参数（服务器条目可单独指定 profile）
+        profile_name, profile = launch_profile.resolve_profile(self.settings, slot.entry.get("profile"))
+        jvm_args = launch_profile.jvm_args(profile, jar, CDS_DIR)
+
+        # 控制台就绪后由 controller 立即发送启动指令（默认 host），不再固定等待
+        started = slot.supervisor.start(
+            java, jar, cwd=slot.workdir(),
+            startup_commands=slot.startup_commands(),
+            ready_timeout=config.get("ready_timeout", 120),
+            jvm_args=jvm_args,
+            server_args=launch_profile.server_args(profile)
+        )
+        if started:
+            slot.started_with = (java, jar, profile_name, profile, jvm_args)
+            self.refresh_server_state()
+
+    def on_started(self, slot, timings):
+        """服务器启动完成（读取线程中调用）：记录耗时；该 jar 版本第一次启动时获取指令表"""
+        self.record_startup(slot, timings)
+        if slot.started_with:
+            slot.command_key = startup_stats.jar_version_key(slot.started_with[1])
+            self.command_help.ensure(slot.controller, slot.command_key)
+
+    def record_startup(self, slot, timings):
+        """
+        记录启动耗时（启动→就绪、就绪→开放）与开放时的内存，
+        按服务器、启动配置、java 与 jar 版本区分（读取线程中调用）
+        """
+        if not slot.started_with:
+            return
+        java, jar, profile_name, profile, jvm_args = slot.started_with
+        if any(arg.startswith("-XX:SharedArchiveFile=") for arg in jvm_args):
+            cds = "use"
+        elif any(arg.startswith("-XX:ArchiveClassesAtExit=") for arg in jvm_args):
+            cds = "dump"
+        else:
+            cds = None
+        entry = {"server": slot.name, "java": java, "profile": profile_name,
+                 "xms": profile.get("xms"), "xmx": profile.get("xmx"), "gc": profile.get("gc"), "cds": cds}
+        entry.update(startup_stats.jar_version(jar))
+        entry.update(timings)
+        process = slot.controller.process
+        entry["rss"] = startup_stats.process_rss(process.pid) if process else None
+        startup_stats.record(STARTUP_STATS_PATH, entry)
+
+    def shutdown_options(self):
+        """settings 中各停止阶段的期限与 save 阶段的指令"""
+        deadlines = dict(self.settings.get("shutdown", {}))
+        save_command = deadlines.pop("save_command", DEFAULT_SAVE_COMMAND)
+        return {"deadlines": deadlines, "save_command": save_command}
+
+    def stop_server(self):
+        # 分阶段停止在后台线程中进行，进度经状态栏显示
+        self.current.supervisor.stop(**self.shutdown_options())
+        self.refresh_server_state()
+
+    def on_crash_loop(self, slot, text):
+        messagebox.showwarning(f"服务器 {slot.name}", text, parent=self.root)
+
+    def stop_game(self):
+        if self.controller.process is None:
+            self.append_output("服务器未运行\n")
+            return
+        self.root.after(20, lambda: self.send_command("pause on"))
+
+    def start_game(self):
+        if self.controller.process is None:
+            self.append_output("服务器未运行\n")
+            return
+        self.root.after(20, lambda: self.send_command("pause off"))
+
+    def send_command(self, cmd=None):
+        if cmd is None:
+            cmd = self.cmd_entry.get()
+            if cmd:
+                self.controller.send_command(cmd)
+                self.completer.record(cmd)
+                self.cmd_entry.delete(0, tk.END)
+        else:
+            self.controller.send_command(cmd)
+
+    def append_output(self, text):
+        """向当前标签页追加输出（任意线程可调用，实际写入由输出泵在主线程完成）"""
+        self.current.channel.put_output(text)
+
+    def on_closing(self):
+        """关闭窗口：所有服务器同时分阶段停止，全部退出后再销毁窗口，界面不会卡住"""
+        if self._closing:
+            return
+        self._closing = True
+        self.scheduler.stop()
+        options = self.shutdown_options()
+        running = self.pool.running()
+        # 对所有服务器调用 stop，同时取消等待中的自动重启
+        futures = [slot.supervisor.stop(**options) for slot in self.pool]
+        self.refresh_server_state()
+        if running:
+            self.update_status(f"正在停止 {len(running)} 台服务器…")
+        self._close_when_stopped(futures)
+
+    def _close_when_stopped(self, futures):
+        if not all(future.done() for future in futures):
+            self.root.after(100, self._close_when_stopped, futures)
+            return
+        self.pump.stop()
+        self.sampler.stop()
+        for slot in self.pool:
+            slot.poller.stop()
+        for slot in self.pool:
+            slot.scrollback.close()
+            if slot.archive:
+                slot.archive.close()
+        self._destroy_when_flushed(time.monotonic() + LOG_FLUSH_TIMEOUT)
+
+    def _destroy_when_flushed(self, deadline):
+        """等待日志写盘完成（最多 LOG_FLUSH_TIMEOUT 秒）后销毁窗口"""
+        if not shared_writer().flushed() and time.monotonic() < deadline:
+            self.root.after(100, self._destroy_when_flushed, deadline)
+            return
         self.root.destroy()
\ No newline at end of file
@@ -0,0 +1,102 @@
+# virtual_list.py
+import tkinter as tk
+
+
+class VirtualList(tk.Frame):
+    """
+    虚拟化列表：只为可见区域创建行控件，滚动时复用这些控件并重新绑定数据。
+
+    打开时间和内存只与可见行数有关，与条目总数无关。
+    """
+
+    def __init__(self, master, row_height, create_row, bind_row, bg=None, **kwargs):
+        """
+        :param row_height: 每行高度（像素）
+        :param create_row: create_row(parent) -> 行控件，只在行池不够时调用
+        :param bind_row: bind_row(row, item, index)，把条目数据绑定到已有的行控件
+        """
+        super().__init__(master, bg=bg, **kwargs)
+        self.row_height = row_height
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.items = []
+        self.offset = 0  # 视图顶部对应的像素位置
+        self._rows = []
+        self._bound = {}  # 行控件 -> 当前绑定的条目下标
+
+        self.viewport = tk.Frame(self, bg=bg)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self.yview, bg=bg)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.viewport.bind("<Configure>", lambda e: self._refresh())
+        # 滚轮事件绑定在顶层窗口上（对所有子控件生效），只处理指针位于列表内的情况
+        toplevel = self.winfo_toplevel()
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            toplevel.bind(sequence, self._on_wheel, add="+")
+
+    # ------------------------------------------------------------------
+    def set_items(self, items):
+        self.items = list(items)
+        self._bound.clear()
+        self.offset = max(0, min(self.offset, self._max_offset()))
+        self._refresh()
+
+    def scroll_to(self, index):
+        self.offset = max(0, min(index * self.row_height, self._max_offset()))
+        self._refresh()
+
+    def yview(self, *args):
+        """Scrollbar 的回调：moveto 比例 / scroll n units|pages"""
+        if not args:
+            return
+        height = self.viewport.winfo_height()
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self._total_height())
+        elif args[0] == "scroll":
+            step = self.row_height if args[2] == "units" else max(self.row_height, height - self.row_height)
+            self.offset += int(args[1]) * step
+        self.offset = max(0, min(self.offset, self._max_offset()))
+        self._refresh()
+
+    # ------------------------------------------------------------------
+    def _total_height(self):
+        return len(self.items) * self.row_height
+
+    def _max_offset(self):
+        return max(0, self._total_height() - self.viewport.winfo_height())
+
+    def _refresh(self):
+        height = self.viewport.winfo_height()
+        rh = self.row_height
+        needed = height // rh + 2
+        while len(self._rows) < needed:
+            self._rows.append(self.create_row(self.viewport))
+
+        first = self.offset // rh
+        for i, row in enumerate(self._rows):
+            index = first + i
+            if index < len(self.items) and i < needed:
+                if self._bound.get(row) != index:
+                    self.bind_row(row, self.items[index], index)
+                    self._bound[row] = index
+                row.place(x=0, y=index * rh - self.offset, relwidth=1, height=rh)
+            else:
+                row.place_forget()
+                self._bound.pop(row, None)
+
+        total = self._total_height()
+        if total <= height or total == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + height) / total)
+
+    # ------------------------------------------------------------------
+    def _on_wheel(self, event):
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        if widget is None or not str(widget).startswith(str(self)):
+            return
+        if event.num == 4 or event.delta > 0:
+            self.yview("scroll", -3, "units")
+        else:
+            self.yview("scroll", 3, "units")